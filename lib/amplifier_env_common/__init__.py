@@ -6,20 +6,61 @@ This package defines the contract types used across all env-* bundles:
 - schemas: JSON schemas for the 8 common-shape tools
 """
 
-from .env_filter import EnvVarPolicy, filter_env_vars
-from .models import EnvError, EnvExecResult, EnvFileEntry
-from .protocol import EnvironmentBackend
-from .registry import EnvironmentInstance, EnvironmentRegistry
-from .schemas import (
-    ENV_EDIT_FILE_SCHEMA,
-    ENV_EXEC_SCHEMA,
-    ENV_FILE_EXISTS_SCHEMA,
-    ENV_GLOB_SCHEMA,
-    ENV_GREP_SCHEMA,
-    ENV_LIST_DIR_SCHEMA,
-    ENV_READ_FILE_SCHEMA,
-    ENV_WRITE_FILE_SCHEMA,
-)
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .env_filter import EnvVarPolicy, filter_env_vars
+    from .models import EnvError, EnvExecResult, EnvFileEntry
+    from .protocol import EnvironmentBackend
+    from .registry import EnvironmentInstance, EnvironmentRegistry
+    from .schemas import (
+        ENV_EDIT_FILE_SCHEMA,
+        ENV_EXEC_SCHEMA,
+        ENV_FILE_EXISTS_SCHEMA,
+        ENV_GLOB_SCHEMA,
+        ENV_GREP_SCHEMA,
+        ENV_LIST_DIR_SCHEMA,
+        ENV_READ_FILE_SCHEMA,
+        ENV_WRITE_FILE_SCHEMA,
+    )
+
+# Public names are resolved on first access (PEP 562) so importing one
+# submodule doesn't load pydantic models, the registry and all schemas.
+_LAZY: dict[str, str] = {
+    "EnvVarPolicy": "env_filter",
+    "filter_env_vars": "env_filter",
+    "EnvironmentBackend": "protocol",
+    "EnvironmentInstance": "registry",
+    "EnvironmentRegistry": "registry",
+    "EnvError": "models",
+    "EnvExecResult": "models",
+    "EnvFileEntry": "models",
+    "ENV_EDIT_FILE_SCHEMA": "schemas",
+    "ENV_EXEC_SCHEMA": "schemas",
+    "ENV_FILE_EXISTS_SCHEMA": "schemas",
+    "ENV_GLOB_SCHEMA": "schemas",
+    "ENV_GREP_SCHEMA": "schemas",
+    "ENV_LIST_DIR_SCHEMA": "schemas",
+    "ENV_READ_FILE_SCHEMA": "schemas",
+    "ENV_WRITE_FILE_SCHEMA": "schemas",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY))
+
 
 __all__ = [
     "EnvVarPolicy",
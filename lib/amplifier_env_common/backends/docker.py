@@ -5,29 +5,58 @@ sent through a containers_invoke callable (the containers tool's exec operation)
 
 Translation map:
 - exec_command: direct passthrough
-- read_file: cat <path> (+ tail/head for offset/limit)
-- write_file: mkdir -p <parent> && printf '%s' <content> > <path>
-- edit_file: cat to read, patch in Python, printf to write back
+- read_file: cat <path> (sed -n range for offset+limit, else tail/head)
+- write_file: mkdir -p "$(dirname <path>)" && printf <base64> | base64 -d > <path>
+- edit_file: cat to read, patch in Python, single mkdir+base64 write back
 - file_exists: test -e <path>
-- list_dir: ls -1ap <path>
+- list_dir: ls -1ap <path> (find -printf '%y\t%p' for depth > 1)
 - grep: grep -rn <pattern> <path>
-- glob_files: find <path> -name '<pattern>'
-- cleanup: containers(operation="destroy")
+- glob_files: ls -1d <path>/<pattern> for top-level patterns, else find -name
+- cleanup: containers(operation="destroy"), one per compose project at a time
 """
 
 from __future__ import annotations
 
+import asyncio
+import base64
+import re
 import shlex
 import time
-from typing import Any, Callable
+import weakref
+from collections.abc import Callable
+from typing import Any
 
 from ..models import EnvExecResult, EnvFileEntry
 
+# ls -1ap entries that aren't real children
+_LS_SKIP = frozenset({".", "..", "./", "../"})
+
+# "<type>\t<path>" from find -printf '%y' or stat -c '%F'; keep the first
+# letter of the type ('d' for both 'd' and 'directory') and the path.
+_FIND_LINE_RE = re.compile(r"^(\w)[^\t\n]*\t(.+)$", re.MULTILINE)
+
+# event loop -> compose project -> destroy in progress, shared by every
+# backend attached to that project so a stack is torn down once. The
+# futures belong to one loop, so each loop has its own map.
+_COMPOSE_INFLIGHT: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[str, asyncio.Future[None]]
+] = weakref.WeakKeyDictionary()
+
+
+def _loop_compose_inflight() -> dict[str, asyncio.Future[None]]:
+    loop = asyncio.get_running_loop()
+    inflight = _COMPOSE_INFLIGHT.get(loop)
+    if inflight is None:
+        inflight = _COMPOSE_INFLIGHT[loop] = {}
+    return inflight
+
 
 class DockerBackend:
     """Execution environment backend for Docker containers.
 
     Talks to a running container through the containers tool's exec operation.
+    Each call is one exec (edit_file makes two); no shell is kept open
+    between calls.
 
     Args:
         containers_invoke: Async callable that invokes the containers tool.
@@ -91,6 +120,20 @@ class DockerBackend:
             return output
         return {"stdout": "", "stderr": "", "exit_code": 0}
 
+    @staticmethod
+    def _write_cmd(path: str, content: str) -> str:
+        """Build a single command that creates parent dirs and writes content.
+
+        Content travels base64-encoded: the alphabet needs no shell quoting,
+        so there is no O(n) escaping pass and quotes/control bytes survive.
+        """
+        quoted_path = shlex.quote(path)
+        encoded = base64.b64encode(content.encode("utf-8")).decode("ascii")
+        return (
+            f'mkdir -p "$(dirname {quoted_path})" && '
+            f"printf '%s' {encoded} | base64 -d > {quoted_path}"
+        )
+
     # ------------------------------------------------------------------
     # EnvironmentBackend interface
     # ------------------------------------------------------------------
@@ -125,7 +168,13 @@ class DockerBackend:
         quoted = shlex.quote(path)
 
         if offset is not None and limit is not None:
-            cmd = f"tail -n +{offset} {quoted} | head -n {limit}"
+            # One sed process that quits right after the range, instead of
+            # a tail | head pipeline reading on to EOF.
+            start = max(int(offset), 1)
+            if int(limit) < 1:
+                return ""
+            end = start + int(limit) - 1
+            cmd = f"sed -n '{start},{end}p;{end + 1}q' {quoted}"
         elif offset is not None:
             cmd = f"tail -n +{offset} {quoted}"
         elif limit is not None:
@@ -137,16 +186,7 @@ class DockerBackend:
         return output.get("stdout", "")
 
     async def write_file(self, path: str, content: str) -> None:
-        quoted_path = shlex.quote(path)
-        quoted_content = shlex.quote(content)
-
-        if "/" in path:
-            parent = shlex.quote(path.rsplit("/", 1)[0])
-            cmd = f"mkdir -p {parent} && printf '%s' {quoted_content} > {quoted_path}"
-        else:
-            cmd = f"printf '%s' {quoted_content} > {quoted_path}"
-
-        await self._exec(cmd)
+        await self._exec(self._write_cmd(path, content))
 
     async def edit_file(self, path: str, old_string: str, new_string: str) -> str:
         # Step 1: Read current content via cat
@@ -164,8 +204,8 @@ class DockerBackend:
             raise ValueError(msg)
         new_content = content.replace(old_string, new_string, 1)
 
-        # Step 3: Write back via printf
-        await self.write_file(path, new_content)
+        # Step 3: Write back via base64 (one exec, no write_file re-dispatch)
+        await self._exec(self._write_cmd(path, new_content))
         return f"Edited {path}: replaced 1 occurrence"
 
     async def file_exists(self, path: str) -> bool:
@@ -181,40 +221,41 @@ class DockerBackend:
             output = await self._exec(f"ls -1ap {quoted}")
             stdout = output.get("stdout", "")
 
-            entries: list[EnvFileEntry] = []
-            for line in stdout.splitlines():
-                line = line.strip()
-                if not line or line in (".", "..", "./", "../"):
-                    continue
-                if line.endswith("/"):
-                    name = line.rstrip("/")
-                    entries.append(EnvFileEntry(name=name, entry_type="dir", size=None))
-                else:
-                    entries.append(
-                        EnvFileEntry(name=line, entry_type="file", size=None)
-                    )
-            return entries
-
-        # Use find for recursive listing (depth > 1)
-        find_cmd = f"find {quoted} -maxdepth {depth} -mindepth 1"
+            # ls -1ap lines are already clean: no strip(), one comprehension
+            return [
+                EnvFileEntry.model_construct(
+                    name=line[:-1], entry_type="dir", size=None
+                )
+                if line.endswith("/")
+                else EnvFileEntry.model_construct(
+                    name=line, entry_type="file", size=None
+                )
+                for line in stdout.splitlines()
+                if line and line not in _LS_SKIP
+            ]
+
+        # Use find for recursive listing (depth > 1). One exec returns the
+        # type and path of every entry; BusyBox find lacks -printf, so fall
+        # back to stat there. Both formats start with 'd' for directories.
+        find_base = f"find {quoted} -maxdepth {depth} -mindepth 1"
+        find_cmd = (
+            "if find / -maxdepth 0 -printf '' >/dev/null 2>&1; then "
+            f"{find_base} -printf '%y\t%p\\n'; "
+            f"else {find_base} -exec stat -c '%F\t%n' {{}} +; fi"
+        )
         output = await self._exec(find_cmd)
         stdout = output.get("stdout", "")
 
-        # Detect directories with a second command
-        dir_cmd = f"find {quoted} -maxdepth {depth} -mindepth 1 -type d"
-        dir_output = await self._exec(dir_cmd)
-        dir_lines = set(dir_output.get("stdout", "").splitlines())
-
-        entries = []
-        for line in stdout.splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            entry_type = "dir" if line in dir_lines else "file"
-            # Make path relative to the search root
-            name = line.removeprefix(path.rstrip("/") + "/")
-            entries.append(EnvFileEntry(name=name, entry_type=entry_type, size=None))
-        return entries
+        # Make paths relative to the search root
+        prefix = path.rstrip("/") + "/"
+        return [
+            EnvFileEntry.model_construct(
+                name=full_path.removeprefix(prefix),
+                entry_type="dir" if kind == "d" else "file",
+                size=None,
+            )
+            for kind, full_path in _FIND_LINE_RE.findall(stdout)
+        ]
 
     async def grep(
         self,
@@ -245,32 +286,50 @@ class DockerBackend:
         return output.get("stdout", "")
 
     async def glob_files(self, pattern: str, path: str | None = None) -> list[str]:
-        search_path = shlex.quote(path) if path else shlex.quote(self._working_dir)
-
-        # Strip leading **/ — find -name is already recursive
-        clean_pattern = pattern
-        while clean_pattern.startswith("**/"):
-            clean_pattern = clean_pattern[3:]
-        quoted_pattern = shlex.quote(clean_pattern)
-
-        cmd = f"find {search_path} -name {quoted_pattern}"
+        base = path or self._working_dir
+
+        # Strip leading **/ — find -name is already recursive. Advance an
+        # offset and slice once rather than re-slicing per prefix.
+        start = 0
+        while pattern.startswith("**/", start):
+            start += 3
+        clean_pattern = pattern[start:]
+
+        if "**" in pattern or "/" in clean_pattern or "[" in clean_pattern:
+            quoted_pattern = shlex.quote(clean_pattern)
+            cmd = f"find {shlex.quote(base)} -name {quoted_pattern}"
+        else:
+            # Top-level pattern: let the shell expand it in one directory
+            # instead of walking the whole tree with find. Literal runs are
+            # quoted; only * and ? stay live for expansion.
+            literal_runs = re.split(r"([*?])", clean_pattern)
+            shell_pattern = "".join(
+                run if run in ("*", "?") else shlex.quote(run)
+                for run in literal_runs
+                if run
+            )
+            prefix = base if base.endswith("/") else base + "/"
+            cmd = f"ls -1d -- {shlex.quote(prefix)}{shell_pattern} 2>/dev/null"
         output = await self._exec(cmd)
         stdout = output.get("stdout", "")
 
-        if not stdout.strip():
-            return []
         return [line for line in stdout.splitlines() if line.strip()]
 
     async def cleanup(self) -> None:
-        """Destroy the container or compose stack."""
+        """Destroy the container or compose stack.
+
+        Backends sharing a compose project coalesce overlapping cleanups
+        into a single destroy of the whole stack.
+        """
         if self._compose_project:
-            await self._invoke(
-                {
-                    "operation": "destroy",
-                    "container": self._container_id,
-                    "compose_project": self._compose_project,
-                }
-            )
+            project = self._compose_project
+            inflight = _loop_compose_inflight()
+            task = inflight.get(project)
+            if task is None:
+                task = asyncio.ensure_future(self._compose_down())
+                inflight[project] = task
+                task.add_done_callback(lambda _: inflight.pop(project, None))
+            await asyncio.shield(task)
         else:
             await self._invoke(
                 {
@@ -279,6 +338,15 @@ class DockerBackend:
                 }
             )
 
+    async def _compose_down(self) -> None:
+        await self._invoke(
+            {
+                "operation": "destroy",
+                "container": self._container_id,
+                "compose_project": self._compose_project,
+            }
+        )
+
     def info(self) -> dict[str, Any]:
         result = {
             "container_id": self._container_id,
@@ -1,34 +1,100 @@
 """LocalBackend — executes operations on the host filesystem.
 
-Implements EnvironmentBackend using Python stdlib:
+Implements EnvironmentBackend using Python stdlib. Blocking filesystem work
+runs in worker threads (asyncio.to_thread) so it never stalls the event loop:
 - exec_command: asyncio.create_subprocess_shell
-- read_file/write_file/edit_file: pathlib
-- file_exists/list_dir: os/pathlib
-- grep: asyncio.create_subprocess_shell running grep
+- read_file/write_file/edit_file: pathlib, behind an mtime-validated LRU cache
+- file_exists: pathlib; list_dir: os.scandir
+- grep: asyncio.create_subprocess_exec running grep -rn (POSIX basic regular
+  expressions, as on the docker and ssh backends); rg (ripgrep) runs instead
+  when installed and the pattern means the same thing in both syntaxes
 - glob_files: pathlib.glob
 """
 
 from __future__ import annotations
 
 import asyncio
+import io
+import itertools
 import os
 import platform as platform_mod
+import shutil
 import signal
 import sys
+import threading
 import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
 from ..env_filter import EnvVarPolicy, filter_env_vars
 from ..models import EnvExecResult, EnvFileEntry
 
+# ripgrep is much faster than grep -r on large trees; use it when present.
+# Its regex syntax is neither POSIX basic nor extended: "a|b", "(ab)+" and
+# "\\d" mean different things to rg and to grep -rn, which every backend
+# runs. rg therefore only gets patterns without those characters (see
+# _rg_compatible); everything else goes to grep.
+_RG_PATH: str | None = shutil.which("rg")
+_RG_UNSAFE_CHARS = frozenset("\\+?(){}|")
+
+# Upper bound on bytes of file content kept in each backend's read cache.
+_FILE_CACHE_MAX_BYTES = 25 * 1024 * 1024
+
+# list_dir stats file sizes in parallel once a listing has this many files;
+# it pays off on network filesystems where each stat() is a round trip.
+_PARALLEL_STAT_MIN = 64
+_STAT_POOL: ThreadPoolExecutor | None = None
+_STAT_POOL_LOCK = threading.Lock()
+
+
+def _stat_pool() -> ThreadPoolExecutor:
+    """Return the process-wide pool used for list_dir size lookups."""
+    global _STAT_POOL
+    with _STAT_POOL_LOCK:
+        if _STAT_POOL is None:
+            _STAT_POOL = ThreadPoolExecutor(
+                max_workers=16, thread_name_prefix="env-local-stat"
+            )
+        return _STAT_POOL
+
+
+def _entry_size(entry: os.DirEntry) -> int:
+    return entry.stat().st_size
+
+
+def _rg_compatible(pattern: str) -> bool:
+    """Whether rg reads *pattern* the way POSIX grep (BRE) does.
+
+    True for literals plus ``.``, ``*`` and bracket expressions, with ``^``
+    and ``$`` only as anchors at either end.
+    """
+    if _RG_UNSAFE_CHARS.intersection(pattern) or pattern.startswith("*"):
+        return False
+    body = pattern.removeprefix("^").removesuffix("$")
+    return "^" not in body and "$" not in body
+
 
 class LocalBackend:
     """Execution environment backend for the local host filesystem."""
 
     def __init__(self, working_dir: str = ".", env_policy: str = "core_only") -> None:
         self._working_dir = os.path.abspath(working_dir)
+        # Resolved once; _resolve() only needs realpath() for the target
+        self._working_resolved = str(Path(self._working_dir).resolve())
+        self._working_prefix = self._working_resolved.rstrip(os.sep) + os.sep
         self._env_policy = env_policy
+        self._policy = EnvVarPolicy(env_policy)
+        # Filtered os.environ, rebuilt only when the process environment changes
+        self._env_base: dict[str, str] = {}
+        self._env_raw: dict | None = None
+        # LRU of resolved path -> (mtime_ns, size, text); validated by stat
+        self._file_cache: OrderedDict[str, tuple[int, int, str]] = OrderedDict()
+        self._file_cache_bytes = 0
+        # File operations run in worker threads; guard the cache bookkeeping
+        self._file_cache_lock = threading.Lock()
 
     @property
     def env_type(self) -> str:
@@ -57,11 +123,78 @@ class LocalBackend:
             resolved = p.resolve()
         else:
             resolved = (Path(self._working_dir) / p).resolve()
-        working = Path(self._working_dir).resolve()
-        if not resolved.is_relative_to(working):
+        # The target is always resolved so symlinks can't escape; the
+        # containment test itself is a plain string-prefix check.
+        resolved_str = str(resolved)
+        if resolved_str != self._working_resolved and not resolved_str.startswith(
+            self._working_prefix
+        ):
             raise ValueError(f"Path escapes working directory: {path}")
         return resolved
 
+    def _cache_store(self, full_path: Path, content: str) -> None:
+        """Record content for a path using its current stat as the validator."""
+        key = str(full_path)
+        st = full_path.stat()
+        with self._file_cache_lock:
+            old = self._file_cache.pop(key, None)
+            if old is not None:
+                self._file_cache_bytes -= old[1]
+            # read_text() translates newlines, so text with '\r' wouldn't
+            # match what a fresh read returns; leave it uncached.
+            if st.st_size > _FILE_CACHE_MAX_BYTES or "\r" in content:
+                return
+            self._file_cache[key] = (st.st_mtime_ns, st.st_size, content)
+            self._file_cache_bytes += st.st_size
+            while self._file_cache_bytes > _FILE_CACHE_MAX_BYTES:
+                _, (_, size, _) = self._file_cache.popitem(last=False)
+                self._file_cache_bytes -= size
+
+    def _cache_lookup(self, full_path: Path) -> str | None:
+        """Return cached text if it is still current on disk, else None."""
+        key = str(full_path)
+        cached = self._file_cache.get(key)
+        if cached is None:
+            return None
+        st = full_path.stat()
+        if cached[0] != st.st_mtime_ns or cached[1] != st.st_size:
+            return None
+        with self._file_cache_lock:
+            if key in self._file_cache:
+                self._file_cache.move_to_end(key)
+        return cached[2]
+
+    def _read_text(self, full_path: Path, strict: bool = False) -> str:
+        """Read UTF-8 text through the cache.
+
+        Only content that decodes cleanly is cached, so a hit is always what
+        a strict read would return. Non-strict reads of undecodable files
+        fall back to replacement characters, uncached.
+        """
+        cached = self._cache_lookup(full_path)
+        if cached is not None:
+            return cached
+        try:
+            content = full_path.read_text(encoding="utf-8")
+        except UnicodeDecodeError:
+            if strict:
+                raise
+            return full_path.read_text(encoding="utf-8", errors="replace")
+        self._cache_store(full_path, content)
+        return content
+
+    def _base_env(self) -> dict[str, str]:
+        """Return os.environ filtered by the policy, cached until it changes.
+
+        Comparing os.environ's raw backing dict is a C-level equality check;
+        copying and filtering the decoded environment only happens on change.
+        """
+        raw = getattr(os.environ, "_data", None)
+        if raw is None or raw != self._env_raw:
+            self._env_base = filter_env_vars(self._policy, dict(os.environ))
+            self._env_raw = dict(raw) if raw is not None else None
+        return self._env_base
+
     async def exec_command(
         self,
         cmd: str,
@@ -70,8 +203,9 @@ class LocalBackend:
         env_vars: dict[str, str] | None = None,
     ) -> EnvExecResult:
         cwd = workdir or self._working_dir
-        policy = EnvVarPolicy(self._env_policy)
-        env = filter_env_vars(policy, dict(os.environ), env_vars)
+        env = self._base_env()
+        if env_vars:
+            env = env | env_vars
         start = time.monotonic()
         proc = await asyncio.create_subprocess_shell(
             cmd,
@@ -103,7 +237,7 @@ class LocalBackend:
                     await proc.communicate()
                 except Exception:
                     pass
-            return EnvExecResult(
+            return EnvExecResult.model_construct(
                 stdout="",
                 stderr=f"Command timed out after {timeout}s: {cmd}",
                 exit_code=-1,
@@ -111,7 +245,7 @@ class LocalBackend:
                 duration_ms=elapsed_ms,
             )
         elapsed_ms = int((time.monotonic() - start) * 1000)
-        return EnvExecResult(
+        return EnvExecResult.model_construct(
             stdout=stdout.decode("utf-8", errors="replace") if stdout else "",
             stderr=stderr.decode("utf-8", errors="replace") if stderr else "",
             exit_code=proc.returncode or 0,
@@ -122,27 +256,43 @@ class LocalBackend:
     async def read_file(
         self, path: str, offset: int | None = None, limit: int | None = None
     ) -> str:
+        return await asyncio.to_thread(self._read_file_sync, path, offset, limit)
+
+    def _read_file_sync(self, path: str, offset: int | None, limit: int | None) -> str:
         full_path = self._resolve(path)
         if not full_path.exists():
             raise FileNotFoundError(f"File not found: {path}")
-        content = full_path.read_text(encoding="utf-8", errors="replace")
-        if offset is not None or limit is not None:
-            lines = content.splitlines(keepends=True)
-            start = (offset - 1) if offset else 0  # 1-indexed
-            end = (start + limit) if limit else len(lines)
-            content = "".join(lines[start:end])
-        return content
+        if offset is None and limit is None:
+            return self._read_text(full_path)
+        start = max(offset - 1, 0) if offset else 0  # 1-indexed
+        stop = (start + limit) if limit else None
+        # Stop reading at the last requested line instead of loading the
+        # whole file. Lines split on '\n' only, like tail/head remotely.
+        cached = self._cache_lookup(full_path)
+        if cached is not None:
+            return "".join(itertools.islice(io.StringIO(cached), start, stop))
+        with full_path.open("r", encoding="utf-8", errors="replace") as fh:
+            return "".join(itertools.islice(fh, start, stop))
 
     async def write_file(self, path: str, content: str) -> None:
+        await asyncio.to_thread(self._write_file_sync, path, content)
+
+    def _write_file_sync(self, path: str, content: str) -> None:
         full_path = self._resolve(path)
         full_path.parent.mkdir(parents=True, exist_ok=True)
         full_path.write_text(content, encoding="utf-8")
+        self._cache_store(full_path, content)
 
     async def edit_file(self, path: str, old_string: str, new_string: str) -> str:
+        return await asyncio.to_thread(
+            self._edit_file_sync, path, old_string, new_string
+        )
+
+    def _edit_file_sync(self, path: str, old_string: str, new_string: str) -> str:
         full_path = self._resolve(path)
         if not full_path.exists():
             raise FileNotFoundError(f"File not found: {path}")
-        content = full_path.read_text(encoding="utf-8")
+        content = self._read_text(full_path, strict=True)
         count = content.count(old_string)
         if count == 0:
             raise ValueError(f"String not found in {path}")
@@ -150,32 +300,59 @@ class LocalBackend:
             raise ValueError(f"String not unique in {path} (found {count} times)")
         new_content = content.replace(old_string, new_string, 1)
         full_path.write_text(new_content, encoding="utf-8")
+        self._cache_store(full_path, new_content)
         return f"Edited {path}: replaced 1 occurrence"
 
     async def file_exists(self, path: str) -> bool:
-        return self._resolve(path).exists()
+        return await asyncio.to_thread(lambda: self._resolve(path).exists())
 
     async def list_dir(self, path: str, depth: int = 1) -> list[EnvFileEntry]:
+        return await asyncio.to_thread(self._list_dir_sync, path, depth)
+
+    def _list_dir_sync(self, path: str, depth: int) -> list[EnvFileEntry]:
         resolved = self._resolve(path)
         if not resolved.is_dir():
             raise FileNotFoundError(f"Directory not found: {path}")
-        entries: list[EnvFileEntry] = []
-
-        def _walk(dir_path: Path, current_depth: int) -> None:
-            for item in sorted(dir_path.iterdir(), key=lambda p: p.name):
-                rel_name = str(item.relative_to(resolved))
-                entries.append(
-                    EnvFileEntry(
-                        name=rel_name if current_depth > 1 else item.name,
-                        entry_type="dir" if item.is_dir() else "file",
-                        size=item.stat().st_size if item.is_file() else None,
-                    )
-                )
-                if item.is_dir() and current_depth < depth:
-                    _walk(item, current_depth + 1)
-
-        _walk(resolved, 1)
-        return entries
+        root = str(resolved)
+        prefix = root if root.endswith(os.sep) else root + os.sep
+
+        def _sorted_entries(dir_path: str) -> Iterator[os.DirEntry]:
+            with os.scandir(dir_path) as it:
+                return iter(sorted(it, key=lambda e: e.name))
+
+        # fts-style walk: one iterator per open directory, no recursion, so
+        # output is pre-order with siblings in name order. DirEntry caches
+        # d_type from the directory read; only files need a stat() for size.
+        walked: list[tuple[os.DirEntry, bool]] = []
+        files: list[os.DirEntry] = []
+        stack = [(_sorted_entries(root), 1)]
+        while stack:
+            siblings, level = stack[-1]
+            item = next(siblings, None)
+            if item is None:
+                stack.pop()
+                continue
+            is_dir = item.is_dir()
+            walked.append((item, is_dir))
+            if not is_dir and item.is_file():
+                files.append(item)
+            if is_dir and level < depth:
+                stack.append((_sorted_entries(item.path), level + 1))
+
+        if len(files) >= _PARALLEL_STAT_MIN:
+            sizes = list(_stat_pool().map(_entry_size, files))
+        else:
+            sizes = [_entry_size(f) for f in files]
+        size_by_path = {f.path: size for f, size in zip(files, sizes)}
+
+        return [
+            EnvFileEntry.model_construct(
+                name=item.path[len(prefix) :],
+                entry_type="dir" if is_dir else "file",
+                size=size_by_path.get(item.path),
+            )
+            for item, is_dir in walked
+        ]
 
     async def grep(
         self,
@@ -185,22 +362,33 @@ class LocalBackend:
         case_insensitive: bool = False,
         max_results: int | None = None,
     ) -> str:
-        search_path = str(self._resolve(path or "."))
-        cmd_parts = ["grep", "-rn"]
-        if case_insensitive:
-            cmd_parts.append("-i")
-        if max_results is not None:
-            cmd_parts.extend(["-m", str(max_results)])
-        cmd_parts.extend([pattern, search_path])
-        if glob_filter:
-            cmd_parts.extend(["--include", glob_filter])
+        search_path = str(await asyncio.to_thread(self._resolve, path or "."))
+        if _RG_PATH and _rg_compatible(pattern):
+            # -uuu: search ignored, hidden and binary files too, as grep -r does
+            cmd_parts = [_RG_PATH, "-n", "-uuu", "--no-heading", "--color=never"]
+            if case_insensitive:
+                cmd_parts.append("-i")
+            if max_results is not None:
+                cmd_parts.extend(["-m", str(max_results)])
+            if glob_filter:
+                cmd_parts.extend(["--glob", glob_filter])
+            cmd_parts.extend(["-e", pattern, search_path])
+        else:
+            cmd_parts = ["grep", "-rn"]
+            if case_insensitive:
+                cmd_parts.append("-i")
+            if max_results is not None:
+                cmd_parts.extend(["-m", str(max_results)])
+            cmd_parts.extend(["-e", pattern, search_path])
+            if glob_filter:
+                cmd_parts.extend(["--include", glob_filter])
         proc = await asyncio.create_subprocess_exec(
             *cmd_parts,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
         )
         stdout, stderr = await proc.communicate()
-        if proc.returncode == 1:  # grep returns 1 for no matches
+        if proc.returncode == 1:  # grep and rg return 1 for no matches
             return "No matches found."
         if proc.returncode and proc.returncode > 1:
             raise RuntimeError(
@@ -209,6 +397,9 @@ class LocalBackend:
         return stdout.decode("utf-8", errors="replace")
 
     async def glob_files(self, pattern: str, path: str | None = None) -> list[str]:
+        return await asyncio.to_thread(self._glob_files_sync, pattern, path)
+
+    def _glob_files_sync(self, pattern: str, path: str | None) -> list[str]:
         base = self._resolve(path or ".")
         matches = sorted(str(p.relative_to(base)) for p in base.glob(pattern))
         return matches
@@ -6,10 +6,10 @@ sent through an async exec callable (typically wrapping an SSHConnection).
 Translation map (same pattern as DockerBackend):
 - exec_command: direct passthrough (workdir → cd <dir> && <cmd>)
 - read_file: cat <path> (+ tail/head for offset/limit)
-- write_file: mkdir -p <parent> && printf '%s' <content> > <path>
-- edit_file: cat to read, patch in Python, printf to write back
+- write_file: mkdir -p <parent> && base64 -d > <path> (content on stdin, or printf'd)
+- edit_file: python3 -c patch in place (cat + Python patch + printf without python3)
 - file_exists: test -e <path>
-- list_dir: ls -1ap <path>
+- list_dir: ls -1ap <path> (find -printf '%y\t%s\t%P' for depth > 1)
 - grep: grep -rn <pattern> <path>
 - glob_files: find <path> -name '<pattern>'
 - cleanup: calls disconnect_fn if provided
@@ -21,13 +21,47 @@ in env_create.
 
 from __future__ import annotations
 
+import asyncio
+import base64
 import dataclasses
+import functools
+import re
 import shlex
 import time
-from typing import Any, Callable
+import weakref
+from collections.abc import Callable
+from typing import Any
 
 from ..models import EnvExecResult, EnvFileEntry
 
+# "<type>\t<size>\t<path>" from find -printf '%y' or stat -c '%F'; keep the
+# first letter of the type ('d' for both 'd' and 'directory'), the size, and
+# the path minus any leading "./" or trailing "\r" (CRLF from some sshds).
+_FIND_LINE_RE = re.compile(
+    r"^(\w)[^\t\n]*\t(\d+)\t(?:\./)?([^\r\n]+)\r?$", re.MULTILINE
+)
+
+# Agents hit the same handful of paths over and over; quote each once.
+# Env var values stay on plain shlex.quote so secrets aren't retained here.
+_q = functools.lru_cache(maxsize=2048)(shlex.quote)
+
+# Remote edit_file: argv is path, old b64, new b64. Exits 3 and prints the
+# match count unless old occurs exactly once (missing file counts as 0).
+_EDIT_SCRIPT = shlex.quote(
+    "import base64,sys\n"
+    "p=sys.argv[1]\n"
+    "a,b=(base64.b64decode(x) for x in sys.argv[2:4])\n"
+    "try:\n"
+    "    s=open(p,'rb').read()\n"
+    "except OSError:\n"
+    "    s=b''\n"
+    "n=s.count(a)\n"
+    "if n!=1:\n"
+    "    print(n)\n"
+    "    sys.exit(3)\n"
+    "open(p,'wb').write(s.replace(a,b,1))\n"
+)
+
 
 # ---------------------------------------------------------------------------
 # SSH connection classes (depend on asyncssh at runtime, not import time)
@@ -46,17 +80,117 @@ class SSHConnectionConfig:
     connect_timeout: float = 30
 
 
+# Concurrent channels per connection: one below OpenSSH's default
+# MaxSessions (10) so the daemon never has to queue or refuse a channel.
+_MAX_SESSIONS = 9
+
+
+class _PooledConnection:
+    """A shared asyncssh connection (possibly still opening) and its user count."""
+
+    __slots__ = ("refs", "sessions", "task", "waiters")
+
+    def __init__(self, task: asyncio.Future[Any]) -> None:
+        self.task = task
+        self.refs = 0
+        self.waiters = 0  # connect() calls still awaiting the handshake
+        self.sessions = asyncio.Semaphore(_MAX_SESSIONS)
+
+    def discard(self) -> None:
+        """Stop the handshake, or close the connection if it already opened."""
+        if not self.task.done():
+            self.task.cancel()
+        elif (conn := self.conn()) is not None:
+            conn.close()
+
+    def conn(self) -> Any:
+        """Return the open connection, or None if not (or no longer) usable."""
+        if not self.task.done() or self.task.cancelled() or self.task.exception():
+            return None
+        return self.task.result()
+
+
+def _key_part(value: Any) -> Any:
+    """A hashable stand-in for one config value in a pool key."""
+    if isinstance(value, list):
+        return tuple(_key_part(v) for v in value)
+    try:
+        hash(value)
+    except TypeError:
+        # e.g. a known-hosts object: only the same object shares a connection
+        return (type(value), id(value))
+    return value
+
+
+# event loop -> pool key -> shared connection. asyncssh connections and the
+# futures that open them belong to one loop, so each loop has its own pool.
+_POOLS: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[tuple[Any, ...], _PooledConnection]
+] = weakref.WeakKeyDictionary()
+
+
+def _loop_pool() -> dict[tuple[Any, ...], _PooledConnection]:
+    loop = asyncio.get_running_loop()
+    pool = _POOLS.get(loop)
+    if pool is None:
+        pool = _POOLS[loop] = {}
+    return pool
+
+
 class AsyncSSHBackend:
     """Low-level SSH backend that wraps asyncssh.connect().
 
+    Connections are pooled per event loop and full :class:`SSHConnectionConfig`
+    (host, port, user, key, known_hosts, timeout): every backend with the same
+    config shares one live asyncssh connection (and so one handshake), and it
+    is closed when the last user releases it. A config with stricter host-key
+    checking never reuses a connection opened under a looser one.
+
     The ``asyncssh`` library is imported lazily inside :meth:`connect` so
     that importing this class does **not** require asyncssh to be installed.
     """
 
     def __init__(self, config: SSHConnectionConfig) -> None:
         self._config = config
+        self._sessions = asyncio.Semaphore(_MAX_SESSIONS)
+
+    @property
+    def sessions(self) -> asyncio.Semaphore:
+        """Channel limit shared by every user of the pooled connection."""
+        return self._sessions
+
+    def _pool_key(self) -> tuple[Any, ...]:
+        c = self._config
+        return tuple(_key_part(getattr(c, f.name)) for f in dataclasses.fields(c))
 
     async def connect(self) -> Any:
+        """Return a pooled asyncssh connection, opening one if needed."""
+        key = self._pool_key()
+        pool = _loop_pool()
+        entry = pool.get(key)
+        if entry is not None and entry.task.done():
+            conn = entry.conn()
+            if conn is None or conn.is_closed():
+                entry = None
+        if entry is None:
+            entry = _PooledConnection(asyncio.ensure_future(self._open()))
+            pool[key] = entry
+        entry.waiters += 1
+        try:
+            conn = await asyncio.shield(entry.task)
+            entry.refs += 1
+        finally:
+            entry.waiters -= 1
+            if not entry.refs and not entry.waiters:
+                # The handshake failed, or every caller waiting on it was
+                # cancelled: nobody will release this entry, so drop it now.
+                if pool.get(key) is entry:
+                    del pool[key]
+                entry.discard()
+        self._sessions = entry.sessions
+        return conn
+
+    async def _open(self) -> Any:
         """Open an asyncssh connection using the stored config."""
         import asyncssh  # lazy — ImportError caught by callers
 
@@ -64,6 +198,9 @@ class AsyncSSHBackend:
             "host": self._config.host,
             "port": self._config.port,
             "known_hosts": self._config.known_hosts,
+            "keepalive_interval": 30,
+            # run() results are already-decoded str; no per-call conversion
+            "encoding": "utf-8",
         }
         if self._config.username:
             connect_kwargs["username"] = self._config.username
@@ -74,6 +211,26 @@ class AsyncSSHBackend:
 
         return await asyncssh.connect(**connect_kwargs)
 
+    def release(self, conn: Any) -> None:
+        """Drop one reference to *conn*, closing it when nobody uses it."""
+        key = self._pool_key()
+        pool = _loop_pool()
+        entry = pool.get(key)
+        if entry is None or entry.conn() is not conn:
+            conn.close()  # evicted or never pooled
+            return
+        entry.refs -= 1
+        if entry.refs <= 0:
+            del pool[key]
+            conn.close()
+
+    def evict(self) -> None:
+        """Forget the pooled connection for this config (e.g. after a transport
+        error) so the next :meth:`connect` opens a fresh one."""
+        entry = _loop_pool().pop(self._pool_key(), None)
+        if entry is not None and (conn := entry.conn()) is not None:
+            conn.close()
+
 
 class SSHConnection:
     """High-level SSH connection that provides exec_command / disconnect.
@@ -92,26 +249,41 @@ class SSHConnection:
         self._conn: Any = None
 
     async def connect(self) -> None:
-        """Establish the SSH connection."""
+        """Establish (or join) the pooled SSH connection."""
         self._conn = await self._backend.connect()
 
     async def exec_command(
-        self, cmd: str, timeout: float | None = None
+        self, cmd: str, timeout: float | None = None, input: str | None = None
     ) -> EnvExecResult:
-        """Execute *cmd* on the remote host and return structured output."""
+        """Execute *cmd* on the remote host and return structured output.
+
+        *input*, if given, is written to the command's stdin.
+        """
         if self._conn is None:
             raise RuntimeError("SSHConnection is not connected; call connect() first")
-        result = await self._conn.run(cmd, timeout=timeout)
-        return EnvExecResult(
-            stdout=str(result.stdout) if result.stdout else "",
-            stderr=str(result.stderr) if result.stderr else "",
+        try:
+            # asyncssh opens one channel per run() on the shared connection;
+            # cap them so bursts don't trip the server's MaxSessions.
+            # check=False: non-zero exits (grep no-match, test -e) are
+            # results, not ProcessErrors to build and catch.
+            async with self._backend.sessions:
+                result = await self._conn.run(
+                    cmd, timeout=timeout, input=input, check=False
+                )
+        except Exception:
+            if self._conn.is_closed():
+                self._backend.evict()
+            raise
+        return EnvExecResult.model_construct(
+            stdout=result.stdout or "",
+            stderr=result.stderr or "",
             exit_code=result.exit_status if result.exit_status is not None else 0,
         )
 
     async def disconnect(self) -> None:
-        """Close the SSH connection."""
+        """Release the SSH connection; the last user closes it."""
         if self._conn is not None:
-            self._conn.close()
+            self._backend.release(self._conn)
             self._conn = None
 
 
@@ -132,6 +304,11 @@ class SSHBackendWrapper:
             -> object with .stdout, .stderr, .exit_code attributes.
         host: Remote host identifier (for display / info).
         disconnect_fn: Optional async callable to close the SSH connection.
+        measure_duration: Time each exec for ``duration_ms``; when False,
+            durations are reported as 0 and no clock is read.
+        exec_accepts_input: Set when *exec_fn* also takes an ``input``
+            keyword (text written to the command's stdin). File writes then
+            stream their content through stdin instead of the command line.
     """
 
     def __init__(
@@ -139,12 +316,19 @@ class SSHBackendWrapper:
         exec_fn: Callable[..., Any],
         host: str,
         disconnect_fn: Callable[..., Any] | None = None,
+        measure_duration: bool = True,
+        exec_accepts_input: bool = False,
     ) -> None:
         self._exec = exec_fn
+        self._measure_duration = measure_duration
+        self._exec_takes_input = exec_accepts_input
         self._host = host
         self._disconnect = disconnect_fn
         self._cached_platform: str | None = None
         self._cached_os_version: str | None = None
+        self._uname_probe: asyncio.Task[None] | None = None
+        # Whether the host has python3 for one-round-trip edits (None = untried)
+        self._remote_python: bool | None = None
 
     @property
     def env_type(self) -> str:
@@ -155,14 +339,54 @@ class SSHBackendWrapper:
 
     def platform(self) -> str:
         if self._cached_platform is None:
-            self._cached_platform = "linux"
+            self._start_uname_probe()
+            return "linux"  # assumed until the uname probe answers
         return self._cached_platform
 
     def os_version(self) -> str:
         if self._cached_os_version is None:
-            self._cached_os_version = "unknown"
+            self._start_uname_probe()
+            return "unknown"
         return self._cached_os_version
 
+    async def probe_platform(self) -> None:
+        """Fill platform()/os_version() from the remote ``uname``.
+
+        The first platform()/os_version() call starts the same probe in the
+        background; await this to get the real values right away. One round
+        trip per wrapper: concurrent calls wait on the same exec.
+        """
+        if self._cached_platform is None:
+            await asyncio.shield(self._uname_task())
+
+    def _start_uname_probe(self) -> None:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return  # nothing to run it on; keep the defaults
+        self._uname_task()
+
+    def _uname_task(self) -> asyncio.Task[None]:
+        if self._uname_probe is None:
+            task = asyncio.get_running_loop().create_task(self._uname())
+            task.add_done_callback(self._uname_done)
+            self._uname_probe = task
+        return self._uname_probe
+
+    def _uname_done(self, task: asyncio.Task[None]) -> None:
+        # A later call probes again if this one failed; the exception is
+        # consumed here so a background probe nobody awaits stays quiet.
+        self._uname_probe = None
+        if not task.cancelled():
+            task.exception()
+
+    async def _uname(self) -> None:
+        result = await self._exec("uname -s; uname -r")
+        fields = result.stdout.split() if result.exit_code == 0 else []
+        if len(fields) >= 2:
+            self._cached_platform = fields[0].lower()
+            self._cached_os_version = fields[1]
+
     # ------------------------------------------------------------------
     # EnvironmentBackend interface
     # ------------------------------------------------------------------
@@ -176,15 +400,19 @@ class SSHBackendWrapper:
     ) -> EnvExecResult:
         full_cmd = cmd
         if env_vars:
-            exports = " && ".join(
-                f"export {k}={shlex.quote(v)}" for k, v in env_vars.items()
-            )
-            full_cmd = f"{exports} && {cmd}"
+            # One export builtin for all variables; the command still runs in
+            # the login shell, so its syntax means what the caller intended.
+            assignments = " ".join(f"{k}={shlex.quote(v)}" for k, v in env_vars.items())
+            full_cmd = f"export {assignments} && {cmd}"
         if workdir:
-            full_cmd = f"cd {shlex.quote(workdir)} && {full_cmd}"
-        start = time.monotonic()
-        result = await self._exec(full_cmd, timeout=timeout)
-        elapsed_ms = int((time.monotonic() - start) * 1000)
+            full_cmd = f"cd {_q(workdir)} && {full_cmd}"
+        if self._measure_duration:
+            start = time.monotonic_ns()
+            result = await self._exec(full_cmd, timeout=timeout)
+            elapsed_ms = (time.monotonic_ns() - start) // 1_000_000
+        else:
+            result = await self._exec(full_cmd, timeout=timeout)
+            elapsed_ms = 0
         return EnvExecResult(
             stdout=result.stdout,
             stderr=result.stderr,
@@ -196,7 +424,7 @@ class SSHBackendWrapper:
     async def read_file(
         self, path: str, offset: int | None = None, limit: int | None = None
     ) -> str:
-        quoted = shlex.quote(path)
+        quoted = _q(path)
 
         if offset is not None and limit is not None:
             cmd = f"tail -n +{offset} {quoted} | head -n {limit}"
@@ -211,44 +439,73 @@ class SSHBackendWrapper:
         return result.stdout
 
     async def write_file(self, path: str, content: str) -> None:
-        quoted_path = shlex.quote(path)
-        quoted_content = shlex.quote(content)
+        # Content travels base64-encoded: no O(n) shell quoting pass, and
+        # over stdin the command line stays the same size for any file.
+        quoted_path = _q(path)
+        encoded = base64.b64encode(content.encode("utf-8")).decode("ascii")
 
-        if "/" in path:
-            parent = shlex.quote(path.rsplit("/", 1)[0])
-            cmd = f"mkdir -p {parent} && printf '%s' {quoted_content} > {quoted_path}"
+        if self._exec_takes_input:
+            cmd = f"base64 -d > {quoted_path}"
         else:
-            cmd = f"printf '%s' {quoted_content} > {quoted_path}"
-
-        await self._exec(cmd)
+            cmd = f"printf '%s' {encoded} | base64 -d > {quoted_path}"
+        # One rpartition gives the parent; "" for "name" and for "/name"
+        parent = path.rpartition("/")[0]
+        if parent:
+            cmd = f"mkdir -p {_q(parent)} && {cmd}"
+
+        if self._exec_takes_input:
+            await self._exec(cmd, input=encoded)
+        else:
+            await self._exec(cmd)
 
     async def edit_file(self, path: str, old_string: str, new_string: str) -> str:
-        # Step 1: Read current content via cat
-        quoted = shlex.quote(path)
+        # One round trip: patch in place with the remote python3. Strings
+        # travel base64-encoded so no quoting can mangle them.
+        if self._remote_python is not False:
+            old_b64 = base64.b64encode(old_string.encode()).decode("ascii")
+            new_b64 = base64.b64encode(new_string.encode()).decode("ascii")
+            result = await self._exec(
+                f"python3 -c {_EDIT_SCRIPT} {_q(path)} {old_b64} {new_b64}"
+            )
+            if result.exit_code == 127:  # no python3 on the host
+                self._remote_python = False
+            else:
+                self._remote_python = True
+                if result.exit_code == 3:
+                    self._raise_match_error(path, int(result.stdout))
+                if result.exit_code != 0:
+                    msg = f"Failed to edit {path}: {result.stderr.strip()}"
+                    raise RuntimeError(msg)
+                return f"Edited {path}: replaced 1 occurrence"
+
+        # Fallback: read via cat, patch in Python, write back via printf
+        quoted = _q(path)
         result = await self._exec(f"cat {quoted}")
         content = result.stdout
 
-        # Step 2: Patch in Python
         count = content.count(old_string)
-        if count == 0:
-            msg = f"String not found in {path}"
-            raise ValueError(msg)
-        if count > 1:
-            msg = f"String not unique in {path} (found {count} times)"
-            raise ValueError(msg)
+        if count != 1:
+            self._raise_match_error(path, count)
         new_content = content.replace(old_string, new_string, 1)
 
-        # Step 3: Write back via printf
         await self.write_file(path, new_content)
         return f"Edited {path}: replaced 1 occurrence"
 
+    @staticmethod
+    def _raise_match_error(path: str, count: int) -> None:
+        if count == 0:
+            msg = f"String not found in {path}"
+        else:
+            msg = f"String not unique in {path} (found {count} times)"
+        raise ValueError(msg)
+
     async def file_exists(self, path: str) -> bool:
-        quoted = shlex.quote(path)
+        quoted = _q(path)
         result = await self._exec(f"test -e {quoted}")
         return result.exit_code == 0
 
     async def list_dir(self, path: str, depth: int = 1) -> list[EnvFileEntry]:
-        quoted = shlex.quote(path)
+        quoted = _q(path)
 
         if depth == 1:
             result = await self._exec(f"ls -1ap {quoted}")
@@ -261,33 +518,39 @@ class SSHBackendWrapper:
                     continue
                 if line.endswith("/"):
                     name = line.rstrip("/")
-                    entries.append(EnvFileEntry(name=name, entry_type="dir", size=None))
+                    entries.append(
+                        EnvFileEntry.model_construct(
+                            name=name, entry_type="dir", size=None
+                        )
+                    )
                 else:
                     entries.append(
-                        EnvFileEntry(name=line, entry_type="file", size=None)
+                        EnvFileEntry.model_construct(
+                            name=line, entry_type="file", size=None
+                        )
                     )
             return entries
 
-        # Use find for recursive listing (depth > 1)
-        find_cmd = f"find {quoted} -maxdepth {depth} -mindepth 1"
+        # Use find for recursive listing (depth > 1). One round trip returns
+        # type, size and root-relative path of every entry (%P; "./"-prefixed
+        # from the stat fallback BusyBox needs), so nothing is re-sliced here.
+        find_base = f"find . -maxdepth {depth} -mindepth 1"
+        find_cmd = (
+            f"cd {quoted} && "
+            "if find / -maxdepth 0 -printf '' >/dev/null 2>&1; then "
+            f"{find_base} -printf '%y\t%s\t%P\\n'; "
+            f"else {find_base} -exec stat -c '%F\t%s\t%n' {{}} +; fi"
+        )
         result = await self._exec(find_cmd)
-        stdout = result.stdout
 
-        # Detect directories with a second command
-        dir_cmd = f"find {quoted} -maxdepth {depth} -mindepth 1 -type d"
-        dir_result = await self._exec(dir_cmd)
-        dir_lines = set(dir_result.stdout.splitlines())
-
-        entries = []
-        for line in stdout.splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            entry_type = "dir" if line in dir_lines else "file"
-            # Make path relative to the search root
-            name = line.removeprefix(path.rstrip("/") + "/")
-            entries.append(EnvFileEntry(name=name, entry_type=entry_type, size=None))
-        return entries
+        return [
+            EnvFileEntry.model_construct(
+                name=name,
+                entry_type="dir" if kind == "d" else "file",
+                size=None if kind == "d" else int(size),
+            )
+            for kind, size, name in _FIND_LINE_RE.findall(result.stdout)
+        ]
 
     async def grep(
         self,
@@ -297,8 +560,8 @@ class SSHBackendWrapper:
         case_insensitive: bool = False,
         max_results: int | None = None,
     ) -> str:
-        search_path = shlex.quote(path) if path else "."
-        quoted_pattern = shlex.quote(pattern)
+        search_path = _q(path) if path else "."
+        quoted_pattern = _q(pattern)
 
         parts = ["grep", "-rn"]
         if case_insensitive:
@@ -307,7 +570,7 @@ class SSHBackendWrapper:
             parts.extend(["-m", str(max_results)])
         parts.extend([quoted_pattern, search_path])
         if glob_filter:
-            parts.extend(["--include", shlex.quote(glob_filter)])
+            parts.extend(["--include", _q(glob_filter)])
 
         cmd = " ".join(parts)
         result = await self._exec(cmd)
@@ -318,20 +581,20 @@ class SSHBackendWrapper:
         return result.stdout
 
     async def glob_files(self, pattern: str, path: str | None = None) -> list[str]:
-        search_path = shlex.quote(path) if path else "."
+        search_path = _q(path) if path else "."
 
-        # Strip leading **/ — find -name is already recursive
-        clean_pattern = pattern
-        while clean_pattern.startswith("**/"):
-            clean_pattern = clean_pattern[3:]
-        quoted_pattern = shlex.quote(clean_pattern)
+        # Strip leading **/ — find -name is already recursive. Advance an
+        # offset and slice once rather than re-slicing per prefix.
+        start = 0
+        while pattern.startswith("**/", start):
+            start += 3
+        clean_pattern = pattern[start:]
+        quoted_pattern = _q(clean_pattern)
 
         cmd = f"find {search_path} -name {quoted_pattern}"
         result = await self._exec(cmd)
         stdout = result.stdout
 
-        if not stdout.strip():
-            return []
         return [line for line in stdout.splitlines() if line.strip()]
 
     async def cleanup(self) -> None:
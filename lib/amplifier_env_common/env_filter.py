@@ -6,6 +6,7 @@ keep core system vars, allow explicit overrides.
 
 from __future__ import annotations
 
+import re
 from enum import Enum
 
 
@@ -47,10 +48,38 @@ SECRET_SUFFIXES: tuple[str, ...] = (
 )
 
 
+# All suffixes in one anchored, case-insensitive pattern: one scan per name
+# and no upper-cased copy.
+_SECRET_RE = re.compile(
+    "(?:" + "|".join(map(re.escape, SECRET_SUFFIXES)) + r")\Z", re.IGNORECASE
+)
+
+
 def _is_secret(name: str) -> bool:
     """Check if a var name matches a known secret pattern (case-insensitive)."""
-    upper = name.upper()
-    return any(upper.endswith(suffix) for suffix in SECRET_SUFFIXES)
+    return _SECRET_RE.search(name) is not None
+
+
+def _inherit_all(base_env: dict[str, str]) -> dict[str, str]:
+    return dict(base_env)
+
+
+def _core_only(base_env: dict[str, str]) -> dict[str, str]:
+    is_secret = _SECRET_RE.search
+    return {k: v for k, v in base_env.items() if k in CORE_VARS or not is_secret(k)}
+
+
+def _inherit_none(base_env: dict[str, str]) -> dict[str, str]:
+    return {}
+
+
+# Policy -> filter. A str-Enum hashes like its value, so raw policy strings
+# (e.g. "core_only" from JSON config) resolve with the same single lookup.
+_POLICY_FN = {
+    EnvVarPolicy.INHERIT_ALL: _inherit_all,
+    EnvVarPolicy.CORE_ONLY: _core_only,
+    EnvVarPolicy.INHERIT_NONE: _inherit_none,
+}
 
 
 def filter_env_vars(
@@ -68,16 +97,7 @@ def filter_env_vars(
     Returns:
         Filtered environment dict.
     """
-    if policy == EnvVarPolicy.INHERIT_ALL:
-        result = dict(base_env)
-    elif policy == EnvVarPolicy.CORE_ONLY:
-        result = {
-            k: v for k, v in base_env.items() if k in CORE_VARS or not _is_secret(k)
-        }
-    elif policy == EnvVarPolicy.INHERIT_NONE:
-        result = {}
-    else:
-        result = dict(base_env)
+    result = _POLICY_FN.get(policy, _inherit_all)(base_env)
 
     if explicit_vars:
         result.update(explicit_vars)
@@ -1,16 +1,18 @@
 """EnvironmentRegistry — in-memory mapping from instance names to backends.
 
-Supports register, get, destroy (with cleanup), destroy_all, and list_instances.
+Supports register, get (or registry[name]), destroy (with cleanup),
+destroy_all, and list_instances.
 Each instance carries a metadata dict slot for decorator config (Phase 4.1).
 """
 
 from __future__ import annotations
 
+import asyncio
+import logging
+from collections.abc import Iterator
 from dataclasses import dataclass, field
 from typing import Any
 
-import logging
-
 from .protocol import EnvironmentBackend
 
 logger = logging.getLogger(__name__)
@@ -42,21 +44,33 @@ class EnvironmentRegistry:
         owned: bool = True,
     ) -> None:
         """Register a backend instance. Raises ValueError on duplicate name."""
-        if name in self._instances:
-            raise ValueError(f"Instance '{name}' already exists")
-        self._instances[name] = EnvironmentInstance(
+        instance = EnvironmentInstance(
             name=name,
             backend=backend,
             env_type=env_type,
             metadata=metadata or {},
             owned=owned,
         )
+        # One hash probe both checks for and claims the name
+        if self._instances.setdefault(name, instance) is not instance:
+            raise ValueError(f"Instance '{name}' already exists")
 
     def get(self, name: str) -> EnvironmentBackend | None:
         """Get a backend by instance name, or None if not found."""
         instance = self._instances.get(name)
         return instance.backend if instance is not None else None
 
+    def __getitem__(self, name: str) -> EnvironmentBackend:
+        """Get a backend by instance name. Raises KeyError if not found.
+
+        The per-call dispatch path uses this: one dict subscript, no None
+        sentinel to test on the (common) hit path.
+        """
+        return self._instances[name].backend
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._instances
+
     async def destroy(self, name: str) -> None:
         """Destroy an instance: call backend.cleanup() and remove from registry.
 
@@ -72,33 +86,46 @@ class EnvironmentRegistry:
     async def destroy_all(self) -> None:
         """Destroy all owned instances. Unowned instances are kept.
 
-        Continues past individual failures.
+        Cleanups run concurrently, so teardown takes as long as the slowest
+        backend rather than the sum of all. Continues past individual
+        failures and re-raises the first (in registration order).
         """
         names = [name for name, inst in self._instances.items() if inst.owned]
-        first_error: Exception | None = None
-        for name in names:
-            try:
-                await self.destroy(name)
-            except Exception as exc:
-                logger.warning("registry: cleanup failed for '%s': %s", name, exc)
+        results = await asyncio.gather(
+            *(self.destroy(name) for name in names), return_exceptions=True
+        )
+        first_error: BaseException | None = None
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                logger.warning("registry: cleanup failed for '%s': %s", name, result)
                 if first_error is None:
-                    first_error = exc
+                    first_error = result
         if first_error is not None:
             raise first_error
 
-    def list_instances(self) -> list[dict[str, Any]]:
-        """Return a list of dicts describing all registered instances.
+    def names(self) -> list[str]:
+        """Return the registered instance names, without calling info()."""
+        return list(self._instances)
 
-        Each dict contains name, type, metadata, and merged backend.info() fields.
+    def iter_instances(self) -> Iterator[dict[str, Any]]:
+        """Yield a dict describing each registered instance, lazily.
+
+        Each dict contains name, type, metadata, and merged backend.info()
+        fields. The info() result is copied, not mutated: backends and
+        wrappers may hand back a dict they keep.
         """
-        result = []
         for instance in self._instances.values():
-            entry: dict[str, Any] = {
+            yield {
                 **instance.backend.info(),
                 "name": instance.name,
                 "type": instance.env_type,
                 "metadata": instance.metadata,
                 "owned": instance.owned,
             }
-            result.append(entry)
-        return result
+
+    def list_instances(self) -> list[dict[str, Any]]:
+        """Return a list of dicts describing all registered instances.
+
+        Each dict contains name, type, metadata, and merged backend.info() fields.
+        """
+        return list(self.iter_instances())
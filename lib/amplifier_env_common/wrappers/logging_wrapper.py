@@ -6,13 +6,205 @@ NLSpec Section 4.4: LoggingExecutionEnvironment pattern.
 
 from __future__ import annotations
 
+import asyncio
+import atexit
+import functools
 import logging
+import queue
+import threading
 import time
-from typing import Any
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Literal
 
 from ..models import EnvExecResult, EnvFileEntry
 from ..protocol import EnvironmentBackend
 
+# Loggers by name. logging.getLogger takes the module-wide lock on every
+# call; a plain dict read does not, and getLogger returns the same object
+# for a name anyway, so a racing fill is harmless.
+_loggers: dict[str, logging.Logger] = {}
+
+# Record queues whose threads are still running, stopped at interpreter exit.
+_live_queues: set[_RecordQueue] = set()
+
+
+OverflowPolicy = Literal["drop_oldest", "drop_newest", "block"]
+
+
+class _RecordQueue:
+    """One wrapper's bounded record queue, drained on a daemon thread.
+
+    The event loop only enqueues; the thread hands each record to
+    ``logger.handle``, so filters, handlers and propagation run there and the
+    logger's handler list is never touched. The thread takes whatever is
+    queued as one batch, then waits *flush_interval* seconds before the
+    next. When the queue is full, *overflow* drops the oldest or the newest
+    record, or blocks until the thread catches up. Dropped records are
+    counted, and each batch ends with a WARNING record giving the number
+    dropped since the last one.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        env_type: str,
+        size: int,
+        overflow: OverflowPolicy,
+        flush_interval: float,
+    ) -> None:
+        self._q: queue.Queue[logging.LogRecord | None] = queue.Queue(size)
+        self._logger = logger
+        self._env_type = env_type
+        self._overflow = overflow
+        self._flush_interval = flush_interval
+        self._stopping = threading.Event()
+        # Only the enqueuing side increments this and only the thread reads
+        # it, so no lock is needed; the thread tracks what it has reported.
+        self._dropped = 0
+        self._thread = threading.Thread(
+            target=self._drain,
+            name=f"{logger.name}-log-queue",
+            daemon=True,
+        )
+        self._thread.start()
+        _live_queues.add(self)
+
+    def put(self, record: logging.LogRecord) -> None:
+        q = self._q
+        if self._overflow == "block":
+            q.put(record)
+            return
+        while True:
+            try:
+                q.put_nowait(record)
+                return
+            except queue.Full:
+                self._dropped += 1
+                if self._overflow == "drop_newest":
+                    return
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                # The thread emptied it in between; that drop did not happen.
+                self._dropped -= 1
+
+    def _drain(self) -> None:
+        q = self._q
+        handle = self._logger.handle
+        reported = 0
+        while True:
+            batch = [q.get()]
+            while True:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            for record in batch:
+                if record is None:
+                    self._report_drops(handle, self._dropped - reported)
+                    return
+                handle(record)
+            dropped = self._dropped
+            self._report_drops(handle, dropped - reported)
+            reported = dropped
+            if self._flush_interval:
+                self._stopping.wait(self._flush_interval)
+
+    def _report_drops(
+        self, handle: Callable[[logging.LogRecord], None], count: int
+    ) -> None:
+        logger = self._logger
+        if count and logger.isEnabledFor(logging.WARNING):
+            fn, lno, func = _REPORT_DROPS_SITE
+            handle(
+                logger.makeRecord(
+                    logger.name,
+                    logging.WARNING,
+                    fn,
+                    lno,
+                    _formats(self._env_type).dropped,
+                    (count,),
+                    None,
+                    func,
+                    {"env": self._env_type, "dropped": count},
+                )
+            )
+
+    def stop(self) -> None:
+        """Hand over every queued record, then end the thread."""
+        _live_queues.discard(self)
+        if self._thread.is_alive():
+            self._stopping.set()
+            # The stop sentinel must not be lost to a full queue.
+            self._q.put(None)
+            self._thread.join()
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    """Flush the queues of wrappers that were never cleaned up."""
+    for record_queue in list(_live_queues):
+        record_queue.stop()
+
+
+# (pathname, lineno, funcName) given to a wrapper's records
+_Site = tuple[str, int, str]
+
+
+def _site(method: Callable[..., Any]) -> _Site:
+    code = method.__code__
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+_REPORT_DROPS_SITE = _site(_RecordQueue._report_drops)
+
+
+@dataclass(frozen=True, slots=True)
+class _Formats:
+    """Log format strings with the env type already in the prefix."""
+
+    exec: str
+    exec_done: str
+    read: str
+    write: str
+    edit: str
+    grep: str
+    cleanup: str
+    dropped: str
+
+
+@functools.cache
+def _formats(env_type: str) -> _Formats:
+    prefix = f"env [{env_type.replace('%', '%%')}]: "
+    return _Formats(
+        exec=prefix + "exec %s",
+        exec_done=prefix + "exec %s → exit %d in %dms",
+        read=prefix + "read %s",
+        write=prefix + "write %s (%d chars)",
+        edit=prefix + "edit %s",
+        grep=prefix + "grep %r",
+        cleanup=prefix + "cleanup",
+        dropped=prefix + "dropped %d log record(s), queue full",
+    )
+
+
+class _LazyRepr:
+    """repr() of a log argument, computed on first format and then reused."""
+
+    __slots__ = ("_obj", "_text")
+
+    def __init__(self, obj: object) -> None:
+        self._obj = obj
+        self._text: str | None = None
+
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = repr(self._obj)
+        return self._text
+
+    __repr__ = __str__
+
 
 class LoggingWrapper:
     """Logs operations passing through an environment backend.
@@ -20,17 +212,99 @@ class LoggingWrapper:
     Wraps any EnvironmentBackend and delegates all calls to the inner backend
     while logging before/after at appropriate levels. Noisy read-only metadata
     operations (file_exists, list_dir, glob_files) are not logged.
+
+    By default records are handled on the calling thread. With *buffer_size*
+    set, the wrapper instead owns a queue of that many records and a daemon
+    thread that hands them to the logger every *flush_interval_ms* (default
+    50), so handler I/O stays off the event loop. *overflow* (default
+    ``"drop_oldest"``) decides what happens when a slow handler lets the
+    queue fill; drops are counted and reported in a WARNING record.
+    cleanup() delivers what is queued and stops the thread.
+
+    Every record also carries its fields as attributes (``env``, ``cmd``,
+    ``path``, ``exit_code``, ``duration_ms``, ...) via ``extra=``, so
+    structured handlers can read them without formatting the message.
+
+    Each logged operation checks the logger level on every call (which is
+    also false while ``logger.disabled`` is set), so a disabled logger costs
+    one check per call and re-enabling it later takes effect immediately.
     """
 
-    def __init__(self, inner: EnvironmentBackend, logger_name: str = "env") -> None:
+    __slots__ = (
+        "_cleanup",
+        "_edit_file",
+        "_env_type",
+        "_exec_command",
+        "_fmt",
+        "_grep",
+        "_handle",
+        "_inner",
+        "_logger",
+        "_queue",
+        "_read_file",
+        "_write_file",
+    )
+
+    def __init__(
+        self,
+        inner: EnvironmentBackend,
+        logger_name: str = "env",
+        buffer_size: int | None = None,
+        overflow: OverflowPolicy | None = None,
+        flush_interval_ms: int | None = None,
+    ) -> None:
+        if buffer_size is None:
+            if overflow is not None or flush_interval_ms is not None:
+                raise ValueError("overflow and flush_interval_ms require buffer_size")
+        else:
+            if buffer_size < 1:
+                raise ValueError(f"buffer_size must be positive, got {buffer_size}")
+            if overflow is None:
+                overflow = "drop_oldest"
+            elif overflow not in ("drop_oldest", "drop_newest", "block"):
+                raise ValueError(f"Unknown overflow policy: {overflow!r}")
+            if flush_interval_ms is None:
+                flush_interval_ms = 50
+            elif flush_interval_ms < 0:
+                raise ValueError(
+                    f"flush_interval_ms must not be negative, got {flush_interval_ms}"
+                )
         self._inner = inner
-        self._logger = logging.getLogger(logger_name)
+        logger = _loggers.get(logger_name)
+        if logger is None:
+            logger = _loggers[logger_name] = logging.getLogger(logger_name)
+        self._logger = logger
+        # A backend's env_type never changes; resolve it once.
+        self._env_type = inner.env_type
+        if buffer_size is None:
+            self._queue = None
+            self._handle = logger.handle
+        else:
+            self._queue = _RecordQueue(
+                logger,
+                self._env_type,
+                buffer_size,
+                overflow,
+                flush_interval_ms / 1000,
+            )
+            self._handle = self._queue.put
+        # Format strings carry the env type, so it is not a per-call arg.
+        self._fmt = _formats(self._env_type)
+        # Bind the logged operations' targets once; each call then skips the
+        # lookup through self._inner. They are called positionally, in the
+        # EnvironmentBackend parameter order, to avoid a kwargs dict per call.
+        self._exec_command = inner.exec_command
+        self._read_file = inner.read_file
+        self._write_file = inner.write_file
+        self._edit_file = inner.edit_file
+        self._grep = inner.grep
+        self._cleanup = inner.cleanup
 
     # -- Metadata passthrough (no logging) ----------------------------------
 
     @property
     def env_type(self) -> str:
-        return self._inner.env_type
+        return self._env_type
 
     def working_directory(self) -> str:
         return self._inner.working_directory()
@@ -44,6 +318,42 @@ class LoggingWrapper:
     def info(self) -> dict[str, Any]:
         return self._inner.info()
 
+    def __getattr__(self, name: str) -> Any:
+        # Backend-specific extras beyond the protocol.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._inner, name)
+
+    # Records are built with makeRecord and passed to Logger.handle, which
+    # keeps filters, handler levels and propagation but skips the findCaller
+    # stack walk of Logger.info/debug. Instead each record is given the
+    # file, line and name of the operation that logged it (see _SITES), so
+    # %(pathname)s, %(lineno)d and %(funcName)s still say where it came from.
+
+    def _record(
+        self,
+        site: _Site,
+        level: int,
+        extra: dict[str, Any],
+        msg: str,
+        *args: object,
+    ) -> logging.LogRecord:
+        logger = self._logger
+        fn, lno, func = site
+        return logger.makeRecord(
+            logger.name, level, fn, lno, msg, args, None, func, extra
+        )
+
+    def _info(
+        self, site: _Site, extra: dict[str, Any], msg: str, *args: object
+    ) -> None:
+        self._handle(self._record(site, logging.INFO, extra, msg, *args))
+
+    def _debug(
+        self, site: _Site, extra: dict[str, Any], msg: str, *args: object
+    ) -> None:
+        self._handle(self._record(site, logging.DEBUG, extra, msg, *args))
+
     # -- Logged operations ---------------------------------------------------
 
     async def exec_command(
@@ -53,17 +363,28 @@ class LoggingWrapper:
         workdir: str | None = None,
         env_vars: dict[str, str] | None = None,
     ) -> EnvExecResult:
-        instance = self.env_type
-        self._logger.info("env [%s]: exec %r", instance, cmd)
-        t0 = time.monotonic()
-        result = await self._inner.exec_command(
-            cmd, timeout=timeout, workdir=workdir, env_vars=env_vars
+        if not self._logger.isEnabledFor(logging.INFO):
+            return await self._exec_command(cmd, timeout, workdir, env_vars)
+        instance = self._env_type
+        # Both records share one lazy repr, so a long command is repr'd at
+        # most once, and not at all if no handler formats either record.
+        cmd_repr = _LazyRepr(cmd)
+        self._info(
+            _SITES.exec_command, {"env": instance, "cmd": cmd}, self._fmt.exec, cmd_repr
         )
-        duration_ms = int((time.monotonic() - t0) * 1000)
-        self._logger.info(
-            "env [%s]: exec %r → exit %d in %dms",
-            instance,
-            cmd,
+        t0 = time.monotonic_ns()
+        result = await self._exec_command(cmd, timeout, workdir, env_vars)
+        duration_ms = (time.monotonic_ns() - t0) // 1_000_000
+        self._info(
+            _SITES.exec_command,
+            {
+                "env": instance,
+                "cmd": cmd,
+                "exit_code": result.exit_code,
+                "duration_ms": duration_ms,
+            },
+            self._fmt.exec_done,
+            cmd_repr,
             result.exit_code,
             duration_ms,
         )
@@ -72,19 +393,36 @@ class LoggingWrapper:
     async def read_file(
         self, path: str, offset: int | None = None, limit: int | None = None
     ) -> str:
-        instance = self.env_type
-        self._logger.debug("env [%s]: read %s", instance, path)
-        return await self._inner.read_file(path, offset=offset, limit=limit)
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._debug(
+                _SITES.read_file,
+                {"env": self._env_type, "path": path},
+                self._fmt.read,
+                path,
+            )
+        return await self._read_file(path, offset, limit)
 
     async def write_file(self, path: str, content: str) -> None:
-        instance = self.env_type
-        self._logger.info("env [%s]: write %s (%d chars)", instance, path, len(content))
-        await self._inner.write_file(path, content)
+        if self._logger.isEnabledFor(logging.INFO):
+            chars = len(content)
+            self._info(
+                _SITES.write_file,
+                {"env": self._env_type, "path": path, "chars": chars},
+                self._fmt.write,
+                path,
+                chars,
+            )
+        await self._write_file(path, content)
 
     async def edit_file(self, path: str, old_string: str, new_string: str) -> str:
-        instance = self.env_type
-        self._logger.info("env [%s]: edit %s", instance, path)
-        return await self._inner.edit_file(path, old_string, new_string)
+        if self._logger.isEnabledFor(logging.INFO):
+            self._info(
+                _SITES.edit_file,
+                {"env": self._env_type, "path": path},
+                self._fmt.edit,
+                path,
+            )
+        return await self._edit_file(path, old_string, new_string)
 
     async def grep(
         self,
@@ -94,20 +432,27 @@ class LoggingWrapper:
         case_insensitive: bool = False,
         max_results: int | None = None,
     ) -> str:
-        instance = self.env_type
-        self._logger.debug("env [%s]: grep %r", instance, pattern)
-        return await self._inner.grep(
-            pattern,
-            path=path,
-            glob_filter=glob_filter,
-            case_insensitive=case_insensitive,
-            max_results=max_results,
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._debug(
+                _SITES.grep,
+                {"env": self._env_type, "pattern": pattern},
+                self._fmt.grep,
+                pattern,
+            )
+        return await self._grep(
+            pattern, path, glob_filter, case_insensitive, max_results
         )
 
     async def cleanup(self) -> None:
-        instance = self.env_type
-        self._logger.info("env [%s]: cleanup", instance)
-        await self._inner.cleanup()
+        if self._logger.isEnabledFor(logging.INFO):
+            self._info(_SITES.cleanup, {"env": self._env_type}, self._fmt.cleanup)
+        try:
+            await self._cleanup()
+        finally:
+            record_queue, self._queue = self._queue, None
+            if record_queue is not None:
+                self._handle = self._logger.handle
+                await asyncio.to_thread(record_queue.stop)
 
     # -- Silent operations (too noisy to log) --------------------------------
 
@@ -119,3 +464,25 @@ class LoggingWrapper:
 
     async def glob_files(self, pattern: str, path: str | None = None) -> list[str]:
         return await self._inner.glob_files(pattern, path=path)
+
+
+@dataclass(frozen=True, slots=True)
+class _Sites:
+    """Where each logged operation is defined, for its records."""
+
+    exec_command: _Site
+    read_file: _Site
+    write_file: _Site
+    edit_file: _Site
+    grep: _Site
+    cleanup: _Site
+
+
+_SITES = _Sites(
+    exec_command=_site(LoggingWrapper.exec_command),
+    read_file=_site(LoggingWrapper.read_file),
+    write_file=_site(LoggingWrapper.write_file),
+    edit_file=_site(LoggingWrapper.edit_file),
+    grep=_site(LoggingWrapper.grep),
+    cleanup=_site(LoggingWrapper.cleanup),
+)
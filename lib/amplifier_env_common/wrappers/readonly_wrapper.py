@@ -12,18 +12,28 @@ from typing import Any
 from ..models import EnvExecResult, EnvFileEntry
 from ..protocol import EnvironmentBackend
 
+_WRITE_DENIED_MSG = "Write operations disabled in read-only mode"
+
+# Backend-specific extras beyond the protocol that only read or run
+# commands. Any other extra, including a write-capable one added later,
+# is not reachable through the wrapper.
+_READ_EXTRAS = frozenset({"probe_platform"})
+
 
 class ReadOnlyWrapper:
     """Rejects all write operations. Read and exec pass through."""
 
+    __slots__ = ("_env_type", "_inner")
+
     def __init__(self, inner: EnvironmentBackend) -> None:
         self._inner = inner
+        self._env_type = inner.env_type
 
     # -- Metadata passthrough --------------------------------------------------
 
     @property
     def env_type(self) -> str:
-        return self._inner.env_type
+        return self._env_type
 
     def working_directory(self) -> str:
         return self._inner.working_directory()
@@ -37,13 +47,20 @@ class ReadOnlyWrapper:
     def info(self) -> dict[str, Any]:
         return self._inner.info()
 
+    def __getattr__(self, name: str) -> Any:
+        if name in _READ_EXTRAS:
+            return getattr(self._inner, name)
+        raise AttributeError(
+            f"{type(self).__name__!r} object has no attribute {name!r}"
+        )
+
     # -- Blocked operations (write) --------------------------------------------
 
     async def write_file(self, path: str, content: str) -> None:
-        raise PermissionError("Write operations disabled in read-only mode")
+        raise PermissionError(_WRITE_DENIED_MSG)
 
     async def edit_file(self, path: str, old_string: str, new_string: str) -> str:
-        raise PermissionError("Write operations disabled in read-only mode")
+        raise PermissionError(_WRITE_DENIED_MSG)
 
     # -- Passthrough operations (read + exec) ----------------------------------
 
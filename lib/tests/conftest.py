@@ -0,0 +1,131 @@
+"""Shared pytest configuration for the amplifier_env_common tests."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+import pytest_asyncio
+
+from amplifier_env_common.models import EnvExecResult, EnvFileEntry
+
+_TESTS_DIR = Path(__file__).parent
+
+
+def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
+    # Async tests under lib/tests share one session-wide event loop instead of
+    # paying for a fresh loop per test. The ssh connection pool and the docker
+    # compose-destroy map are per loop, so they live for the whole session:
+    # tests that open pooled connections or start destroys must finish them.
+    # The repo-level tests/ tree keeps pytest-asyncio's per-test loops.
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if pytest_asyncio.is_async_test(item) and item.path.is_relative_to(_TESTS_DIR):
+            item.add_marker(session_loop, append=False)
+
+
+# ---------------------------------------------------------------------------
+# FakeBackend shared by the wrapper tests
+# ---------------------------------------------------------------------------
+
+
+class FakeBackend:
+    """Implements EnvironmentBackend and records all calls for assertion."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, tuple, dict]] = []
+
+    @property
+    def env_type(self) -> str:
+        return "fake"
+
+    def working_directory(self) -> str:
+        return "/fake/work"
+
+    def platform(self) -> str:
+        return "linux"
+
+    def os_version(self) -> str:
+        return "FakeOS 1.0"
+
+    async def exec_command(
+        self,
+        cmd: str,
+        timeout: float | None = None,
+        workdir: str | None = None,
+        env_vars: dict[str, str] | None = None,
+    ) -> EnvExecResult:
+        self.calls.append(
+            (
+                "exec_command",
+                (cmd,),
+                {"timeout": timeout, "workdir": workdir, "env_vars": env_vars},
+            )
+        )
+        return EnvExecResult(stdout="hello", stderr="", exit_code=0, duration_ms=42)
+
+    async def read_file(
+        self, path: str, offset: int | None = None, limit: int | None = None
+    ) -> str:
+        self.calls.append(("read_file", (path,), {"offset": offset, "limit": limit}))
+        return "file content"
+
+    async def write_file(self, path: str, content: str) -> None:
+        self.calls.append(("write_file", (path, content), {}))
+
+    async def edit_file(self, path: str, old_string: str, new_string: str) -> str:
+        self.calls.append(("edit_file", (path, old_string, new_string), {}))
+        return "replaced 1 occurrence"
+
+    async def file_exists(self, path: str) -> bool:
+        self.calls.append(("file_exists", (path,), {}))
+        return True
+
+    async def list_dir(self, path: str, depth: int = 1) -> list[EnvFileEntry]:
+        self.calls.append(("list_dir", (path,), {"depth": depth}))
+        return [EnvFileEntry(name="a.txt", entry_type="file")]
+
+    async def grep(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob_filter: str | None = None,
+        case_insensitive: bool = False,
+        max_results: int | None = None,
+    ) -> str:
+        self.calls.append(
+            (
+                "grep",
+                (pattern,),
+                {
+                    "path": path,
+                    "glob_filter": glob_filter,
+                    "case_insensitive": case_insensitive,
+                    "max_results": max_results,
+                },
+            )
+        )
+        return "match:1: foo"
+
+    async def glob_files(self, pattern: str, path: str | None = None) -> list[str]:
+        self.calls.append(("glob_files", (pattern,), {"path": path}))
+        return ["a.txt"]
+
+    async def cleanup(self) -> None:
+        self.calls.append(("cleanup", (), {}))
+
+    def info(self) -> dict[str, Any]:
+        return {"type": "fake", "working_dir": "/fake/work"}
+
+
+@pytest.fixture
+def fake() -> FakeBackend:
+    """A fresh FakeBackend, so every test sees only its own calls."""
+    return FakeBackend()
+
+
+@pytest.fixture(scope="module")
+def shared_fake() -> FakeBackend:
+    """One FakeBackend per module for tests that never inspect ``calls``."""
+    return FakeBackend()
@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+from collections import deque
+from typing import NamedTuple
 
 import pytest
 
+from amplifier_env_common.backends import docker as docker_mod
 from amplifier_env_common.backends.docker import DockerBackend
 from amplifier_env_common.models import EnvExecResult, EnvFileEntry
 from amplifier_env_common.protocol import EnvironmentBackend
@@ -16,8 +19,7 @@ from amplifier_env_common.protocol import EnvironmentBackend
 # ---------------------------------------------------------------------------
 
 
-@dataclass
-class FakeToolResult:
+class FakeToolResult(NamedTuple):
     """Mimics the ToolResult shape returned by containers tool."""
 
     success: bool
@@ -25,31 +27,66 @@ class FakeToolResult:
     error: dict | None = None
 
 
+# Unscripted responses are shared: DockerBackend only reads them.
+_DEFAULT_EXEC = FakeToolResult(
+    success=True, output={"stdout": "", "stderr": "", "exit_code": 0}
+)
+_COLUMNS = ("operation", "container", "command")
+_DESTROYED = FakeToolResult(success=True, output="destroyed")
+_EMPTY = FakeToolResult(success=True, output={})
+
+
 class FakeContainersTool:
     """Records invocations and returns scripted responses for containers tool."""
 
     def __init__(self) -> None:
-        self.calls: list[dict] = []
-        self.exec_responses: list[dict] = []
+        # One column per field the tests assert on; anything else goes to
+        # extras. ``calls`` rebuilds the original input dicts on demand.
+        self.operations: list[str | None] = []
+        self.containers: list[str | None] = []
+        self.commands: list[str | None] = []
+        self.extras: list[dict] = []
+        self.exec_responses: deque[FakeToolResult] = deque()
+
+    @property
+    def calls(self) -> list[dict]:
+        calls = []
+        for row in zip(self.operations, self.containers, self.commands, self.extras):
+            call = {k: v for k, v in zip(_COLUMNS, row) if v is not None}
+            call.update(row[3])
+            calls.append(call)
+        return calls
+
+    def reset(self) -> None:
+        self.operations.clear()
+        self.containers.clear()
+        self.commands.clear()
+        self.extras.clear()
+        self.exec_responses.clear()
 
     def add_exec_response(
         self, stdout: str = "", stderr: str = "", exit_code: int = 0
     ) -> None:
         self.exec_responses.append(
-            {"stdout": stdout, "stderr": stderr, "exit_code": exit_code}
+            FakeToolResult(
+                success=True,
+                output={"stdout": stdout, "stderr": stderr, "exit_code": exit_code},
+            )
         )
 
     async def invoke(self, input_dict: dict) -> FakeToolResult:
-        self.calls.append(input_dict)
-        if input_dict.get("operation") == "exec":
+        operation = input_dict.get("operation")
+        self.operations.append(operation)
+        self.containers.append(input_dict.get("container"))
+        self.commands.append(input_dict.get("command"))
+        self.extras.append({k: v for k, v in input_dict.items() if k not in _COLUMNS})
+        if operation == "exec":
             if self.exec_responses:
-                output = self.exec_responses.pop(0)
-            else:
-                output = {"stdout": "", "stderr": "", "exit_code": 0}
-            return FakeToolResult(success=True, output=output)
-        if input_dict.get("operation") == "destroy":
-            return FakeToolResult(success=True, output="destroyed")
-        return FakeToolResult(success=True, output={})
+                return self.exec_responses.popleft()
+            return _DEFAULT_EXEC
+        if operation == "destroy":
+            return _DESTROYED
+        return _EMPTY
 
 
 # ---------------------------------------------------------------------------
@@ -57,12 +94,18 @@ class FakeContainersTool:
 # ---------------------------------------------------------------------------
 
 
-@pytest.fixture
+def assert_contains_all(text: str, *needles: str) -> None:
+    """Assert every needle occurs in *text*, reporting all that are missing."""
+    missing = [n for n in needles if n not in text]
+    assert not missing, f"{missing} not found in {text!r}"
+
+
+@pytest.fixture(scope="module")
 def fake_tool():
     return FakeContainersTool()
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def backend(fake_tool):
     return DockerBackend(
         containers_invoke=fake_tool.invoke,
@@ -70,6 +113,12 @@ def backend(fake_tool):
     )
 
 
+@pytest.fixture(autouse=True)
+def _reset(fake_tool):
+    """Give every test a clean tool despite the module scope."""
+    fake_tool.reset()
+
+
 # ---------------------------------------------------------------------------
 # Protocol conformance
 # ---------------------------------------------------------------------------
@@ -93,38 +142,56 @@ class TestProtocolConformance:
 class TestExecCommand:
     """exec_command sends correct exec operation via containers tool."""
 
-    @pytest.mark.asyncio
-    async def test_sends_exec_operation(self, backend, fake_tool):
-        fake_tool.add_exec_response(stdout="hello\n", stderr="", exit_code=0)
-        result = await backend.exec_command("echo hello")
+    @pytest.mark.parametrize(
+        "stdout,stderr,exit_code",
+        [("hello\n", "", 0), ("", "error msg", 1)],
+    )
+    async def test_returns_tool_output(
+        self, backend, fake_tool, stdout, stderr, exit_code
+    ):
+        fake_tool.add_exec_response(stdout=stdout, stderr=stderr, exit_code=exit_code)
+        result = await backend.exec_command("cmd")
         assert isinstance(result, EnvExecResult)
-        assert result.stdout == "hello\n"
-        assert result.stderr == ""
-        assert result.exit_code == 0
-
-    @pytest.mark.asyncio
-    async def test_captures_stderr_and_exit_code(self, backend, fake_tool):
-        fake_tool.add_exec_response(stdout="", stderr="error msg", exit_code=1)
-        result = await backend.exec_command("failing_cmd")
-        assert result.stderr == "error msg"
-        assert result.exit_code == 1
-
-    @pytest.mark.asyncio
+        assert result.stdout == stdout
+        assert result.stderr == stderr
+        assert result.exit_code == exit_code
+
     async def test_passes_container_and_command(self, backend, fake_tool):
         fake_tool.add_exec_response(stdout="ok")
         await backend.exec_command("ls -la")
-        call = fake_tool.calls[0]
-        assert call["operation"] == "exec"
-        assert call["container"] == "test-container-123"
-        assert call["command"] == "ls -la"
+        assert fake_tool.operations == ["exec"]
+        assert fake_tool.containers == ["test-container-123"]
+        assert fake_tool.commands == ["ls -la"]
 
-    @pytest.mark.asyncio
     async def test_passes_timeout_and_workdir(self, backend, fake_tool):
         fake_tool.add_exec_response()
         await backend.exec_command("pwd", timeout=30.0, workdir="/tmp")
-        call = fake_tool.calls[0]
-        assert call["timeout"] == 30.0
-        assert call["workdir"] == "/tmp"
+        extra = fake_tool.extras[0]
+        assert extra["timeout"] == 30.0
+        assert extra["workdir"] == "/tmp"
+
+
+# ---------------------------------------------------------------------------
+# Local-shell containers tool
+# ---------------------------------------------------------------------------
+
+
+async def _shell_invoke(input_dict: dict) -> FakeToolResult:
+    """Containers-tool stand-in that runs exec commands in a local shell."""
+    proc = await asyncio.create_subprocess_shell(
+        input_dict["command"],
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await proc.communicate()
+    return FakeToolResult(
+        success=True,
+        output={
+            "stdout": stdout.decode(),
+            "stderr": stderr.decode(),
+            "exit_code": proc.returncode,
+        },
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -135,46 +202,39 @@ class TestExecCommand:
 class TestReadFile:
     """read_file translates to cat command."""
 
-    @pytest.mark.asyncio
     async def test_simple_cat(self, backend, fake_tool):
         fake_tool.add_exec_response(stdout="file content\n")
         content = await backend.read_file("/workspace/hello.txt")
         assert content == "file content\n"
-        call = fake_tool.calls[0]
-        assert "cat" in call["command"]
-        assert "/workspace/hello.txt" in call["command"]
-
-    @pytest.mark.asyncio
-    async def test_with_offset_and_limit(self, backend, fake_tool):
-        fake_tool.add_exec_response(stdout="line2\nline3\n")
-        content = await backend.read_file("/workspace/f.txt", offset=2, limit=2)
-        assert content == "line2\nline3\n"
-        cmd = fake_tool.calls[0]["command"]
-        assert "tail -n +2" in cmd
-        assert "head -n 2" in cmd
-
-    @pytest.mark.asyncio
-    async def test_with_offset_only(self, backend, fake_tool):
-        fake_tool.add_exec_response(stdout="line2\nline3\n")
-        content = await backend.read_file("/workspace/f.txt", offset=2)
-        assert content == "line2\nline3\n"
-        cmd = fake_tool.calls[0]["command"]
-        assert "tail -n +2" in cmd
-
-    @pytest.mark.asyncio
-    async def test_with_limit_only(self, backend, fake_tool):
-        fake_tool.add_exec_response(stdout="line1\n")
-        content = await backend.read_file("/workspace/f.txt", limit=1)
-        assert content == "line1\n"
-        cmd = fake_tool.calls[0]["command"]
-        assert "head -n 1" in cmd
-
-    @pytest.mark.asyncio
+        cmd = fake_tool.commands[0]
+        assert_contains_all(cmd, "cat", "/workspace/hello.txt")
+
+    @pytest.mark.parametrize(
+        "kwargs,expected_cmd",
+        [
+            ({"offset": 2, "limit": 2}, "sed -n '2,3p;4q' /workspace/f.txt"),
+            ({"offset": 2}, "tail -n +2"),
+            ({"limit": 1}, "head -n 1"),
+        ],
+    )
+    async def test_offset_and_limit(self, backend, fake_tool, kwargs, expected_cmd):
+        fake_tool.add_exec_response(stdout="line2\n")
+        content = await backend.read_file("/workspace/f.txt", **kwargs)
+        assert content == "line2\n"
+        assert expected_cmd in fake_tool.commands[0]
+
+    async def test_sed_range_reads_expected_lines(self, tmp_path):
+        target = tmp_path / "f.txt"
+        target.write_text("".join(f"line{i}\n" for i in range(1, 11)))
+        backend = DockerBackend(containers_invoke=_shell_invoke, container_id="c")
+        content = await backend.read_file(str(target), offset=3, limit=2)
+        assert content == "line3\nline4\n"
+
     async def test_shell_quoting(self, backend, fake_tool):
         """Paths with spaces must be shell-quoted."""
         fake_tool.add_exec_response(stdout="data")
         await backend.read_file("/workspace/my file.txt")
-        cmd = fake_tool.calls[0]["command"]
+        cmd = fake_tool.commands[0]
         # shlex.quote wraps in single quotes
         assert "'/workspace/my file.txt'" in cmd
 
@@ -185,26 +245,39 @@ class TestReadFile:
 
 
 class TestWriteFile:
-    """write_file translates to mkdir -p + printf."""
+    """write_file translates to mkdir -p + base64-decoded printf."""
 
-    @pytest.mark.asyncio
     async def test_writes_with_printf(self, backend, fake_tool):
         fake_tool.add_exec_response()
         await backend.write_file("/workspace/a/b/out.txt", "hello world")
-        call = fake_tool.calls[0]
-        cmd = call["command"]
-        assert "printf" in cmd
-        assert "mkdir -p" in cmd
-        assert "/workspace/a/b/out.txt" in cmd
-
-    @pytest.mark.asyncio
-    async def test_no_mkdir_for_root_level_file(self, backend, fake_tool):
-        """Files without '/' in path skip mkdir -p."""
+        cmd = fake_tool.commands[0]
+        assert_contains_all(cmd, "printf", "mkdir -p", "/workspace/a/b/out.txt")
+
+    async def test_content_sent_as_base64(self, backend, fake_tool):
+        import base64
+
+        content = 'it\'s "quoted" $HOME `x`\n'
+        await backend.write_file("/workspace/q.txt", content)
+        cmd = fake_tool.commands[0]
+        encoded = base64.b64encode(content.encode()).decode()
+        assert encoded in cmd
+        assert "base64 -d > /workspace/q.txt" in cmd
+
+    async def test_content_roundtrips_through_shell(self, tmp_path):
+        backend = DockerBackend(containers_invoke=_shell_invoke, container_id="c")
+        content = 'it\'s "quoted" $HOME `x` \\n ünïcode\n'
+        target = tmp_path / "sub" / "q.txt"
+        await backend.write_file(str(target), content)
+        assert target.read_text() == content
+
+    async def test_root_level_file_single_exec(self, backend, fake_tool):
+        """Files without '/' in path still use one mkdir+printf command."""
         fake_tool.add_exec_response()
         await backend.write_file("simple.txt", "content")
-        cmd = fake_tool.calls[0]["command"]
+        assert len(fake_tool.operations) == 1
+        cmd = fake_tool.commands[0]
         assert "printf" in cmd
-        assert "mkdir" not in cmd
+        assert 'mkdir -p "$(dirname simple.txt)"' in cmd
 
 
 # ---------------------------------------------------------------------------
@@ -215,27 +288,24 @@ class TestWriteFile:
 class TestEditFile:
     """edit_file reads via cat, patches in Python, writes back."""
 
-    @pytest.mark.asyncio
     async def test_read_modify_write(self, backend, fake_tool):
         # Response 1: cat reads existing content
         fake_tool.add_exec_response(stdout="hello world")
         # Response 2: printf writes patched content
         fake_tool.add_exec_response()
         result = await backend.edit_file("/workspace/edit.txt", "hello", "goodbye")
-        assert len(fake_tool.calls) == 2
+        assert len(fake_tool.operations) == 2
         # First call: cat to read
-        assert "cat" in fake_tool.calls[0]["command"]
-        # Second call: printf to write
-        assert "printf" in fake_tool.calls[1]["command"]
+        assert "cat" in fake_tool.commands[0]
+        # Second call: mkdir + printf to write, fused into one exec
+        assert_contains_all(fake_tool.commands[1], "mkdir -p", "printf")
         assert "Edited" in result or "replaced" in result
 
-    @pytest.mark.asyncio
     async def test_string_not_found_raises(self, backend, fake_tool):
         fake_tool.add_exec_response(stdout="hello world")
         with pytest.raises(ValueError, match="not found"):
             await backend.edit_file("/workspace/edit.txt", "nonexistent", "replacement")
 
-    @pytest.mark.asyncio
     async def test_string_not_unique_raises(self, backend, fake_tool):
         fake_tool.add_exec_response(stdout="aaa bbb aaa")
         with pytest.raises(ValueError, match="not unique"):
@@ -250,19 +320,25 @@ class TestEditFile:
 class TestFileExists:
     """file_exists translates to test -e, exit code determines result."""
 
-    @pytest.mark.asyncio
     async def test_exists_returns_true(self, backend, fake_tool):
         fake_tool.add_exec_response(exit_code=0)
         result = await backend.file_exists("/workspace/exists.txt")
         assert result is True
-        assert "test -e" in fake_tool.calls[0]["command"]
+        assert "test -e" in fake_tool.commands[0]
 
-    @pytest.mark.asyncio
     async def test_not_exists_returns_false(self, backend, fake_tool):
         fake_tool.add_exec_response(exit_code=1)
         result = await backend.file_exists("/workspace/nope.txt")
         assert result is False
 
+    async def test_every_call_probes_the_container(self, backend, fake_tool):
+        """Answers are never reused, so changes made outside are seen."""
+        fake_tool.add_exec_response(exit_code=0)
+        fake_tool.add_exec_response(exit_code=1)
+        assert await backend.file_exists("/workspace/a.txt") is True
+        assert await backend.file_exists("/workspace/a.txt") is False
+        assert len(fake_tool.operations) == 2
+
 
 # ---------------------------------------------------------------------------
 # list_dir
@@ -272,7 +348,6 @@ class TestFileExists:
 class TestListDir:
     """list_dir translates to ls -1ap and parses output."""
 
-    @pytest.mark.asyncio
     async def test_parses_ls_output(self, backend, fake_tool):
         fake_tool.add_exec_response(stdout="./\n../\nfile.txt\nsubdir/\n")
         entries = await backend.list_dir("/workspace")
@@ -285,7 +360,6 @@ class TestListDir:
         assert "." not in names
         assert ".." not in names
 
-    @pytest.mark.asyncio
     async def test_entry_types(self, backend, fake_tool):
         fake_tool.add_exec_response(stdout="readme.md\nsrc/\n")
         entries = await backend.list_dir("/workspace")
@@ -293,13 +367,11 @@ class TestListDir:
         assert by_name["readme.md"].entry_type == "file"
         assert by_name["src"].entry_type == "dir"
 
-    @pytest.mark.asyncio
     async def test_sends_ls_command(self, backend, fake_tool):
         fake_tool.add_exec_response(stdout="")
         await backend.list_dir("/workspace/subdir")
-        cmd = fake_tool.calls[0]["command"]
-        assert "ls -1ap" in cmd
-        assert "/workspace/subdir" in cmd
+        cmd = fake_tool.commands[0]
+        assert_contains_all(cmd, "ls -1ap", "/workspace/subdir")
 
 
 # ---------------------------------------------------------------------------
@@ -310,28 +382,23 @@ class TestListDir:
 class TestGrep:
     """grep translates to grep -rn."""
 
-    @pytest.mark.asyncio
     async def test_finds_matches(self, backend, fake_tool):
         fake_tool.add_exec_response(stdout="/workspace/f.py:1:needle\n")
         result = await backend.grep("needle", path="/workspace")
         assert "needle" in result
-        cmd = fake_tool.calls[0]["command"]
-        assert "grep" in cmd
-        assert "-rn" in cmd
+        cmd = fake_tool.commands[0]
+        assert_contains_all(cmd, "grep", "-rn")
 
-    @pytest.mark.asyncio
     async def test_no_match_returns_message(self, backend, fake_tool):
         fake_tool.add_exec_response(stdout="", exit_code=1)
         result = await backend.grep("nonexistent", path="/workspace")
         assert "No matches" in result
 
-    @pytest.mark.asyncio
     async def test_glob_filter(self, backend, fake_tool):
         fake_tool.add_exec_response(stdout="match\n")
         await backend.grep("pattern", path="/workspace", glob_filter="*.py")
-        cmd = fake_tool.calls[0]["command"]
-        assert "--include" in cmd
-        assert "*.py" in cmd
+        cmd = fake_tool.commands[0]
+        assert_contains_all(cmd, "--include", "*.py")
 
 
 # ---------------------------------------------------------------------------
@@ -342,25 +409,41 @@ class TestGrep:
 class TestGlobFiles:
     """glob_files translates to find -name."""
 
-    @pytest.mark.asyncio
     async def test_parses_find_output(self, backend, fake_tool):
         fake_tool.add_exec_response(stdout="/workspace/a.py\n/workspace/sub/b.py\n")
         matches = await backend.glob_files("*.py", path="/workspace")
         assert "/workspace/a.py" in matches
         assert "/workspace/sub/b.py" in matches
 
-    @pytest.mark.asyncio
     async def test_strips_recursive_prefix(self, backend, fake_tool):
         """Patterns like **/*.py should strip **/ for find -name."""
         fake_tool.add_exec_response(stdout="")
         await backend.glob_files("**/*.py", path="/workspace")
-        cmd = fake_tool.calls[0]["command"]
-        assert "find" in cmd
-        assert "-name" in cmd
+        cmd = fake_tool.commands[0]
+        assert_contains_all(cmd, "find", "-name")
         # The **/ prefix should be stripped since find is already recursive
         assert "**/" not in cmd
 
-    @pytest.mark.asyncio
+    async def test_top_level_pattern_uses_shell_glob(self, backend, fake_tool):
+        fake_tool.add_exec_response(stdout="/workspace/a.py\n")
+        await backend.glob_files("*.py", path="/workspace")
+        cmd = fake_tool.commands[0]
+        assert cmd.startswith("ls -1d -- /workspace/*.py")
+        assert "find" not in cmd
+
+    async def test_shell_glob_quotes_literal_parts(self, tmp_path):
+        (tmp_path / "a b.py").write_text("")
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "c.py").write_text("")
+        backend = DockerBackend(containers_invoke=_shell_invoke, container_id="c")
+        matches = await backend.glob_files("a b*.py", path=str(tmp_path))
+        assert matches == [f"{tmp_path}/a b.py"]
+        assert await backend.glob_files("*.py; echo pwned", path=str(tmp_path)) == []
+        # Top-level only, like pathlib's glob in LocalBackend
+        assert await backend.glob_files("*.py", path=str(tmp_path)) == [
+            f"{tmp_path}/a b.py"
+        ]
+
     async def test_empty_output_returns_empty_list(self, backend, fake_tool):
         fake_tool.add_exec_response(stdout="")
         matches = await backend.glob_files("*.nonexistent", path="/workspace")
@@ -375,13 +458,10 @@ class TestGlobFiles:
 class TestCleanup:
     """cleanup calls containers destroy."""
 
-    @pytest.mark.asyncio
     async def test_calls_destroy(self, backend, fake_tool):
         await backend.cleanup()
-        assert len(fake_tool.calls) == 1
-        call = fake_tool.calls[0]
-        assert call["operation"] == "destroy"
-        assert call["container"] == "test-container-123"
+        assert fake_tool.operations == ["destroy"]
+        assert fake_tool.containers == ["test-container-123"]
 
 
 # ---------------------------------------------------------------------------
@@ -438,13 +518,11 @@ class TestMetadata:
 class TestExecTiming:
     """exec_command returns timed_out and duration_ms fields."""
 
-    @pytest.mark.asyncio
     async def test_exec_has_duration_ms(self, backend, fake_tool):
         fake_tool.add_exec_response(stdout="ok")
         result = await backend.exec_command("echo ok")
         assert result.duration_ms >= 0
 
-    @pytest.mark.asyncio
     async def test_exec_has_timed_out_false(self, backend, fake_tool):
         fake_tool.add_exec_response(stdout="ok")
         result = await backend.exec_command("echo ok")
@@ -454,33 +532,28 @@ class TestExecTiming:
 class TestExecEnvVars:
     """exec_command with env_vars prepends export statements."""
 
-    @pytest.mark.asyncio
     async def test_exec_with_env_vars(self, backend, fake_tool):
         fake_tool.add_exec_response(stdout="val")
         await backend.exec_command(
             "echo $MY_VAR", env_vars={"MY_VAR": "hello", "OTHER": "world"}
         )
-        cmd = fake_tool.calls[0]["command"]
-        assert "export MY_VAR=" in cmd
-        assert "export OTHER=" in cmd
-        assert "echo $MY_VAR" in cmd
+        cmd = fake_tool.commands[0]
+        assert_contains_all(cmd, "export MY_VAR=", "export OTHER=", "echo $MY_VAR")
         # Exports should come before the actual command
         export_pos = cmd.index("export")
         echo_pos = cmd.index("echo")
         assert export_pos < echo_pos
 
-    @pytest.mark.asyncio
     async def test_exec_without_env_vars_unchanged(self, backend, fake_tool):
         fake_tool.add_exec_response(stdout="ok")
         await backend.exec_command("echo ok")
-        cmd = fake_tool.calls[0]["command"]
+        cmd = fake_tool.commands[0]
         assert cmd == "echo ok"
 
-    @pytest.mark.asyncio
     async def test_exec_env_vars_values_are_quoted(self, backend, fake_tool):
         fake_tool.add_exec_response(stdout="ok")
         await backend.exec_command("echo test", env_vars={"KEY": "value with spaces"})
-        cmd = fake_tool.calls[0]["command"]
+        cmd = fake_tool.commands[0]
         # shlex.quote wraps in single quotes
         assert "'value with spaces'" in cmd
 
@@ -493,35 +566,33 @@ class TestExecEnvVars:
 class TestListDirDepth:
     """list_dir with depth parameter."""
 
-    @pytest.mark.asyncio
-    async def test_list_dir_depth_1_uses_ls(self, backend, fake_tool):
-        """Default depth=1 still uses ls -1ap (existing behavior)."""
-        fake_tool.add_exec_response(stdout="file.txt\nsubdir/\n")
-        await backend.list_dir("/workspace")
-        cmd = fake_tool.calls[0]["command"]
-        assert "ls -1ap" in cmd
-
-    @pytest.mark.asyncio
-    async def test_list_dir_depth_2_uses_find(self, backend, fake_tool):
-        """depth > 1 uses find -maxdepth."""
-        fake_tool.add_exec_response(
-            stdout="/workspace/file.txt\n/workspace/sub\n/workspace/sub/inner.py\n"
-        )
-        await backend.list_dir("/workspace", depth=2)
-        cmd = fake_tool.calls[0]["command"]
-        assert "find" in cmd
-        assert "-maxdepth 2" in cmd
-        assert "-mindepth 1" in cmd
+    @pytest.mark.parametrize(
+        "depth,fragments",
+        [
+            # Default depth=1 still uses ls -1ap (existing behavior)
+            (1, ["ls -1ap"]),
+            # depth > 1 uses find, with types printed alongside the paths
+            (2, ["find", "-maxdepth 2", "-mindepth 1", "-printf"]),
+        ],
+    )
+    async def test_single_exec_command(self, backend, fake_tool, depth, fragments):
+        fake_tool.add_exec_response(stdout="")
+        await backend.list_dir("/workspace", depth=depth)
+        assert len(fake_tool.operations) == 1
+        cmd = fake_tool.commands[0]
+        assert_contains_all(cmd, *fragments)
 
-    @pytest.mark.asyncio
     async def test_list_dir_depth_2_parses_find_output(self, backend, fake_tool):
         """find output is parsed into EnvFileEntry list."""
-        fake_tool.add_exec_response(stdout="/workspace/file.txt\n/workspace/sub\n")
-        # We also need a response for the file-type detection command
-        fake_tool.add_exec_response(stdout="/workspace/sub\n")
+        fake_tool.add_exec_response(
+            stdout="f\t/workspace/file.txt\nd\t/workspace/sub\n"
+        )
         entries = await backend.list_dir("/workspace", depth=2)
         assert isinstance(entries, list)
         assert all(isinstance(e, EnvFileEntry) for e in entries)
+        by_name = {e.name: e for e in entries}
+        assert by_name["file.txt"].entry_type == "file"
+        assert by_name["sub"].entry_type == "dir"
 
 
 # ---------------------------------------------------------------------------
@@ -532,37 +603,23 @@ class TestListDirDepth:
 class TestGrepParams:
     """grep with case_insensitive and max_results parameters."""
 
-    @pytest.mark.asyncio
-    async def test_grep_case_insensitive(self, backend, fake_tool):
-        fake_tool.add_exec_response(stdout="/workspace/f.py:1:Match\n")
-        await backend.grep("pattern", path="/workspace", case_insensitive=True)
-        cmd = fake_tool.calls[0]["command"]
-        assert "-i" in cmd
-
-    @pytest.mark.asyncio
-    async def test_grep_case_sensitive_by_default(self, backend, fake_tool):
-        fake_tool.add_exec_response(stdout="/workspace/f.py:1:match\n")
-        await backend.grep("pattern", path="/workspace")
-        cmd = fake_tool.calls[0]["command"]
-        # -i should NOT be present when case_insensitive is not set
-        parts = cmd.split()
-        assert "-i" not in parts
-
-    @pytest.mark.asyncio
-    async def test_grep_max_results(self, backend, fake_tool):
-        fake_tool.add_exec_response(stdout="/workspace/f.py:1:match\n")
-        await backend.grep("pattern", path="/workspace", max_results=5)
-        cmd = fake_tool.calls[0]["command"]
-        assert "-m" in cmd
-        assert "5" in cmd
-
-    @pytest.mark.asyncio
-    async def test_grep_no_max_results_by_default(self, backend, fake_tool):
+    @pytest.mark.parametrize(
+        "kwargs,present,absent",
+        [
+            ({"case_insensitive": True}, ["-i"], []),
+            ({"max_results": 5}, ["-m", "5"], []),
+            # Neither flag is sent unless asked for
+            ({}, [], ["-i", "-m"]),
+        ],
+    )
+    async def test_flags(self, backend, fake_tool, kwargs, present, absent):
         fake_tool.add_exec_response(stdout="/workspace/f.py:1:match\n")
-        await backend.grep("pattern", path="/workspace")
-        cmd = fake_tool.calls[0]["command"]
-        parts = cmd.split()
-        assert "-m" not in parts
+        await backend.grep("pattern", path="/workspace", **kwargs)
+        parts = fake_tool.commands[0].split()
+        for flag in present:
+            assert flag in parts
+        for flag in absent:
+            assert flag not in parts
 
 
 # ---------------------------------------------------------------------------
@@ -570,10 +627,15 @@ class TestGrepParams:
 # ---------------------------------------------------------------------------
 
 
+async def _strand_destroy(project: str) -> None:
+    """Leave a destroy of *project* pending on the running loop."""
+    loop = asyncio.get_running_loop()
+    docker_mod._loop_compose_inflight()[project] = loop.create_future()
+
+
 class TestDockerComposeCleanup:
     """Verify compose-aware cleanup in DockerBackend."""
 
-    @pytest.mark.asyncio
     async def test_cleanup_with_compose_project_passes_project(self):
         """When compose_project is set, cleanup passes it to the destroy call."""
         fake = FakeContainersTool()
@@ -587,7 +649,42 @@ class TestDockerComposeCleanup:
         assert len(destroy_call) == 1
         assert destroy_call[0].get("compose_project") == "myproj"
 
-    @pytest.mark.asyncio
+    async def test_concurrent_cleanups_share_one_destroy(self):
+        """Backends on the same compose project coalesce overlapping cleanups."""
+        fake = FakeContainersTool()
+        backends = [
+            DockerBackend(
+                containers_invoke=fake.invoke,
+                container_id=f"myproj-svc{i}-1",
+                compose_project="myproj",
+            )
+            for i in range(3)
+        ]
+        await asyncio.gather(*(b.cleanup() for b in backends))
+        destroys = [c for c in fake.calls if c.get("operation") == "destroy"]
+        assert len(destroys) == 1
+        assert docker_mod._loop_compose_inflight() == {}
+
+        # A later cleanup after the first finished issues a fresh destroy.
+        await backends[0].cleanup()
+        destroys = [c for c in fake.calls if c.get("operation") == "destroy"]
+        assert len(destroys) == 2
+
+    def test_destroy_left_in_flight_by_another_loop_does_not_block(self):
+        """A destroy stranded on a closed loop is not awaited by a new loop."""
+        fake = FakeContainersTool()
+        backend = DockerBackend(
+            containers_invoke=fake.invoke,
+            container_id="myproj-web-1",
+            compose_project="myproj",
+        )
+        stale_loop = asyncio.new_event_loop()
+        stale_loop.run_until_complete(_strand_destroy("myproj"))
+        stale_loop.close()
+        asyncio.run(backend.cleanup())
+        destroys = [c for c in fake.calls if c.get("operation") == "destroy"]
+        assert len(destroys) == 1
+
     async def test_cleanup_without_compose_project_destroys_container(self):
         """When no compose_project, cleanup destroys the single container (existing behavior)."""
         fake = FakeContainersTool()
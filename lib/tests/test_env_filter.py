@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import pytest
 
 from amplifier_env_common.env_filter import EnvVarPolicy, filter_env_vars
 
@@ -29,77 +30,72 @@ class TestFilterInheritAll:
         assert result["MY_VAR"] == "new"
 
 
-class TestFilterCoreOnly:
-    def test_keeps_core_vars(self):
-        base = {"PATH": "/usr/bin", "HOME": "/home/user", "USER": "dev"}
-        result = filter_env_vars(EnvVarPolicy.CORE_ONLY, base)
-        assert "PATH" in result
-        assert "HOME" in result
-        assert "USER" in result
-
-    def test_filters_api_keys(self):
-        base = {
-            "PATH": "/usr/bin",
-            "OPENAI_API_KEY": "sk-123",
-            "ANTHROPIC_API_KEY": "sk-456",
-        }
-        result = filter_env_vars(EnvVarPolicy.CORE_ONLY, base)
-        assert "OPENAI_API_KEY" not in result
-        assert "ANTHROPIC_API_KEY" not in result
-        assert "PATH" in result
-
-    def test_filters_secrets(self):
-        base = {
-            "PATH": "/usr/bin",
-            "DB_PASSWORD": "pass",
-            "AWS_SECRET": "sec",
-            "AUTH_TOKEN": "tok",
-        }
-        result = filter_env_vars(EnvVarPolicy.CORE_ONLY, base)
-        assert "DB_PASSWORD" not in result
-        assert "AWS_SECRET" not in result
-        assert "AUTH_TOKEN" not in result
+# One env holding every name the CORE_ONLY rows below check. The policy
+# decides per name, so filtering the union once is equivalent to filtering
+# each row's names separately.
+_CORE_ONLY_BASE = {
+    "PATH": "/usr/bin",
+    "HOME": "/home/user",
+    "USER": "dev",
+    "OPENAI_API_KEY": "sk-123",
+    "ANTHROPIC_API_KEY": "sk-456",
+    "DB_PASSWORD": "pass",
+    "AWS_SECRET": "sec",
+    "AUTH_TOKEN": "tok",
+    "AZURE_CREDENTIAL": "cred",
+    "GH_AUTH": "ghp_xxx",
+    "my_api_key": "val",
+    "Some_Secret": "val",
+    "GOPATH": "/go",
+    "CARGO_HOME": "/cargo",
+    "NVM_DIR": "/nvm",
+    "JAVA_HOME": "/java",
+    "EDITOR": "vim",
+    "DISPLAY": ":0",
+    "MY_APP_PORT": "8080",
+}
+
+
+@pytest.fixture(scope="module")
+def core_filtered():
+    return filter_env_vars(EnvVarPolicy.CORE_ONLY, _CORE_ONLY_BASE)
 
-    def test_filters_credential(self):
-        base = {"PATH": "/usr/bin", "AZURE_CREDENTIAL": "cred"}
-        result = filter_env_vars(EnvVarPolicy.CORE_ONLY, base)
-        assert "AZURE_CREDENTIAL" not in result
-
-    def test_filters_auth(self):
-        base = {"PATH": "/usr/bin", "GH_AUTH": "ghp_xxx"}
-        result = filter_env_vars(EnvVarPolicy.CORE_ONLY, base)
-        assert "GH_AUTH" not in result
 
-    def test_case_insensitive_filtering(self):
-        base = {"PATH": "/usr/bin", "my_api_key": "val", "Some_Secret": "val"}
-        result = filter_env_vars(EnvVarPolicy.CORE_ONLY, base)
-        assert "my_api_key" not in result
-        assert "Some_Secret" not in result
-
-    def test_keeps_language_paths(self):
-        base = {
-            "GOPATH": "/go",
-            "CARGO_HOME": "/cargo",
-            "NVM_DIR": "/nvm",
-            "JAVA_HOME": "/java",
-        }
-        result = filter_env_vars(EnvVarPolicy.CORE_ONLY, base)
-        assert "GOPATH" in result
-        assert "CARGO_HOME" in result
-        assert "NVM_DIR" in result
-        assert "JAVA_HOME" in result
-
-    def test_keeps_non_secret_vars(self):
-        base = {
-            "PATH": "/usr/bin",
-            "EDITOR": "vim",
-            "DISPLAY": ":0",
-            "MY_APP_PORT": "8080",
-        }
+class TestFilterCoreOnly:
+    @pytest.mark.parametrize(
+        "present,absent",
+        [
+            pytest.param({"PATH", "HOME", "USER"}, set(), id="core_vars"),
+            pytest.param(set(), {"OPENAI_API_KEY", "ANTHROPIC_API_KEY"}, id="api_keys"),
+            pytest.param(
+                set(), {"DB_PASSWORD", "AWS_SECRET", "AUTH_TOKEN"}, id="secrets"
+            ),
+            pytest.param(set(), {"AZURE_CREDENTIAL"}, id="credential"),
+            pytest.param(set(), {"GH_AUTH"}, id="auth"),
+            pytest.param(set(), {"my_api_key", "Some_Secret"}, id="case_insensitive"),
+            pytest.param(
+                {"GOPATH", "CARGO_HOME", "NVM_DIR", "JAVA_HOME"},
+                set(),
+                id="language_paths",
+            ),
+            pytest.param(
+                {"EDITOR", "DISPLAY", "MY_APP_PORT"}, set(), id="non_secret_vars"
+            ),
+        ],
+    )
+    def test_filters_by_name(self, core_filtered, present, absent):
+        assert present <= core_filtered.keys()
+        assert absent.isdisjoint(core_filtered)
+
+    def test_raw_policy_string_accepted(self):
+        base = {"PATH": "/usr/bin", "GH_TOKEN": "x"}
+        assert filter_env_vars("core_only", base) == {"PATH": "/usr/bin"}
+        assert filter_env_vars("inherit_none", base) == {}
+
+    def test_suffix_must_end_name(self):
+        base = {"TOKEN_PATH": "/t", "MY_SECRET_DIR": "/s", "SECRET": "x"}
         result = filter_env_vars(EnvVarPolicy.CORE_ONLY, base)
-        assert "EDITOR" in result
-        assert "DISPLAY" in result
-        assert "MY_APP_PORT" in result
+        assert result == base
 
     def test_explicit_vars_override_filter(self):
         """Agent can explicitly pass a secret if needed."""
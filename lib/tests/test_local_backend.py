@@ -2,14 +2,23 @@
 
 from __future__ import annotations
 
+import asyncio
 import os
+import subprocess
+import threading
+from pathlib import Path
 
 import pytest
+import pytest_asyncio
 
+from amplifier_env_common.backends import local as local_mod
 from amplifier_env_common.backends.local import LocalBackend
 from amplifier_env_common.models import EnvExecResult, EnvFileEntry
 from amplifier_env_common.protocol import EnvironmentBackend
 
+_OUR_PID = os.getpid()
+_OUR_PGID = os.getpgrp()
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -22,6 +31,24 @@ def backend(tmp_path):
     return LocalBackend(working_dir=str(tmp_path))
 
 
+@pytest.fixture(scope="session")
+def session_dir(tmp_path_factory):
+    """One directory for the tests that never touch the filesystem."""
+    return tmp_path_factory.mktemp("ro")
+
+
+@pytest.fixture(scope="session")
+def session_backend(session_dir):
+    """A LocalBackend shared by the read-only metadata tests."""
+    return LocalBackend(working_dir=str(session_dir))
+
+
+@pytest.fixture(scope="session")
+def host_metadata(session_backend):
+    """(platform, os_version) probed once for the whole run."""
+    return session_backend.platform(), session_backend.os_version()
+
+
 # ---------------------------------------------------------------------------
 # Protocol conformance
 # ---------------------------------------------------------------------------
@@ -30,11 +57,11 @@ def backend(tmp_path):
 class TestProtocolConformance:
     """LocalBackend must satisfy the EnvironmentBackend protocol."""
 
-    def test_isinstance_check(self, backend):
-        assert isinstance(backend, EnvironmentBackend)
+    def test_isinstance_check(self, session_backend):
+        assert isinstance(session_backend, EnvironmentBackend)
 
-    def test_env_type_is_local(self, backend):
-        assert backend.env_type == "local"
+    def test_env_type_is_local(self, session_backend):
+        assert session_backend.env_type == "local"
 
 
 # ---------------------------------------------------------------------------
@@ -45,15 +72,15 @@ class TestProtocolConformance:
 class TestMetadata:
     """Metadata methods: working_directory, platform, os_version."""
 
-    def test_working_directory(self, backend, tmp_path):
-        assert backend.working_directory() == str(tmp_path)
+    def test_working_directory(self, session_backend, session_dir):
+        assert session_backend.working_directory() == str(session_dir)
 
-    def test_platform_returns_string(self, backend):
-        result = backend.platform()
+    def test_platform_returns_string(self, host_metadata):
+        result, _ = host_metadata
         assert result in ("linux", "darwin", "windows") or isinstance(result, str)
 
-    def test_os_version_returns_string(self, backend):
-        result = backend.os_version()
+    def test_os_version_returns_string(self, host_metadata):
+        _, result = host_metadata
         assert isinstance(result, str)
         assert len(result) > 0
 
@@ -66,20 +93,29 @@ class TestMetadata:
 class TestPathTraversal:
     """_resolve must reject paths that escape the working directory."""
 
-    @pytest.mark.asyncio
-    async def test_traversal_read_blocked(self, backend):
+    @pytest.mark.parametrize(
+        "op,args",
+        [
+            ("read_file", ("../../etc/passwd",)),
+            ("write_file", ("../../tmp/evil.txt", "x")),
+            ("edit_file", ("../../etc/hosts", "x", "y")),
+        ],
+    )
+    async def test_traversal_blocked(self, session_backend, op, args):
         with pytest.raises(ValueError, match="escapes working directory"):
-            await backend.read_file("../../etc/passwd")
+            await getattr(session_backend, op)(*args)
 
-    @pytest.mark.asyncio
-    async def test_traversal_write_blocked(self, backend):
+    async def test_sibling_with_shared_prefix_blocked(self, tmp_path):
+        (tmp_path / "work").mkdir()
+        (tmp_path / "workshop").mkdir()
+        backend = LocalBackend(working_dir=str(tmp_path / "work"))
         with pytest.raises(ValueError, match="escapes working directory"):
-            await backend.write_file("../../tmp/evil.txt", "x")
+            await backend.write_file(str(tmp_path / "workshop" / "x.txt"), "x")
 
-    @pytest.mark.asyncio
-    async def test_traversal_edit_blocked(self, backend):
+    async def test_symlink_escape_blocked(self, backend, tmp_path):
+        (tmp_path / "link").symlink_to("/etc")
         with pytest.raises(ValueError, match="escapes working directory"):
-            await backend.edit_file("../../etc/hosts", "x", "y")
+            await backend.read_file("link/hostname")
 
 
 # ---------------------------------------------------------------------------
@@ -87,52 +123,58 @@ class TestPathTraversal:
 # ---------------------------------------------------------------------------
 
 
+@pytest_asyncio.fixture(scope="class", loop_scope="session")
+async def echo_result(session_backend):
+    """One ``echo hello`` run whose fields several tests inspect."""
+    return await session_backend.exec_command("echo hello")
+
+
 class TestExecCommand:
     """exec_command wraps asyncio.create_subprocess_shell."""
 
-    @pytest.mark.asyncio
-    async def test_echo_returns_stdout(self, backend):
-        result = await backend.exec_command("echo hello")
-        assert isinstance(result, EnvExecResult)
-        assert result.stdout.strip() == "hello"
-        assert result.exit_code == 0
+    def test_echo_returns_result(self, echo_result):
+        assert isinstance(echo_result, EnvExecResult)
+
+    def test_echo_returns_stdout(self, echo_result):
+        assert echo_result.stdout.strip() == "hello"
+
+    def test_echo_exit_code_zero(self, echo_result):
+        assert echo_result.exit_code == 0
 
-    @pytest.mark.asyncio
     async def test_nonzero_exit_code(self, backend):
         result = await backend.exec_command("exit 42")
         assert result.exit_code == 42
 
-    @pytest.mark.asyncio
     async def test_stderr_captured(self, backend):
         result = await backend.exec_command("echo oops >&2")
         assert "oops" in result.stderr
 
-    @pytest.mark.asyncio
     async def test_workdir_honored(self, backend, tmp_path):
         subdir = tmp_path / "sub"
         subdir.mkdir()
         result = await backend.exec_command("pwd", workdir=str(subdir))
         assert result.stdout.strip() == str(subdir)
 
-    @pytest.mark.asyncio
     async def test_exec_has_duration_ms(self, backend):
         result = await backend.exec_command("sleep 0.05")
         assert result.duration_ms > 0
 
-    @pytest.mark.asyncio
     async def test_exec_timeout_returns_timed_out(self, backend):
         result = await backend.exec_command("sleep 10", timeout=0.1)
         assert result.timed_out is True
         assert result.exit_code == -1
         assert result.duration_ms > 0
 
-    @pytest.mark.asyncio
     async def test_exec_with_env_vars(self, backend):
         result = await backend.exec_command(
             "echo $MY_VAR", env_vars={"MY_VAR": "hello"}
         )
         assert result.stdout.strip() == "hello"
 
+    async def test_default_decodes_with_replacement(self, backend):
+        result = await backend.exec_command("printf 'a\\377b'")
+        assert result.stdout == "a\ufffdb"
+
 
 # ---------------------------------------------------------------------------
 # read_file
@@ -142,35 +184,43 @@ class TestExecCommand:
 class TestReadFile:
     """read_file reads from the host filesystem."""
 
-    @pytest.mark.asyncio
     async def test_reads_content(self, backend, tmp_path):
         (tmp_path / "hello.txt").write_text("hello world\n")
         content = await backend.read_file("hello.txt")
         assert content == "hello world\n"
 
-    @pytest.mark.asyncio
     async def test_offset_and_limit(self, backend, tmp_path):
         (tmp_path / "lines.txt").write_text("line1\nline2\nline3\nline4\n")
         # offset=2 means start at line 2 (1-indexed), limit=2 means 2 lines
         content = await backend.read_file("lines.txt", offset=2, limit=2)
         assert content == "line2\nline3\n"
 
-    @pytest.mark.asyncio
     async def test_offset_only(self, backend, tmp_path):
         (tmp_path / "lines.txt").write_text("line1\nline2\nline3\n")
         content = await backend.read_file("lines.txt", offset=2)
         assert content == "line2\nline3\n"
 
-    @pytest.mark.asyncio
     async def test_limit_only(self, backend, tmp_path):
         (tmp_path / "lines.txt").write_text("line1\nline2\nline3\n")
         content = await backend.read_file("lines.txt", limit=1)
         assert content == "line1\n"
 
-    @pytest.mark.asyncio
-    async def test_missing_file_raises(self, backend):
+    async def test_partial_read_does_not_load_whole_file(
+        self, backend, tmp_path, monkeypatch
+    ):
+        (tmp_path / "big.txt").write_text("".join(f"l{i}\n" for i in range(1000)))
+        monkeypatch.setattr(Path, "read_text", lambda *a, **k: pytest.fail("read"))
+        content = await backend.read_file("big.txt", offset=3, limit=2)
+        assert content == "l2\nl3\n"
+
+    async def test_partial_read_from_cache(self, backend, tmp_path):
+        await backend.write_file("lines.txt", "a\nb\nc\n")
+        content = await backend.read_file("lines.txt", offset=2, limit=5)
+        assert content == "b\nc\n"
+
+    async def test_missing_file_raises(self, session_backend):
         with pytest.raises(FileNotFoundError):
-            await backend.read_file("does_not_exist.txt")
+            await session_backend.read_file("does_not_exist.txt")
 
 
 # ---------------------------------------------------------------------------
@@ -181,12 +231,10 @@ class TestReadFile:
 class TestWriteFile:
     """write_file creates files and parent directories."""
 
-    @pytest.mark.asyncio
     async def test_creates_file(self, backend, tmp_path):
         await backend.write_file("new.txt", "content")
         assert (tmp_path / "new.txt").read_text() == "content"
 
-    @pytest.mark.asyncio
     async def test_creates_parent_dirs(self, backend, tmp_path):
         await backend.write_file("a/b/c/deep.txt", "deep content")
         assert (tmp_path / "a" / "b" / "c" / "deep.txt").read_text() == "deep content"
@@ -200,29 +248,25 @@ class TestWriteFile:
 class TestEditFile:
     """edit_file replaces a unique string in-place."""
 
-    @pytest.mark.asyncio
     async def test_replaces_unique_string(self, backend, tmp_path):
         (tmp_path / "edit.txt").write_text("hello world")
         result = await backend.edit_file("edit.txt", "hello", "goodbye")
         assert "1 occurrence" in result or "Edited" in result
         assert (tmp_path / "edit.txt").read_text() == "goodbye world"
 
-    @pytest.mark.asyncio
     async def test_string_not_found_raises(self, backend, tmp_path):
         (tmp_path / "edit.txt").write_text("hello world")
         with pytest.raises(ValueError, match="not found"):
             await backend.edit_file("edit.txt", "nonexistent", "replacement")
 
-    @pytest.mark.asyncio
     async def test_string_not_unique_raises(self, backend, tmp_path):
         (tmp_path / "edit.txt").write_text("aaa bbb aaa")
         with pytest.raises(ValueError, match="not unique"):
             await backend.edit_file("edit.txt", "aaa", "ccc")
 
-    @pytest.mark.asyncio
-    async def test_missing_file_raises(self, backend):
+    async def test_missing_file_raises(self, session_backend):
         with pytest.raises(FileNotFoundError):
-            await backend.edit_file("nope.txt", "a", "b")
+            await session_backend.edit_file("nope.txt", "a", "b")
 
 
 # ---------------------------------------------------------------------------
@@ -233,102 +277,174 @@ class TestEditFile:
 class TestFileExists:
     """file_exists checks the host filesystem."""
 
-    @pytest.mark.asyncio
     async def test_existing_file(self, backend, tmp_path):
         (tmp_path / "exists.txt").write_text("hi")
         assert await backend.file_exists("exists.txt") is True
 
-    @pytest.mark.asyncio
     async def test_missing_file(self, backend):
         assert await backend.file_exists("nope.txt") is False
 
-    @pytest.mark.asyncio
     async def test_existing_directory(self, backend, tmp_path):
         (tmp_path / "mydir").mkdir()
         assert await backend.file_exists("mydir") is True
 
 
+# ---------------------------------------------------------------------------
+# file content cache
+# ---------------------------------------------------------------------------
+
+
+class TestFileCache:
+    """read_file/edit_file serve repeat reads from an mtime-validated cache."""
+
+    async def test_external_change_invalidates(self, backend, tmp_path):
+        await backend.write_file("f.txt", "first")
+        assert await backend.read_file("f.txt") == "first"
+        (tmp_path / "f.txt").write_text("changed externally")
+        assert await backend.read_file("f.txt") == "changed externally"
+
+    async def test_hit_skips_disk_read(self, backend, tmp_path, monkeypatch):
+        (tmp_path / "f.txt").write_text("cached")
+        await backend.read_file("f.txt")
+        monkeypatch.setattr(Path, "read_text", lambda *a, **k: pytest.fail("read"))
+        assert await backend.read_file("f.txt") == "cached"
+
+    async def test_edit_then_read(self, backend, tmp_path):
+        await backend.write_file("f.txt", "alpha beta")
+        await backend.edit_file("f.txt", "alpha", "gamma")
+        assert await backend.read_file("f.txt") == "gamma beta"
+        assert (tmp_path / "f.txt").read_text() == "gamma beta"
+
+    async def test_crlf_write_matches_fresh_read(self, backend, tmp_path):
+        await backend.write_file("f.txt", "a\r\nb\r\n")
+        assert await backend.read_file("f.txt") == (tmp_path / "f.txt").read_text()
+
+    async def test_invalid_utf8_not_cached_for_edit(self, backend, tmp_path):
+        (tmp_path / "bin.dat").write_bytes(b"ok \xff\xfe")
+        assert "ok" in await backend.read_file("bin.dat")
+        with pytest.raises(UnicodeDecodeError):
+            await backend.edit_file("bin.dat", "ok", "no")
+
+    async def test_cache_size_bounded(self, backend, tmp_path, monkeypatch):
+        monkeypatch.setattr(local_mod, "_FILE_CACHE_MAX_BYTES", 10)
+        await backend.write_file("a.txt", "123456")
+        await backend.write_file("b.txt", "123456")
+        assert backend._file_cache_bytes <= 10
+        assert list(backend._file_cache) == [str(tmp_path / "b.txt")]
+
+
+class TestThreadOffload:
+    """Blocking filesystem calls run in worker threads, not on the loop."""
+
+    async def test_read_runs_off_loop_thread(self, backend, tmp_path, monkeypatch):
+        (tmp_path / "f.txt").write_text("x")
+        seen: list[threading.Thread] = []
+        real_read_text = Path.read_text
+
+        def spy(self, *args, **kwargs):
+            seen.append(threading.current_thread())
+            return real_read_text(self, *args, **kwargs)
+
+        monkeypatch.setattr(Path, "read_text", spy)
+        await backend.read_file("f.txt")
+        assert seen and seen[0] is not threading.main_thread()
+
+
 # ---------------------------------------------------------------------------
 # list_dir
 # ---------------------------------------------------------------------------
 
 
+@pytest.fixture(scope="class")
+def populated_tree(tmp_path_factory):
+    """A LocalBackend over one canonical tree, built once per class."""
+    root = tmp_path_factory.mktemp("tree")
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (root / name).write_text("x")
+    (root / "sized.txt").write_text("12345")
+    (root / "d").mkdir()
+    (root / "parent").mkdir()
+    (root / "parent" / "child.txt").write_text("x")
+    (root / "parent" / "nested_dir").mkdir()
+    return LocalBackend(working_dir=str(root))
+
+
+@pytest_asyncio.fixture(scope="class", loop_scope="session")
+async def list_dir_by_name(populated_tree):
+    """The depth-1 listing of populated_tree, keyed by entry name."""
+    return {e.name: e for e in await populated_tree.list_dir(".")}
+
+
 class TestListDir:
     """list_dir returns structured EnvFileEntry list."""
 
-    @pytest.mark.asyncio
-    async def test_returns_entries(self, backend, tmp_path):
-        (tmp_path / "file.txt").write_text("content")
-        (tmp_path / "subdir").mkdir()
-        entries = await backend.list_dir(".")
+    async def test_returns_entries(self, populated_tree):
+        entries = await populated_tree.list_dir(".")
         assert isinstance(entries, list)
-        assert all(isinstance(e, EnvFileEntry) for e in entries)
+        assert {type(e) for e in entries} == {EnvFileEntry}
         names = {e.name for e in entries}
-        assert "file.txt" in names
-        assert "subdir" in names
+        assert "a.txt" in names
+        assert "d" in names
 
-    @pytest.mark.asyncio
-    async def test_entry_types(self, backend, tmp_path):
-        (tmp_path / "a.txt").write_text("x")
-        (tmp_path / "d").mkdir()
-        entries = await backend.list_dir(".")
-        by_name = {e.name: e for e in entries}
-        assert by_name["a.txt"].entry_type == "file"
-        assert by_name["d"].entry_type == "dir"
+    def test_entry_types(self, list_dir_by_name):
+        assert list_dir_by_name["a.txt"].entry_type == "file"
+        assert list_dir_by_name["d"].entry_type == "dir"
 
-    @pytest.mark.asyncio
-    async def test_file_has_size(self, backend, tmp_path):
-        (tmp_path / "sized.txt").write_text("12345")
-        entries = await backend.list_dir(".")
-        by_name = {e.name: e for e in entries}
-        assert by_name["sized.txt"].size == 5
+    def test_file_has_size(self, list_dir_by_name):
+        assert list_dir_by_name["sized.txt"].size == 5
 
-    @pytest.mark.asyncio
-    async def test_dir_has_no_size(self, backend, tmp_path):
-        (tmp_path / "d").mkdir()
-        entries = await backend.list_dir(".")
-        by_name = {e.name: e for e in entries}
-        assert by_name["d"].size is None
+    def test_dir_has_no_size(self, list_dir_by_name):
+        assert list_dir_by_name["d"].size is None
 
-    @pytest.mark.asyncio
-    async def test_list_dir_depth_1(self, backend, tmp_path):
+    async def test_list_dir_depth_1(self, populated_tree):
         """Default depth=1 only lists immediate children (no nested entries)."""
-        sub = tmp_path / "parent"
-        sub.mkdir()
-        (sub / "child").mkdir()
-        (tmp_path / "top.txt").write_text("x")
-        entries = await backend.list_dir(".")
+        entries = await populated_tree.list_dir(".")
         names = {e.name for e in entries}
         assert "parent" in names
-        assert "top.txt" in names
+        assert "a.txt" in names
         # child should NOT appear at depth=1
-        assert "child" not in names
-        assert "parent/child" not in names
+        assert "child.txt" not in names
+        assert "parent/child.txt" not in names
 
-    @pytest.mark.asyncio
-    async def test_list_dir_depth_2(self, backend, tmp_path):
+    async def test_list_dir_depth_2(self, populated_tree):
         """depth=2 shows nested entries with relative paths."""
-        sub = tmp_path / "parent"
-        sub.mkdir()
-        (sub / "child.txt").write_text("x")
-        (sub / "nested_dir").mkdir()
-        entries = await backend.list_dir(".", depth=2)
+        entries = await populated_tree.list_dir(".", depth=2)
         names = {e.name for e in entries}
         assert "parent" in names
         assert "parent/child.txt" in names
         assert "parent/nested_dir" in names
 
-    @pytest.mark.asyncio
-    async def test_missing_dir_raises(self, backend):
+    async def test_list_dir_depth_2_preorder(self, populated_tree):
+        """Nested entries follow their parent, siblings in name order."""
+        entries = await populated_tree.list_dir(".", depth=2)
+        assert [e.name for e in entries] == [
+            "a.txt",
+            "b.txt",
+            "c.txt",
+            "d",
+            "parent",
+            "parent/child.txt",
+            "parent/nested_dir",
+            "sized.txt",
+        ]
+
+    async def test_large_dir_sizes_match(self, backend, tmp_path):
+        """Listings above the parallel-stat threshold keep order and sizes."""
+        for i in range(100):
+            (tmp_path / f"f{i:03d}.txt").write_text("x" * i)
+        (tmp_path / "sub").mkdir()
+        entries = await backend.list_dir(".")
+        assert [e.name for e in entries][:3] == ["f000.txt", "f001.txt", "f002.txt"]
+        sizes = {e.name: e.size for e in entries}
+        assert sizes["f042.txt"] == 42
+        assert sizes["sub"] is None
+
+    async def test_missing_dir_raises(self, populated_tree):
         with pytest.raises(FileNotFoundError):
-            await backend.list_dir("nonexistent")
+            await populated_tree.list_dir("nonexistent")
 
-    @pytest.mark.asyncio
-    async def test_sorted_by_name(self, backend, tmp_path):
-        for name in ["c.txt", "a.txt", "b.txt"]:
-            (tmp_path / name).write_text("x")
-        entries = await backend.list_dir(".")
-        names = [e.name for e in entries]
+    def test_sorted_by_name(self, list_dir_by_name):
+        names = list(list_dir_by_name)
         assert names == sorted(names)
 
 
@@ -337,46 +453,113 @@ class TestListDir:
 # ---------------------------------------------------------------------------
 
 
+@pytest.fixture(scope="class")
+def grep_corpus(tmp_path_factory):
+    """A LocalBackend over one file holding every line the grep tests need."""
+    root = tmp_path_factory.mktemp("grep")
+    (root / "corpus.txt").write_text(
+        "Hello World\nmatch1\nmatch2\nmatch3\nnothing here\nneedle in a haystack\n"
+    )
+    return LocalBackend(working_dir=str(root))
+
+
 class TestGrep:
     """grep searches file contents."""
 
-    @pytest.mark.asyncio
-    async def test_finds_match(self, backend, tmp_path):
-        (tmp_path / "haystack.txt").write_text("needle in a haystack\n")
-        result = await backend.grep("needle")
-        assert "needle" in result
-
-    @pytest.mark.asyncio
-    async def test_no_match_returns_no_matches(self, backend, tmp_path):
-        (tmp_path / "empty.txt").write_text("nothing here\n")
-        result = await backend.grep("zzzzz_nonexistent_zzzzz")
-        assert "No matches" in result or result.strip() == ""
-
-    @pytest.mark.asyncio
-    async def test_grep_case_insensitive(self, backend, tmp_path):
-        (tmp_path / "mixed.txt").write_text("Hello World\n")
-        result = await backend.grep("hello", case_insensitive=True)
-        assert "Hello" in result
-
-    @pytest.mark.asyncio
-    async def test_grep_case_sensitive_default(self, backend, tmp_path):
-        (tmp_path / "mixed.txt").write_text("Hello World\n")
-        result = await backend.grep("hello")
-        assert "No matches" in result or result.strip() == ""
-
-    @pytest.mark.asyncio
-    async def test_grep_max_results(self, backend, tmp_path):
-        (tmp_path / "multi.txt").write_text("match1\nmatch2\nmatch3\n")
-        result = await backend.grep("match", max_results=1)
+    # expected=None means the search must come back empty
+    @pytest.mark.parametrize(
+        "pattern,kwargs,expected",
+        [
+            ("needle", {}, "needle"),
+            ("zzzzz_nonexistent_zzzzz", {}, None),
+            ("hello", {"case_insensitive": True}, "Hello"),
+            ("hello", {}, None),
+        ],
+        ids=["match", "no_match", "case_insensitive", "case_sensitive_default"],
+    )
+    async def test_grep_cases(self, grep_corpus, pattern, kwargs, expected):
+        result = await grep_corpus.grep(pattern, **kwargs)
+        if expected is None:
+            assert "No matches" in result or result.strip() == ""
+        else:
+            assert expected in result
+
+    async def test_grep_max_results(self, grep_corpus):
+        result = await grep_corpus.grep("match", max_results=1)
         lines = [line for line in result.strip().splitlines() if line.strip()]
         assert len(lines) == 1
 
-    @pytest.mark.asyncio
-    async def test_bad_pattern_raises(self, backend, tmp_path):
+    async def test_bad_pattern_raises(self, grep_corpus):
         """grep exit code > 1 (bad regex) must raise RuntimeError."""
-        (tmp_path / "file.txt").write_text("content\n")
         with pytest.raises(RuntimeError, match="grep failed"):
-            await backend.grep("[invalid")  # unclosed bracket = bad regex
+            await grep_corpus.grep("[invalid")  # unclosed bracket = bad regex
+
+    async def test_uses_ripgrep_when_available(self, backend, tmp_path, monkeypatch):
+        """When rg is on PATH it replaces grep, searching ignored/hidden files too."""
+        captured: list[tuple] = []
+
+        async def fake_exec(*args, **kwargs):
+            captured.append(args)
+            return await real_exec("true", **kwargs)
+
+        real_exec = asyncio.create_subprocess_exec
+        monkeypatch.setattr(local_mod, "_RG_PATH", "/usr/bin/rg")
+        monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+        await backend.grep("needle", glob_filter="*.py", case_insensitive=True)
+        argv = captured[0]
+        assert argv[0] == "/usr/bin/rg"
+        assert "-uuu" in argv
+        assert argv[argv.index("--glob") + 1] == "*.py"
+        assert "-i" in argv
+        assert argv[-3:] == ("-e", "needle", str(tmp_path))
+
+    # POSIX basic regular expressions, as grep -rn reads them on every backend
+    @pytest.mark.parametrize(
+        "pattern,expected",
+        [
+            ("needle|World", []),
+            ("match[12]$", ["match1", "match2"]),
+            ("\\(ha\\)ystack", ["needle in a haystack"]),
+            ("-here", []),
+        ],
+        ids=["bar_is_literal", "bracket_anchor", "escaped_group", "leading_dash"],
+    )
+    async def test_basic_regex_dialect(
+        self, grep_corpus, monkeypatch, pattern, expected
+    ):
+        monkeypatch.setattr(local_mod, "_RG_PATH", None)
+        result = await grep_corpus.grep(pattern)
+        if not expected:
+            assert result == "No matches found."
+        else:
+            assert [line.split(":", 2)[2] for line in result.splitlines()] == expected
+
+    @pytest.mark.parametrize(
+        "pattern,use_rg",
+        [
+            ("needle", True),
+            ("^match[12].$", True),
+            ("needle|World", False),
+            ("(ha)+", False),
+            ("\\d", False),
+            ("a^b", False),
+            ("*x", False),
+        ],
+    )
+    async def test_ripgrep_only_for_dialect_neutral_patterns(
+        self, backend, monkeypatch, pattern, use_rg
+    ):
+        captured: list[tuple] = []
+
+        async def fake_exec(*args, **kwargs):
+            captured.append(args)
+            return await real_exec("true", **kwargs)
+
+        real_exec = asyncio.create_subprocess_exec
+        monkeypatch.setattr(local_mod, "_RG_PATH", "/usr/bin/rg")
+        monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+        await backend.grep(pattern)
+        assert (captured[0][0] == "/usr/bin/rg") is use_rg
 
 
 # ---------------------------------------------------------------------------
@@ -387,7 +570,6 @@ class TestGrep:
 class TestGlobFiles:
     """glob_files finds files matching patterns."""
 
-    @pytest.mark.asyncio
     async def test_finds_py_files(self, backend, tmp_path):
         (tmp_path / "a.py").write_text("")
         (tmp_path / "b.py").write_text("")
@@ -395,7 +577,6 @@ class TestGlobFiles:
         matches = await backend.glob_files("*.py")
         assert sorted(matches) == ["a.py", "b.py"]
 
-    @pytest.mark.asyncio
     async def test_recursive_glob(self, backend, tmp_path):
         sub = tmp_path / "sub"
         sub.mkdir()
@@ -405,7 +586,6 @@ class TestGlobFiles:
         assert "top.py" in matches
         assert any("deep.py" in m for m in matches)
 
-    @pytest.mark.asyncio
     async def test_no_match_returns_empty(self, backend):
         matches = await backend.glob_files("*.nonexistent")
         assert matches == []
@@ -419,9 +599,8 @@ class TestGlobFiles:
 class TestCleanup:
     """cleanup is a no-op for local backend."""
 
-    @pytest.mark.asyncio
-    async def test_cleanup_does_not_raise(self, backend):
-        await backend.cleanup()  # Should not raise
+    async def test_cleanup_does_not_raise(self, session_backend):
+        await session_backend.cleanup()  # Should not raise
 
 
 # ---------------------------------------------------------------------------
@@ -432,11 +611,11 @@ class TestCleanup:
 class TestInfo:
     """info returns metadata about the backend."""
 
-    def test_contains_working_dir(self, backend, tmp_path):
-        info = backend.info()
+    def test_contains_working_dir(self, session_backend, session_dir):
+        info = session_backend.info()
         assert isinstance(info, dict)
         assert "working_dir" in info
-        assert info["working_dir"] == str(tmp_path)
+        assert info["working_dir"] == str(session_dir)
 
 
 # ---------------------------------------------------------------------------
@@ -444,6 +623,25 @@ class TestInfo:
 # ---------------------------------------------------------------------------
 
 
+def _has_process_matching(needle: str) -> bool:
+    """Whether any live process has *needle* in its command line."""
+    if not os.path.isdir("/proc"):
+        check = subprocess.run(["pgrep", "-f", needle], capture_output=True)
+        return check.returncode == 0
+    target = needle.encode()
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                cmdline = f.read()
+        except OSError:
+            continue  # exited while we were scanning
+        if target in cmdline.replace(b"\0", b" "):
+            return True
+    return False
+
+
 class TestExecProcessGroup:
     """Tests for NLSpec process group management (Section 4.2).
 
@@ -451,55 +649,41 @@ class TestExecProcessGroup:
     child process cleanup via process group kill.
     """
 
-    @pytest.mark.asyncio
     async def test_subprocess_uses_new_session(self, tmp_path):
         """Verify subprocess is spawned in a new process group."""
-        import os
-
         backend = LocalBackend(working_dir=str(tmp_path), env_policy="inherit_all")
         # Report the process group ID of the subprocess vs our own
         result = await backend.exec_command("echo $PPID; ps -o pgid= -p $$")
         assert result.exit_code == 0
         # The subprocess pgid should differ from our pgid
-        our_pgid = os.getpgrp()
         lines = result.stdout.strip().split("\n")
         child_pgid = int(lines[-1].strip())
-        assert child_pgid != our_pgid, (
-            f"Child pgid {child_pgid} should differ from parent pgid {our_pgid}"
+        assert child_pgid != _OUR_PGID, (
+            f"Child pgid {child_pgid} should differ from parent pgid {_OUR_PGID}"
         )
 
-    @pytest.mark.asyncio
     async def test_timeout_returns_timed_out_result(self, tmp_path):
         """Timeout should return EnvExecResult with timed_out=True, not raise."""
         backend = LocalBackend(working_dir=str(tmp_path), env_policy="inherit_all")
-        result = await backend.exec_command("sleep 60", timeout=0.5)
+        result = await backend.exec_command("sleep 60", timeout=0.05)
         assert result.timed_out is True
         assert result.exit_code == -1
 
-    @pytest.mark.asyncio
     async def test_timeout_kills_child_processes(self, tmp_path):
         """Child processes spawned by the command should also be killed."""
-        import asyncio
-        import subprocess
-
         backend = LocalBackend(working_dir=str(tmp_path), env_policy="inherit_all")
-        # Spawn a command that creates a child process writing a marker
-        # Use a unique marker so we don't collide with other tests
-        marker = f"sleep_pg_test_{os.getpid()}"
-        result = await backend.exec_command(
-            f"bash -c '{marker}=1; sleep 300 & echo $!; wait'",
-            timeout=0.5,
-        )
+        # Background a child of the shell itself; the unique duration keeps
+        # the check from matching sleeps started by anything else
+        sleeper = f"sleep 300.{_OUR_PID}"
+        result = await backend.exec_command(f"{sleeper} & wait", timeout=0.5)
         assert result.timed_out is True
-        # Give a moment for cleanup
-        await asyncio.sleep(0.5)
-        # Check that no sleep 300 processes from our child are lingering
-        check = subprocess.run(
-            ["pgrep", "-f", "sleep 300"],
-            capture_output=True,
-            text=True,
-        )
-        assert check.returncode != 0, "sleep 300 process should have been killed"
+        # Poll until no sleep 300 processes from our child are lingering
+        for _ in range(50):
+            if not _has_process_matching(sleeper):
+                break
+            await asyncio.sleep(0.01)
+        else:
+            pytest.fail("sleep 300 process should have been killed")
 
 
 # ---------------------------------------------------------------------------
@@ -507,36 +691,65 @@ class TestExecProcessGroup:
 # ---------------------------------------------------------------------------
 
 
+_PROBED_VARS = ("FAKE_API_KEY", "CUSTOM_TEST_VAR", "PATH")
+
+
+async def probe_env(backend, names):
+    """Read several env vars through one exec_command round trip."""
+    refs = " ".join(f'"${name}"' for name in names)
+    result = await backend.exec_command(f"printf '%s\\0' {refs}")
+    return dict(zip(names, result.stdout.split("\0")))
+
+
+@pytest_asyncio.fixture(scope="class", loop_scope="session")
+async def env_probes(tmp_path_factory):
+    """Probe the host env once per policy with the test secrets exported."""
+    work_dir = str(tmp_path_factory.mktemp("env"))
+    backends = {
+        "default": LocalBackend(working_dir=work_dir),
+        "inherit_all": LocalBackend(working_dir=work_dir, env_policy="inherit_all"),
+        "inherit_none": LocalBackend(working_dir=work_dir, env_policy="inherit_none"),
+    }
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("FAKE_API_KEY", "supersecret")
+        mp.setenv("CUSTOM_TEST_VAR", "should_vanish")
+        return {
+            policy: await probe_env(backend, _PROBED_VARS)
+            for policy, backend in backends.items()
+        }
+
+
 class TestExecEnvFiltering:
     """exec_command applies env var filtering based on env_policy."""
 
-    @pytest.mark.asyncio
-    async def test_exec_filters_secrets_by_default(self, tmp_path, monkeypatch):
+    def test_exec_filters_secrets_by_default(self, env_probes):
         """Default core_only policy filters env vars matching secret patterns."""
-        monkeypatch.setenv("FAKE_API_KEY", "supersecret")
-        backend = LocalBackend(working_dir=str(tmp_path))
-        result = await backend.exec_command("echo $FAKE_API_KEY")
         # core_only filters vars ending in _API_KEY
-        assert result.stdout.strip() == ""
+        assert env_probes["default"]["FAKE_API_KEY"] == ""
 
-    @pytest.mark.asyncio
-    async def test_exec_inherit_all_passes_secrets(self, tmp_path, monkeypatch):
+    def test_exec_inherit_all_passes_secrets(self, env_probes):
         """inherit_all policy passes all env vars including secrets."""
-        monkeypatch.setenv("FAKE_API_KEY", "supersecret")
-        backend = LocalBackend(working_dir=str(tmp_path), env_policy="inherit_all")
-        result = await backend.exec_command("echo $FAKE_API_KEY")
-        assert result.stdout.strip() == "supersecret"
+        assert env_probes["inherit_all"]["FAKE_API_KEY"] == "supersecret"
 
-    @pytest.mark.asyncio
-    async def test_exec_inherit_none_blocks_everything(self, tmp_path, monkeypatch):
+    def test_exec_inherit_none_blocks_everything(self, env_probes):
         """inherit_none policy blocks all host env vars."""
-        monkeypatch.setenv("CUSTOM_TEST_VAR", "should_vanish")
-        backend = LocalBackend(working_dir=str(tmp_path), env_policy="inherit_none")
-        result = await backend.exec_command("echo $CUSTOM_TEST_VAR")
         # CUSTOM_TEST_VAR should not be visible under inherit_none
+        assert env_probes["inherit_none"]["CUSTOM_TEST_VAR"] == ""
+
+    async def test_exec_sees_env_changes_between_calls(self, tmp_path, monkeypatch):
+        """The cached filtered environment is rebuilt when os.environ changes."""
+        backend = LocalBackend(working_dir=str(tmp_path))
+        monkeypatch.setenv("LATE_TEST_VAR", "first")
+        assert (await backend.exec_command("echo $LATE_TEST_VAR")).stdout == "first\n"
+        monkeypatch.setenv("LATE_TEST_VAR", "second")
+        assert (await backend.exec_command("echo $LATE_TEST_VAR")).stdout == "second\n"
+
+    async def test_exec_env_vars_do_not_leak_into_cache(self, tmp_path):
+        backend = LocalBackend(working_dir=str(tmp_path))
+        await backend.exec_command("true", env_vars={"ONE_SHOT_VAR": "x"})
+        result = await backend.exec_command("echo $ONE_SHOT_VAR")
         assert result.stdout.strip() == ""
 
-    @pytest.mark.asyncio
     async def test_exec_explicit_env_vars_override_filter(self, tmp_path):
         """Explicit env_vars always visible, even with core_only filtering."""
         backend = LocalBackend(working_dir=str(tmp_path))
@@ -545,10 +758,7 @@ class TestExecEnvFiltering:
         )
         assert result.stdout.strip() == "sk-test"
 
-    @pytest.mark.asyncio
-    async def test_exec_core_only_keeps_path(self, tmp_path):
+    def test_exec_core_only_keeps_path(self, env_probes):
         """core_only policy preserves core vars like PATH."""
-        backend = LocalBackend(working_dir=str(tmp_path))
-        result = await backend.exec_command("echo $PATH")
         # PATH should still be present under core_only
-        assert result.stdout.strip() != ""
+        assert env_probes["default"]["PATH"] != ""
@@ -4,107 +4,16 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import threading
+from collections.abc import Iterator
 from typing import Any
 
 import pytest
 
-from amplifier_env_common.models import EnvExecResult, EnvFileEntry
 from amplifier_env_common.protocol import EnvironmentBackend
+from amplifier_env_common.wrappers import logging_wrapper
 from amplifier_env_common.wrappers.logging_wrapper import LoggingWrapper
-
-
-# ---------------------------------------------------------------------------
-# Test fixture: FakeBackend that records calls
-# ---------------------------------------------------------------------------
-
-
-class FakeBackend:
-    """Implements EnvironmentBackend and records all calls for assertion."""
-
-    def __init__(self) -> None:
-        self.calls: list[tuple[str, tuple, dict]] = []
-
-    @property
-    def env_type(self) -> str:
-        return "fake"
-
-    def working_directory(self) -> str:
-        return "/fake/work"
-
-    def platform(self) -> str:
-        return "linux"
-
-    def os_version(self) -> str:
-        return "FakeOS 1.0"
-
-    async def exec_command(
-        self,
-        cmd: str,
-        timeout: float | None = None,
-        workdir: str | None = None,
-        env_vars: dict[str, str] | None = None,
-    ) -> EnvExecResult:
-        self.calls.append(
-            (
-                "exec_command",
-                (cmd,),
-                {"timeout": timeout, "workdir": workdir, "env_vars": env_vars},
-            )
-        )
-        return EnvExecResult(stdout="hello", stderr="", exit_code=0, duration_ms=42)
-
-    async def read_file(
-        self, path: str, offset: int | None = None, limit: int | None = None
-    ) -> str:
-        self.calls.append(("read_file", (path,), {"offset": offset, "limit": limit}))
-        return "file content"
-
-    async def write_file(self, path: str, content: str) -> None:
-        self.calls.append(("write_file", (path, content), {}))
-
-    async def edit_file(self, path: str, old_string: str, new_string: str) -> str:
-        self.calls.append(("edit_file", (path, old_string, new_string), {}))
-        return "replaced 1 occurrence"
-
-    async def file_exists(self, path: str) -> bool:
-        self.calls.append(("file_exists", (path,), {}))
-        return True
-
-    async def list_dir(self, path: str, depth: int = 1) -> list[EnvFileEntry]:
-        self.calls.append(("list_dir", (path,), {"depth": depth}))
-        return [EnvFileEntry(name="a.txt", entry_type="file")]
-
-    async def grep(
-        self,
-        pattern: str,
-        path: str | None = None,
-        glob_filter: str | None = None,
-        case_insensitive: bool = False,
-        max_results: int | None = None,
-    ) -> str:
-        self.calls.append(
-            (
-                "grep",
-                (pattern,),
-                {
-                    "path": path,
-                    "glob_filter": glob_filter,
-                    "case_insensitive": case_insensitive,
-                    "max_results": max_results,
-                },
-            )
-        )
-        return "match:1: foo"
-
-    async def glob_files(self, pattern: str, path: str | None = None) -> list[str]:
-        self.calls.append(("glob_files", (pattern,), {"path": path}))
-        return ["a.txt"]
-
-    async def cleanup(self) -> None:
-        self.calls.append(("cleanup", (), {}))
-
-    def info(self) -> dict[str, Any]:
-        return {"type": "fake", "working_dir": "/fake/work"}
+from amplifier_env_common.wrappers.readonly_wrapper import ReadOnlyWrapper
 
 
 # ---------------------------------------------------------------------------
@@ -115,20 +24,17 @@ class FakeBackend:
 class TestProtocolConformance:
     """LoggingWrapper must satisfy EnvironmentBackend protocol."""
 
-    def test_satisfies_protocol(self) -> None:
-        wrapper = LoggingWrapper(inner=FakeBackend())
+    def test_satisfies_protocol(self, shared_fake: Any) -> None:
+        wrapper = LoggingWrapper(inner=shared_fake)
         assert isinstance(wrapper, EnvironmentBackend)
 
 
 class TestExecCommand:
     """exec_command delegation and logging."""
 
-    def test_exec_delegates_to_inner(self) -> None:
-        fake = FakeBackend()
+    async def test_exec_delegates_to_inner(self, fake: Any) -> None:
         wrapper = LoggingWrapper(inner=fake)
-        result = asyncio.run(
-            wrapper.exec_command("echo hi", timeout=10, workdir="/tmp")
-        )
+        result = await wrapper.exec_command("echo hi", timeout=10, workdir="/tmp")
         assert result.stdout == "hello"
         assert result.exit_code == 0
         assert result.duration_ms == 42
@@ -138,13 +44,12 @@ class TestExecCommand:
         assert fake.calls[0][2]["timeout"] == 10
         assert fake.calls[0][2]["workdir"] == "/tmp"
 
-    def test_exec_logs_command_and_result(
-        self, caplog: pytest.LogCaptureFixture
+    async def test_exec_logs_command_and_result(
+        self, fake: Any, caplog: pytest.LogCaptureFixture
     ) -> None:
-        fake = FakeBackend()
         wrapper = LoggingWrapper(inner=fake, logger_name="test.env")
         with caplog.at_level(logging.DEBUG, logger="test.env"):
-            asyncio.run(wrapper.exec_command("echo hi"))
+            await wrapper.exec_command("echo hi")
         # Should have log entries mentioning the command and exit code
         messages = [r.message for r in caplog.records if r.name == "test.env"]
         assert any("echo hi" in m for m in messages), (
@@ -158,21 +63,21 @@ class TestExecCommand:
 class TestReadFile:
     """read_file delegation and logging."""
 
-    def test_read_delegates(self) -> None:
-        fake = FakeBackend()
+    async def test_read_delegates(self, fake: Any) -> None:
         wrapper = LoggingWrapper(inner=fake)
-        result = asyncio.run(wrapper.read_file("/etc/hosts", offset=5, limit=10))
+        result = await wrapper.read_file("/etc/hosts", offset=5, limit=10)
         assert result == "file content"
         assert len(fake.calls) == 1
         assert fake.calls[0][0] == "read_file"
         assert fake.calls[0][1] == ("/etc/hosts",)
         assert fake.calls[0][2] == {"offset": 5, "limit": 10}
 
-    def test_read_logs_at_debug(self, caplog: pytest.LogCaptureFixture) -> None:
-        fake = FakeBackend()
+    async def test_read_logs_at_debug(
+        self, fake: Any, caplog: pytest.LogCaptureFixture
+    ) -> None:
         wrapper = LoggingWrapper(inner=fake, logger_name="test.env")
         with caplog.at_level(logging.DEBUG, logger="test.env"):
-            asyncio.run(wrapper.read_file("/etc/hosts"))
+            await wrapper.read_file("/etc/hosts")
         messages = [r.message for r in caplog.records if r.name == "test.env"]
         assert any("/etc/hosts" in m for m in messages)
         # Verify it's at DEBUG level
@@ -183,11 +88,12 @@ class TestReadFile:
 class TestWriteFile:
     """write_file delegation and logging."""
 
-    def test_write_delegates_and_logs(self, caplog: pytest.LogCaptureFixture) -> None:
-        fake = FakeBackend()
+    async def test_write_delegates_and_logs(
+        self, fake: Any, caplog: pytest.LogCaptureFixture
+    ) -> None:
         wrapper = LoggingWrapper(inner=fake, logger_name="test.env")
         with caplog.at_level(logging.DEBUG, logger="test.env"):
-            asyncio.run(wrapper.write_file("/tmp/out.txt", "hello world"))
+            await wrapper.write_file("/tmp/out.txt", "hello world")
         # Delegated
         assert len(fake.calls) == 1
         assert fake.calls[0][0] == "write_file"
@@ -203,11 +109,12 @@ class TestWriteFile:
 class TestEditFile:
     """edit_file delegation and logging."""
 
-    def test_edit_delegates_and_logs(self, caplog: pytest.LogCaptureFixture) -> None:
-        fake = FakeBackend()
+    async def test_edit_delegates_and_logs(
+        self, fake: Any, caplog: pytest.LogCaptureFixture
+    ) -> None:
         wrapper = LoggingWrapper(inner=fake, logger_name="test.env")
         with caplog.at_level(logging.DEBUG, logger="test.env"):
-            result = asyncio.run(wrapper.edit_file("/tmp/f.py", "old", "new"))
+            result = await wrapper.edit_file("/tmp/f.py", "old", "new")
         assert result == "replaced 1 occurrence"
         assert len(fake.calls) == 1
         assert fake.calls[0][0] == "edit_file"
@@ -219,33 +126,36 @@ class TestEditFile:
 class TestSilentOperations:
     """file_exists, list_dir, glob_files should NOT be logged."""
 
-    def test_file_exists_not_logged(self, caplog: pytest.LogCaptureFixture) -> None:
-        fake = FakeBackend()
+    async def test_file_exists_not_logged(
+        self, fake: Any, caplog: pytest.LogCaptureFixture
+    ) -> None:
         wrapper = LoggingWrapper(inner=fake, logger_name="test.env")
         with caplog.at_level(logging.DEBUG, logger="test.env"):
-            result = asyncio.run(wrapper.file_exists("/tmp/x"))
+            result = await wrapper.file_exists("/tmp/x")
         assert result is True
         assert len(fake.calls) == 1
         assert fake.calls[0][0] == "file_exists"
         env_records = [r for r in caplog.records if r.name == "test.env"]
         assert len(env_records) == 0, f"file_exists should not log, got: {env_records}"
 
-    def test_list_dir_not_logged(self, caplog: pytest.LogCaptureFixture) -> None:
-        fake = FakeBackend()
+    async def test_list_dir_not_logged(
+        self, fake: Any, caplog: pytest.LogCaptureFixture
+    ) -> None:
         wrapper = LoggingWrapper(inner=fake, logger_name="test.env")
         with caplog.at_level(logging.DEBUG, logger="test.env"):
-            result = asyncio.run(wrapper.list_dir("/tmp", depth=2))
+            result = await wrapper.list_dir("/tmp", depth=2)
         assert len(result) == 1
         assert len(fake.calls) == 1
         assert fake.calls[0][0] == "list_dir"
         env_records = [r for r in caplog.records if r.name == "test.env"]
         assert len(env_records) == 0, f"list_dir should not log, got: {env_records}"
 
-    def test_glob_files_not_logged(self, caplog: pytest.LogCaptureFixture) -> None:
-        fake = FakeBackend()
+    async def test_glob_files_not_logged(
+        self, fake: Any, caplog: pytest.LogCaptureFixture
+    ) -> None:
         wrapper = LoggingWrapper(inner=fake, logger_name="test.env")
         with caplog.at_level(logging.DEBUG, logger="test.env"):
-            result = asyncio.run(wrapper.glob_files("*.py", path="/src"))
+            result = await wrapper.glob_files("*.py", path="/src")
         assert result == ["a.txt"]
         assert len(fake.calls) == 1
         assert fake.calls[0][0] == "glob_files"
@@ -256,13 +166,12 @@ class TestSilentOperations:
 class TestGrep:
     """grep delegation and logging."""
 
-    def test_grep_delegates_and_logs(self, caplog: pytest.LogCaptureFixture) -> None:
-        fake = FakeBackend()
+    async def test_grep_delegates_and_logs(
+        self, fake: Any, caplog: pytest.LogCaptureFixture
+    ) -> None:
         wrapper = LoggingWrapper(inner=fake, logger_name="test.env")
         with caplog.at_level(logging.DEBUG, logger="test.env"):
-            result = asyncio.run(
-                wrapper.grep("TODO", path="/src", case_insensitive=True)
-            )
+            result = await wrapper.grep("TODO", path="/src", case_insensitive=True)
         assert result == "match:1: foo"
         assert len(fake.calls) == 1
         assert fake.calls[0][0] == "grep"
@@ -273,25 +182,411 @@ class TestGrep:
 class TestCleanup:
     """cleanup delegation and logging."""
 
-    def test_cleanup_delegates_and_logs(self, caplog: pytest.LogCaptureFixture) -> None:
-        fake = FakeBackend()
+    async def test_cleanup_delegates_and_logs(
+        self, fake: Any, caplog: pytest.LogCaptureFixture
+    ) -> None:
         wrapper = LoggingWrapper(inner=fake, logger_name="test.env")
         with caplog.at_level(logging.DEBUG, logger="test.env"):
-            asyncio.run(wrapper.cleanup())
+            await wrapper.cleanup()
         assert len(fake.calls) == 1
         assert fake.calls[0][0] == "cleanup"
         messages = [r.message for r in caplog.records if r.name == "test.env"]
         assert any("cleanup" in m for m in messages)
 
 
+class TestDisabledLevel:
+    """Log arguments are not evaluated when the level is disabled."""
+
+    async def test_write_skips_len_when_info_disabled(
+        self, fake: Any, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        class NoLen(str):
+            def __len__(self) -> int:
+                raise AssertionError("len() evaluated with logging disabled")
+
+        wrapper = LoggingWrapper(inner=fake, logger_name="test.env")
+        with caplog.at_level(logging.WARNING, logger="test.env"):
+            await wrapper.write_file("/tmp/out.txt", NoLen("hello"))
+        assert fake.calls[0][0] == "write_file"
+        assert not [r for r in caplog.records if r.name == "test.env"]
+
+    async def test_level_change_after_construction(
+        self, fake: Any, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        wrapper = LoggingWrapper(inner=fake, logger_name="test.env")
+        with caplog.at_level(logging.WARNING, logger="test.env"):
+            await wrapper.exec_command("echo quiet")
+        with caplog.at_level(logging.INFO, logger="test.env"):
+            await wrapper.exec_command("echo loud")
+        messages = [r.message for r in caplog.records if r.name == "test.env"]
+        assert not any("quiet" in m for m in messages)
+        assert any("loud" in m for m in messages)
+
+
+class TestStackedOverReadOnly:
+    """Logging over ReadOnly passes reads through and still blocks writes."""
+
+    async def test_reads_pass_through_writes_still_blocked(self, fake: Any) -> None:
+        wrapper = LoggingWrapper(inner=ReadOnlyWrapper(inner=fake))
+        assert await wrapper.file_exists("/tmp/x") is await fake.file_exists("/tmp/x")
+        fake.calls.clear()
+        with pytest.raises(PermissionError):
+            await wrapper.write_file("/tmp/out.txt", "hello")
+        assert fake.calls == []
+
+
+class TestDisabledLogger:
+    """A disabled logger turns the wrapper into a plain passthrough."""
+
+    async def test_disabled_logger_logs_nothing_until_reenabled(
+        self, fake: Any, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        logger = logging.getLogger("test.env.off")
+        logger.disabled = True
+        try:
+            wrapper = LoggingWrapper(inner=fake, logger_name=logger.name)
+            assert isinstance(wrapper, EnvironmentBackend)
+            with caplog.at_level(logging.DEBUG, logger=logger.name):
+                result = await wrapper.exec_command("echo hi")
+                await wrapper.write_file("/f", "x")
+            assert result.stdout == "hello"
+            assert [c[0] for c in fake.calls] == ["exec_command", "write_file"]
+            assert caplog.records == []
+
+            # Re-enabling (e.g. by dictConfig) takes effect on the next call
+            logger.disabled = False
+            with caplog.at_level(logging.INFO, logger=logger.name):
+                await wrapper.cleanup()
+        finally:
+            logger.disabled = False
+        messages = [r.getMessage() for r in caplog.records]
+        assert messages == ["env [fake]: cleanup"]
+
+
+class TestSubclassing:
+    """Subclasses can override the logged operations."""
+
+    async def test_overriding_subclass_is_called(self, fake: Any) -> None:
+        class Sub(LoggingWrapper):
+            async def exec_command(self, cmd: str, *args: Any) -> Any:
+                return "overridden"
+
+        wrapper = Sub(inner=fake)
+        assert type(wrapper) is Sub
+        assert await wrapper.exec_command("echo hi") == "overridden"
+        assert fake.calls == []
+
+    async def test_overriding_silent_operation_is_called(self, fake: Any) -> None:
+        class Sub(LoggingWrapper):
+            async def file_exists(self, path: str) -> bool:
+                return True
+
+        assert await Sub(inner=fake).file_exists("/nope") is True
+        assert fake.calls == []
+
+
+class TestRecordOrder:
+    """Records are emitted in call order within one task."""
+
+    async def test_write_logged_before_following_exec(
+        self, fake: Any, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        wrapper = LoggingWrapper(inner=fake, logger_name="test.env")
+        with caplog.at_level(logging.INFO, logger="test.env"):
+            await wrapper.write_file("/tmp/out.txt", "hello")
+            await wrapper.exec_command("cat /tmp/out.txt")
+        messages = [r.getMessage() for r in caplog.records]
+        assert messages[0] == "env [fake]: write /tmp/out.txt (5 chars)"
+        assert messages[1] == "env [fake]: exec 'cat /tmp/out.txt'"
+
+
+class TestPrefixedFormats:
+    """The env type is baked into the format strings, escaped for %."""
+
+    async def test_percent_in_env_type(
+        self, fake: Any, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        class PercentBackend(type(fake)):
+            @property
+            def env_type(self) -> str:
+                return "50%"
+
+        wrapper = LoggingWrapper(inner=PercentBackend(), logger_name="test.env")
+        with caplog.at_level(logging.INFO, logger="test.env"):
+            await wrapper.edit_file("/f", "a", "b")
+        assert caplog.records[0].getMessage() == "env [50%]: edit /f"
+
+
+class TestNoCallerLookup:
+    """Records are built without walking the stack for the caller."""
+
+    async def test_exec_skips_find_caller(
+        self,
+        fake: Any,
+        caplog: pytest.LogCaptureFixture,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        def find_caller(*args: Any) -> Any:
+            raise AssertionError("findCaller walked the stack")
+
+        wrapper = LoggingWrapper(inner=fake, logger_name="test.env")
+        monkeypatch.setattr(logging.getLogger("test.env"), "findCaller", find_caller)
+        with caplog.at_level(logging.INFO, logger="test.env"):
+            await wrapper.exec_command("echo hi")
+        assert len(caplog.records) == 2
+
+    async def test_records_point_at_the_logging_operation(
+        self, fake: Any, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        wrapper = LoggingWrapper(inner=fake, logger_name="test.env")
+        with caplog.at_level(logging.INFO, logger="test.env"):
+            await wrapper.write_file("/tmp/out.txt", "hello")
+        record = caplog.records[0]
+        code = LoggingWrapper.write_file.__code__
+        assert record.pathname == code.co_filename
+        assert record.lineno == code.co_firstlineno
+        assert record.funcName == "write_file"
+        assert record.module == "logging_wrapper"
+
+
+class TestStructuredFields:
+    """Records carry their fields as attributes via extra=."""
+
+    async def test_exec_result_record_fields(
+        self, fake: Any, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        wrapper = LoggingWrapper(inner=fake, logger_name="test.env")
+        with caplog.at_level(logging.INFO, logger="test.env"):
+            await wrapper.exec_command("echo hi")
+        record = caplog.records[-1]
+        assert record.env == "fake"
+        assert record.cmd == "echo hi"
+        assert record.exit_code == 0
+        assert isinstance(record.duration_ms, int)
+
+    async def test_read_record_fields(
+        self, fake: Any, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        wrapper = LoggingWrapper(inner=fake, logger_name="test.env")
+        with caplog.at_level(logging.DEBUG, logger="test.env"):
+            await wrapper.read_file("/etc/hosts")
+        record = caplog.records[0]
+        assert (record.env, record.path) == ("fake", "/etc/hosts")
+
+
+class TestLazyRepr:
+    """The exec command is repr'd once for both of its records."""
+
+    async def test_exec_repr_is_shared(
+        self, fake: Any, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        reprs: list[str] = []
+
+        class Cmd(str):
+            def __repr__(self) -> str:
+                reprs.append(str(self))
+                return str.__repr__(self)
+
+        wrapper = LoggingWrapper(inner=fake, logger_name="test.env")
+        with caplog.at_level(logging.INFO, logger="test.env"):
+            await wrapper.exec_command(Cmd("echo hi"))
+            messages = [r.getMessage() for r in caplog.records]
+        assert messages[0] == "env [fake]: exec 'echo hi'"
+        assert messages[1].startswith("env [fake]: exec 'echo hi' → exit 0")
+        assert reprs == ["echo hi"]
+
+
+class _Recorder(logging.Handler):
+    """Records each message with the name of the thread that emitted it."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.emitted: list[tuple[str, str]] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.emitted.append((record.getMessage(), threading.current_thread().name))
+
+
+@pytest.fixture
+def queued_logger() -> Iterator[tuple[logging.Logger, _Recorder]]:
+    logger = logging.getLogger("test.env.queued")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    recorder = _Recorder()
+    logger.addHandler(recorder)
+    yield logger, recorder
+    logger.removeHandler(recorder)
+    logger.propagate = True
+
+
+class TestQueuedHandlers:
+    """With buffer_size set, records are handled on the wrapper's own thread."""
+
+    async def test_unqueued_by_default(self, fake: Any, queued_logger: Any) -> None:
+        logger, recorder = queued_logger
+        wrapper = LoggingWrapper(inner=fake, logger_name=logger.name)
+        await wrapper.edit_file("/f", "a", "b")
+        assert recorder.emitted == [
+            ("env [fake]: edit /f", threading.current_thread().name)
+        ]
+
+    async def test_handler_io_moves_off_calling_thread(
+        self, fake: Any, queued_logger: Any
+    ) -> None:
+        logger, recorder = queued_logger
+        handlers = list(logger.handlers)
+        wrapper = LoggingWrapper(inner=fake, logger_name=logger.name, buffer_size=8)
+        assert logger.handlers == handlers
+        await wrapper.edit_file("/f", "a", "b")
+        await wrapper.cleanup()
+        assert [m for m, _ in recorder.emitted] == [
+            "env [fake]: edit /f",
+            "env [fake]: cleanup",
+        ]
+        assert recorder.emitted[0][1] != threading.current_thread().name
+        # The caller's handler list is left as configured
+        assert logger.handlers == handlers
+
+    async def test_cleanup_stops_the_queue_thread(
+        self, fake: Any, queued_logger: Any
+    ) -> None:
+        logger, recorder = queued_logger
+        wrapper = LoggingWrapper(inner=fake, logger_name=logger.name, buffer_size=8)
+        record_queue = wrapper._queue
+        await wrapper.cleanup()
+        assert not record_queue._thread.is_alive()
+        assert record_queue not in logging_wrapper._live_queues
+        # Later records are handled directly
+        await wrapper.edit_file("/f", "a", "b")
+        assert recorder.emitted[-1] == (
+            "env [fake]: edit /f",
+            threading.current_thread().name,
+        )
+
+    def test_non_positive_buffer_size_rejected(self, fake: Any) -> None:
+        with pytest.raises(ValueError, match="buffer_size"):
+            LoggingWrapper(inner=fake, buffer_size=0)
+
+
+def _make_record(msg: str) -> logging.LogRecord:
+    return logging.makeLogRecord({"msg": msg, "levelno": logging.INFO})
+
+
+class TestOverflowPolicy:
+    """The bounded record queue applies the configured overflow policy."""
+
+    @staticmethod
+    def _fill(overflow: logging_wrapper.OverflowPolicy) -> list[str]:
+        entered = threading.Event()
+        release = threading.Event()
+
+        class Slow(logging.Handler):
+            def __init__(self) -> None:
+                super().__init__()
+                self.handled: list[str] = []
+
+            def emit(self, record: logging.LogRecord) -> None:
+                entered.set()
+                release.wait()
+                self.handled.append(record.getMessage())
+
+        logger = logging.getLogger("test.env.overflow")
+        logger.propagate = False
+        slow = Slow()
+        logger.addHandler(slow)
+        try:
+            record_queue = logging_wrapper._RecordQueue(logger, "fake", 2, overflow, 0)
+            # The thread takes "zero" and stalls, so the queue fills up
+            record_queue.put(_make_record("zero"))
+            assert entered.wait(5)
+            for msg in ("one", "two", "three"):
+                record_queue.put(_make_record(msg))
+            release.set()
+            record_queue.stop()
+        finally:
+            logger.removeHandler(slow)
+            logger.propagate = True
+        return slow.handled
+
+    # The drop happens while "zero" is being handled, so it is reported
+    # at the end of that batch.
+    _DROPPED = "env [fake]: dropped 1 log record(s), queue full"
+
+    def test_drop_oldest(self) -> None:
+        assert self._fill("drop_oldest") == ["zero", self._DROPPED, "two", "three"]
+
+    def test_drop_newest(self) -> None:
+        assert self._fill("drop_newest") == ["zero", self._DROPPED, "one", "two"]
+
+    def test_block_drops_nothing(self) -> None:
+        entered = threading.Event()
+        handled: list[str] = []
+
+        class Recording(logging.Handler):
+            def emit(self, record: logging.LogRecord) -> None:
+                entered.set()
+                handled.append(record.getMessage())
+
+        logger = logging.getLogger("test.env.block")
+        logger.propagate = False
+        recording = Recording()
+        logger.addHandler(recording)
+        try:
+            record_queue = logging_wrapper._RecordQueue(logger, "fake", 1, "block", 0)
+            for msg in ("one", "two", "three"):
+                record_queue.put(_make_record(msg))
+            record_queue.stop()
+        finally:
+            logger.removeHandler(recording)
+            logger.propagate = True
+        assert handled == ["one", "two", "three"]
+
+    def test_unknown_policy_rejected(self, fake: Any) -> None:
+        with pytest.raises(ValueError, match="overflow policy"):
+            LoggingWrapper(inner=fake, buffer_size=8, overflow="spill")  # type: ignore[arg-type]
+
+    def test_queue_settings_without_buffer_rejected(self, fake: Any) -> None:
+        with pytest.raises(ValueError, match="require buffer_size"):
+            LoggingWrapper(inner=fake, overflow="drop_newest")
+        with pytest.raises(ValueError, match="require buffer_size"):
+            LoggingWrapper(inner=fake, flush_interval_ms=10)
+
+    def test_negative_flush_interval_rejected(self, fake: Any) -> None:
+        with pytest.raises(ValueError, match="flush_interval_ms"):
+            LoggingWrapper(inner=fake, buffer_size=8, flush_interval_ms=-1)
+
+    async def test_cleanup_does_not_wait_out_flush_interval(
+        self, fake: Any, queued_logger: Any
+    ) -> None:
+        logger, recorder = queued_logger
+        wrapper = LoggingWrapper(
+            inner=fake,
+            logger_name=logger.name,
+            buffer_size=8,
+            flush_interval_ms=60_000,
+        )
+        await wrapper.edit_file("/f", "a", "b")
+        await wrapper.edit_file("/g", "a", "b")
+        await asyncio.wait_for(wrapper.cleanup(), timeout=5)
+        assert [m for m, _ in recorder.emitted] == [
+            "env [fake]: edit /f",
+            "env [fake]: edit /g",
+            "env [fake]: cleanup",
+        ]
+
+
 class TestMetadataPassthrough:
     """env_type, working_directory, platform, os_version, info all delegate."""
 
-    def test_metadata_passthrough(self) -> None:
-        fake = FakeBackend()
-        wrapper = LoggingWrapper(inner=fake)
+    def test_metadata_passthrough(self, shared_fake: Any) -> None:
+        wrapper = LoggingWrapper(inner=shared_fake)
         assert wrapper.env_type == "fake"
         assert wrapper.working_directory() == "/fake/work"
         assert wrapper.platform() == "linux"
         assert wrapper.os_version() == "FakeOS 1.0"
         assert wrapper.info() == {"type": "fake", "working_dir": "/fake/work"}
+
+    def test_state_only_in_slots(self, shared_fake: Any) -> None:
+        wrapper = LoggingWrapper(inner=shared_fake)
+        assert not hasattr(wrapper, "__dict__")
+        assert "file_exists" not in LoggingWrapper.__slots__
@@ -94,6 +94,22 @@ class TestEnvExecResult:
         result = EnvExecResult(stdout="ok", stderr="", exit_code=0, duration_ms=1500)
         assert result.duration_ms == 1500
 
+    def test_model_dump_shape(self):
+        result = EnvExecResult(stdout="ok", exit_code=2, duration_ms=5)
+        assert result.model_dump() == {
+            "stdout": "ok",
+            "stderr": "",
+            "exit_code": 2,
+            "timed_out": False,
+            "duration_ms": 5,
+        }
+
+    def test_constructed_result_serializes_like_validated(self):
+        """Backends build results with model_construct; the JSON is the same."""
+        built = EnvExecResult.model_construct(stdout="ok", exit_code=0)
+        validated = EnvExecResult.model_validate({"stdout": "ok", "exit_code": 0})
+        assert built.model_dump_json() == validated.model_dump_json()
+
     def test_existing_construction_still_works(self):
         """Backward compat: constructing with only original fields works."""
         result = EnvExecResult(stdout="hi", stderr="", exit_code=0)
@@ -114,3 +130,7 @@ class TestEnvFileEntry:
         entry = EnvFileEntry(name="src", entry_type="dir")
         assert entry.entry_type == "dir"
         assert entry.size is None
+
+    def test_model_dump_shape(self):
+        entry = EnvFileEntry(name="a.txt", entry_type="file", size=3)
+        assert entry.model_dump() == {"name": "a.txt", "entry_type": "file", "size": 3}
@@ -140,6 +140,16 @@ class TestRegistryRegister:
         reg = EnvironmentRegistry()
         assert reg.get("nonexistent") is None
 
+    def test_getitem_and_contains(self):
+        reg = EnvironmentRegistry()
+        backend = StubBackend()
+        reg.register("dev", backend, env_type="local")
+        assert reg["dev"] is backend
+        assert "dev" in reg
+        assert "nonexistent" not in reg
+        with pytest.raises(KeyError):
+            reg["nonexistent"]
+
     def test_register_with_metadata(self):
         reg = EnvironmentRegistry()
         reg.register(
@@ -201,6 +211,25 @@ class TestRegistryDestroy:
         # Registry should be empty after destroy_all
         assert reg.list_instances() == []
 
+    def test_destroy_all_runs_cleanups_concurrently(self):
+        reg = EnvironmentRegistry()
+        running: list[int] = []
+        peak = 0
+
+        class SlowBackend(StubBackend):
+            async def cleanup(self) -> None:
+                nonlocal peak
+                running.append(1)
+                peak = max(peak, len(running))
+                await asyncio.sleep(0.01)
+                running.pop()
+
+        for i in range(4):
+            reg.register(f"env-{i}", SlowBackend(), env_type="local")
+        asyncio.run(reg.destroy_all())
+        assert peak == 4
+        assert reg.list_instances() == []
+
 
 # ---------------------------------------------------------------------------
 # TestRegistryList
@@ -237,6 +266,25 @@ class TestRegistryList:
         result = reg.list_instances()
         assert result[0]["container_id"] == "abc123"
 
+    def test_names_skips_info(self):
+        reg = EnvironmentRegistry()
+        backend = StubBackend()
+        backend.info = None  # names() must not call it
+        reg.register("a", backend, env_type="local")
+        reg.register("b", StubBackend(), env_type="local")
+        assert reg.names() == ["a", "b"]
+
+    def test_iter_instances_is_lazy(self):
+        reg = EnvironmentRegistry()
+        calls = []
+        for name in ("a", "b", "c"):
+            backend = StubBackend()
+            backend.info = lambda name=name: calls.append(name) or {}
+            reg.register(name, backend, env_type="local")
+        first = next(reg.iter_instances())
+        assert first["name"] == "a"
+        assert calls == ["a"]
+
 
 # ---------------------------------------------------------------------------
 # TestRegistryOwned
@@ -258,7 +306,6 @@ class TestRegistryOwned:
         instances = reg.list_instances()
         assert instances[0].get("owned") is False
 
-    @pytest.mark.asyncio
     async def test_destroy_all_skips_unowned(self):
         """destroy_all() only destroys owned instances."""
         reg = EnvironmentRegistry()
@@ -274,7 +321,6 @@ class TestRegistryOwned:
         # mine should be gone
         assert reg.get("mine") is None
 
-    @pytest.mark.asyncio
     async def test_destroy_explicit_destroys_regardless_of_owned(self):
         """Explicit destroy() works regardless of owned flag."""
         reg = EnvironmentRegistry()
@@ -61,3 +61,33 @@ class TestPyprojectToml:
         assert "entry-points" not in data.get("project", {})
         assert "scripts" not in data.get("project", {})
         assert "gui-scripts" not in data.get("project", {})
+
+
+class TestLazyExports:
+    """Package-level names resolve on first access (PEP 562)."""
+
+    def test_import_does_not_load_submodules(self):
+        import subprocess
+        import sys
+
+        code = (
+            "import sys, amplifier_env_common; "
+            "print('amplifier_env_common.schemas' in sys.modules)"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        assert out.stdout.strip() == "False"
+
+    def test_all_names_resolve(self):
+        import amplifier_env_common
+
+        for name in amplifier_env_common.__all__:
+            assert getattr(amplifier_env_common, name) is not None
+
+    def test_unknown_name_raises_attribute_error(self):
+        import amplifier_env_common
+        import pytest
+
+        with pytest.raises(AttributeError):
+            amplifier_env_common.DoesNotExist  # noqa: B018
@@ -2,9 +2,19 @@
 
 from __future__ import annotations
 
+import asyncio
+import base64
+import weakref
+
 import pytest
 
-from amplifier_env_common.backends.ssh import SSHBackendWrapper
+from amplifier_env_common.backends import ssh as ssh_module
+from amplifier_env_common.backends.ssh import (
+    AsyncSSHBackend,
+    SSHBackendWrapper,
+    SSHConnection,
+    SSHConnectionConfig,
+)
 from amplifier_env_common.models import EnvExecResult, EnvFileEntry
 from amplifier_env_common.protocol import EnvironmentBackend
 
@@ -53,6 +63,17 @@ def backend(mock_exec):
     )
 
 
+async def _shell_exec(cmd: str, timeout: float | None = None) -> EnvExecResult:
+    """SSH exec stand-in that runs commands in a local shell."""
+    proc = await asyncio.create_subprocess_shell(
+        cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await proc.communicate()
+    return EnvExecResult(
+        stdout=stdout.decode(), stderr=stderr.decode(), exit_code=proc.returncode
+    )
+
+
 # ---------------------------------------------------------------------------
 # Protocol conformance
 # ---------------------------------------------------------------------------
@@ -76,7 +97,6 @@ class TestProtocolConformance:
 class TestExecCommand:
     """exec_command passes command through the exec function."""
 
-    @pytest.mark.asyncio
     async def test_passes_command_through(self, backend, mock_exec):
         mock_exec.add_response(stdout="hello\n", stderr="", exit_code=0)
         result = await backend.exec_command("echo hello")
@@ -85,27 +105,23 @@ class TestExecCommand:
         assert result.stderr == ""
         assert result.exit_code == 0
 
-    @pytest.mark.asyncio
     async def test_captures_stderr_and_exit_code(self, backend, mock_exec):
         mock_exec.add_response(stdout="", stderr="error msg", exit_code=1)
         result = await backend.exec_command("failing_cmd")
         assert result.stderr == "error msg"
         assert result.exit_code == 1
 
-    @pytest.mark.asyncio
     async def test_records_command(self, backend, mock_exec):
         mock_exec.add_response(stdout="ok")
         await backend.exec_command("ls -la")
         assert len(mock_exec.calls) == 1
         assert mock_exec.calls[0]["cmd"] == "ls -la"
 
-    @pytest.mark.asyncio
     async def test_passes_timeout(self, backend, mock_exec):
         mock_exec.add_response()
         await backend.exec_command("pwd", timeout=30.0)
         assert mock_exec.calls[0]["timeout"] == 30.0
 
-    @pytest.mark.asyncio
     async def test_workdir_prepends_cd(self, backend, mock_exec):
         mock_exec.add_response()
         await backend.exec_command("pwd", workdir="/tmp/mydir")
@@ -114,14 +130,12 @@ class TestExecCommand:
         assert "/tmp/mydir" in cmd
         assert "pwd" in cmd
 
-    @pytest.mark.asyncio
     async def test_workdir_with_spaces_is_quoted(self, backend, mock_exec):
         mock_exec.add_response()
         await backend.exec_command("ls", workdir="/tmp/my dir")
         cmd = mock_exec.calls[0]["cmd"]
         assert "'/tmp/my dir'" in cmd
 
-    @pytest.mark.asyncio
     async def test_no_workdir_sends_raw_command(self, backend, mock_exec):
         mock_exec.add_response()
         await backend.exec_command("echo hi")
@@ -136,7 +150,6 @@ class TestExecCommand:
 class TestReadFile:
     """read_file translates to cat command."""
 
-    @pytest.mark.asyncio
     async def test_simple_cat(self, backend, mock_exec):
         mock_exec.add_response(stdout="file content\n")
         content = await backend.read_file("/home/user/hello.txt")
@@ -145,7 +158,6 @@ class TestReadFile:
         assert "cat" in cmd
         assert "/home/user/hello.txt" in cmd
 
-    @pytest.mark.asyncio
     async def test_with_offset_and_limit(self, backend, mock_exec):
         mock_exec.add_response(stdout="line2\nline3\n")
         content = await backend.read_file("/home/user/f.txt", offset=2, limit=2)
@@ -154,7 +166,6 @@ class TestReadFile:
         assert "tail -n +2" in cmd
         assert "head -n 2" in cmd
 
-    @pytest.mark.asyncio
     async def test_with_offset_only(self, backend, mock_exec):
         mock_exec.add_response(stdout="line2\nline3\n")
         content = await backend.read_file("/home/user/f.txt", offset=2)
@@ -162,7 +173,6 @@ class TestReadFile:
         cmd = mock_exec.calls[0]["cmd"]
         assert "tail -n +2" in cmd
 
-    @pytest.mark.asyncio
     async def test_with_limit_only(self, backend, mock_exec):
         mock_exec.add_response(stdout="line1\n")
         content = await backend.read_file("/home/user/f.txt", limit=1)
@@ -170,7 +180,6 @@ class TestReadFile:
         cmd = mock_exec.calls[0]["cmd"]
         assert "head -n 1" in cmd
 
-    @pytest.mark.asyncio
     async def test_shell_quoting(self, backend, mock_exec):
         """Paths with spaces must be shell-quoted."""
         mock_exec.add_response(stdout="data")
@@ -185,9 +194,8 @@ class TestReadFile:
 
 
 class TestWriteFile:
-    """write_file translates to mkdir -p + printf."""
+    """write_file translates to mkdir -p + base64 -d (stdin or printf)."""
 
-    @pytest.mark.asyncio
     async def test_writes_with_printf(self, backend, mock_exec):
         mock_exec.add_response()
         await backend.write_file("/home/user/a/b/out.txt", "hello world")
@@ -196,7 +204,6 @@ class TestWriteFile:
         assert "mkdir -p" in cmd
         assert "/home/user/a/b/out.txt" in cmd
 
-    @pytest.mark.asyncio
     async def test_no_mkdir_for_root_level_file(self, backend, mock_exec):
         """Files without '/' in path skip mkdir -p."""
         mock_exec.add_response()
@@ -205,6 +212,62 @@ class TestWriteFile:
         assert "printf" in cmd
         assert "mkdir" not in cmd
 
+    async def test_no_mkdir_for_file_under_root(self, backend, mock_exec):
+        """'/name' has an empty parent; mkdir -p '' would fail the write."""
+        mock_exec.add_response()
+        await backend.write_file("/top.txt", "content")
+        cmd = mock_exec.calls[0]["cmd"]
+        assert "mkdir" not in cmd
+        assert cmd.endswith("> /top.txt")
+
+    async def test_content_streamed_over_stdin(self):
+        calls = []
+
+        async def exec_fn(cmd, timeout=None, input=None):
+            calls.append((cmd, input))
+            return EnvExecResult(exit_code=0)
+
+        backend = SSHBackendWrapper(exec_fn=exec_fn, host="h", exec_accepts_input=True)
+        content = "it's $HOME\n" * 10_000
+        await backend.write_file("/home/user/out.txt", content)
+        cmd, stdin = calls[0]
+        assert cmd == "mkdir -p /home/user && base64 -d > /home/user/out.txt"
+        assert base64.b64decode(stdin).decode() == content
+
+    async def test_stdin_only_when_flagged(self):
+        calls = []
+
+        async def exec_fn(cmd, timeout=None, **kwargs):
+            calls.append(kwargs)
+            return EnvExecResult(exit_code=0)
+
+        backend = SSHBackendWrapper(exec_fn=exec_fn, host="h")
+        await backend.write_file("/out.txt", "hello")
+        assert calls == [{}]
+
+    async def test_base64_round_trip_real_shell(self, tmp_path):
+        async def shell_exec(cmd, timeout=None, input=None):
+            proc = await asyncio.create_subprocess_shell(
+                cmd,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stdout, stderr = await proc.communicate(input.encode() if input else None)
+            return EnvExecResult(
+                stdout=stdout.decode(),
+                stderr=stderr.decode(),
+                exit_code=proc.returncode,
+            )
+
+        backend = SSHBackendWrapper(
+            exec_fn=shell_exec, host="localhost", exec_accepts_input=True
+        )
+        target = tmp_path / "new" / "f.txt"
+        content = "quotes ' \" `x` é\r\n\x00end"
+        await backend.write_file(str(target), content)
+        assert target.read_bytes() == content.encode()
+
 
 # ---------------------------------------------------------------------------
 # edit_file
@@ -212,33 +275,55 @@ class TestWriteFile:
 
 
 class TestEditFile:
-    """edit_file reads via cat, patches in Python, writes back."""
+    """edit_file patches remotely with python3, else cat + Python + printf."""
 
-    @pytest.mark.asyncio
-    async def test_read_modify_write(self, backend, mock_exec):
-        # Response 1: cat reads existing content
-        mock_exec.add_response(stdout="hello world")
-        # Response 2: printf writes patched content
+    async def test_single_round_trip_with_python3(self, backend, mock_exec):
         mock_exec.add_response()
         result = await backend.edit_file("/home/user/edit.txt", "hello", "goodbye")
-        assert len(mock_exec.calls) == 2
-        # First call: cat to read
-        assert "cat" in mock_exec.calls[0]["cmd"]
-        # Second call: printf to write
-        assert "printf" in mock_exec.calls[1]["cmd"]
+        assert len(mock_exec.calls) == 1
+        assert mock_exec.calls[0]["cmd"].startswith("python3 -c ")
         assert "Edited" in result or "replaced" in result
 
-    @pytest.mark.asyncio
     async def test_string_not_found_raises(self, backend, mock_exec):
-        mock_exec.add_response(stdout="hello world")
+        mock_exec.add_response(stdout="0\n", exit_code=3)
         with pytest.raises(ValueError, match="not found"):
             await backend.edit_file("/home/user/edit.txt", "nonexistent", "replacement")
 
-    @pytest.mark.asyncio
     async def test_string_not_unique_raises(self, backend, mock_exec):
+        mock_exec.add_response(stdout="2\n", exit_code=3)
+        with pytest.raises(ValueError, match="not unique"):
+            await backend.edit_file("/home/user/edit.txt", "aaa", "ccc")
+
+    async def test_read_modify_write_without_python3(self, backend, mock_exec):
+        # Response 1: python3 missing on the host
+        mock_exec.add_response(stderr="python3: not found", exit_code=127)
+        # Response 2: cat reads existing content
+        mock_exec.add_response(stdout="hello world")
+        # Response 3: printf writes patched content
+        mock_exec.add_response()
+        result = await backend.edit_file("/home/user/edit.txt", "hello", "goodbye")
+        assert len(mock_exec.calls) == 3
+        assert "cat" in mock_exec.calls[1]["cmd"]
+        assert "printf" in mock_exec.calls[2]["cmd"]
+        assert "Edited" in result or "replaced" in result
+
+        # The missing python3 is remembered: next edit goes straight to cat
         mock_exec.add_response(stdout="aaa bbb aaa")
         with pytest.raises(ValueError, match="not unique"):
             await backend.edit_file("/home/user/edit.txt", "aaa", "ccc")
+        assert mock_exec.calls[3]["cmd"].startswith("cat ")
+
+    async def test_remote_script_real_shell(self, tmp_path):
+        target = tmp_path / "it's.txt"
+        target.write_bytes(b"line 'one'\r\n$HOME\r\n")
+
+        backend = SSHBackendWrapper(exec_fn=_shell_exec, host="localhost")
+        await backend.edit_file(str(target), "$HOME", "'quoted' é")
+        assert target.read_bytes() == "line 'one'\r\n'quoted' é\r\n".encode()
+        with pytest.raises(ValueError, match="not found"):
+            await backend.edit_file(str(target), "absent", "x")
+        with pytest.raises(ValueError, match="not found"):
+            await backend.edit_file(str(tmp_path / "missing.txt"), "a", "b")
 
 
 # ---------------------------------------------------------------------------
@@ -249,14 +334,12 @@ class TestEditFile:
 class TestFileExists:
     """file_exists translates to test -e, exit code determines result."""
 
-    @pytest.mark.asyncio
     async def test_exists_returns_true(self, backend, mock_exec):
         mock_exec.add_response(exit_code=0)
         result = await backend.file_exists("/home/user/exists.txt")
         assert result is True
         assert "test -e" in mock_exec.calls[0]["cmd"]
 
-    @pytest.mark.asyncio
     async def test_not_exists_returns_false(self, backend, mock_exec):
         mock_exec.add_response(exit_code=1)
         result = await backend.file_exists("/home/user/nope.txt")
@@ -271,7 +354,6 @@ class TestFileExists:
 class TestListDir:
     """list_dir translates to ls -1ap and parses output."""
 
-    @pytest.mark.asyncio
     async def test_parses_ls_output(self, backend, mock_exec):
         mock_exec.add_response(stdout="./\n../\nfile.txt\nsubdir/\n")
         entries = await backend.list_dir("/home/user")
@@ -284,7 +366,6 @@ class TestListDir:
         assert "." not in names
         assert ".." not in names
 
-    @pytest.mark.asyncio
     async def test_entry_types(self, backend, mock_exec):
         mock_exec.add_response(stdout="readme.md\nsrc/\n")
         entries = await backend.list_dir("/home/user")
@@ -292,7 +373,6 @@ class TestListDir:
         assert by_name["readme.md"].entry_type == "file"
         assert by_name["src"].entry_type == "dir"
 
-    @pytest.mark.asyncio
     async def test_sends_ls_command(self, backend, mock_exec):
         mock_exec.add_response(stdout="")
         await backend.list_dir("/home/user/subdir")
@@ -309,7 +389,6 @@ class TestListDir:
 class TestGrep:
     """grep translates to grep -rn."""
 
-    @pytest.mark.asyncio
     async def test_finds_matches(self, backend, mock_exec):
         mock_exec.add_response(stdout="/home/user/f.py:1:needle\n")
         result = await backend.grep("needle", path="/home/user")
@@ -318,13 +397,11 @@ class TestGrep:
         assert "grep" in cmd
         assert "-rn" in cmd
 
-    @pytest.mark.asyncio
     async def test_no_match_returns_message(self, backend, mock_exec):
         mock_exec.add_response(stdout="", exit_code=1)
         result = await backend.grep("nonexistent", path="/home/user")
         assert "No matches" in result
 
-    @pytest.mark.asyncio
     async def test_glob_filter(self, backend, mock_exec):
         mock_exec.add_response(stdout="match\n")
         await backend.grep("pattern", path="/home/user", glob_filter="*.py")
@@ -332,7 +409,6 @@ class TestGrep:
         assert "--include" in cmd
         assert "*.py" in cmd
 
-    @pytest.mark.asyncio
     async def test_default_path_uses_home(self, backend, mock_exec):
         """Without explicit path, grep should use a default search path."""
         mock_exec.add_response(stdout="")
@@ -351,14 +427,12 @@ class TestGrep:
 class TestGlobFiles:
     """glob_files translates to find -name."""
 
-    @pytest.mark.asyncio
     async def test_parses_find_output(self, backend, mock_exec):
         mock_exec.add_response(stdout="/home/user/a.py\n/home/user/sub/b.py\n")
         matches = await backend.glob_files("*.py", path="/home/user")
         assert "/home/user/a.py" in matches
         assert "/home/user/sub/b.py" in matches
 
-    @pytest.mark.asyncio
     async def test_strips_recursive_prefix(self, backend, mock_exec):
         """Patterns like **/*.py should strip **/ for find -name."""
         mock_exec.add_response(stdout="")
@@ -369,12 +443,17 @@ class TestGlobFiles:
         # The **/ prefix should be stripped since find is already recursive
         assert "**/" not in cmd
 
-    @pytest.mark.asyncio
     async def test_empty_output_returns_empty_list(self, backend, mock_exec):
         mock_exec.add_response(stdout="")
         matches = await backend.glob_files("*.nonexistent", path="/home/user")
         assert matches == []
 
+    async def test_repeated_globstar_prefix_stripped(self, backend, mock_exec):
+        mock_exec.add_response(stdout="\n/home/user/a/b.py\n\n")
+        matches = await backend.glob_files("**/**/*.py", path="/home/user")
+        assert mock_exec.calls[0]["cmd"] == "find /home/user -name '*.py'"
+        assert matches == ["/home/user/a/b.py"]
+
 
 # ---------------------------------------------------------------------------
 # cleanup
@@ -384,7 +463,6 @@ class TestGlobFiles:
 class TestCleanup:
     """cleanup calls disconnect_fn if provided."""
 
-    @pytest.mark.asyncio
     async def test_calls_disconnect_fn(self, mock_exec):
         disconnect_called = []
 
@@ -399,7 +477,6 @@ class TestCleanup:
         await backend.cleanup()
         assert len(disconnect_called) == 1
 
-    @pytest.mark.asyncio
     async def test_no_disconnect_fn_is_noop(self, backend):
         """cleanup without disconnect_fn should not raise."""
         await backend.cleanup()  # Should not raise
@@ -444,6 +521,54 @@ class TestMetadata:
         assert isinstance(result, str)
         assert len(result) > 0
 
+    async def test_probe_platform_runs_uname_once(self):
+        mock_exec = MockExecFn()
+        mock_exec.add_response(stdout="Linux\n6.1.0-18-amd64\n")
+        backend = SSHBackendWrapper(exec_fn=mock_exec, host="probe-host")
+        await asyncio.gather(backend.probe_platform(), backend.probe_platform())
+        assert [c["cmd"] for c in mock_exec.calls] == ["uname -s; uname -r"]
+        assert backend.platform() == "linux"
+        assert backend.os_version() == "6.1.0-18-amd64"
+        await backend.probe_platform()
+        assert len(mock_exec.calls) == 1
+
+    async def test_probe_is_not_shared_between_connections(self):
+        first_exec, second_exec = MockExecFn(), MockExecFn()
+        first_exec.add_response(stdout="Linux\n6.1.0-18-amd64\n")
+        second_exec.add_response(stdout="FreeBSD\n14.0-RELEASE\n")
+        first = SSHBackendWrapper(exec_fn=first_exec, host="same-host")
+        second = SSHBackendWrapper(exec_fn=second_exec, host="same-host")
+        await first.probe_platform()
+        await second.probe_platform()
+        assert first.platform() == "linux"
+        assert second.platform() == "freebsd"
+
+    async def test_first_platform_call_probes_in_background(self):
+        mock_exec = MockExecFn()
+        mock_exec.add_response(stdout="Linux\n6.1.0-18-amd64\n")
+        backend = SSHBackendWrapper(exec_fn=mock_exec, host="lazy-host")
+        assert mock_exec.calls == []
+        assert backend.os_version() == "unknown"
+        await asyncio.sleep(0)
+        assert backend.os_version() == "6.1.0-18-amd64"
+        assert len(mock_exec.calls) == 1
+
+    def test_platform_without_loop_keeps_default(self):
+        mock_exec = MockExecFn()
+        backend = SSHBackendWrapper(exec_fn=mock_exec, host="sync-host")
+        assert backend.platform() == "linux"
+        assert mock_exec.calls == []
+
+    async def test_failed_probe_keeps_defaults_and_retries(self):
+        mock_exec = MockExecFn()
+        mock_exec.add_response(stderr="uname: not found", exit_code=127)
+        backend = SSHBackendWrapper(exec_fn=mock_exec, host="bare-host")
+        await backend.probe_platform()
+        assert backend.platform() == "linux"
+        assert backend.os_version() == "unknown"
+        await backend.probe_platform()
+        assert len(mock_exec.calls) == 2
+
 
 # ---------------------------------------------------------------------------
 # NLSpec: Timing on exec_command
@@ -453,13 +578,17 @@ class TestMetadata:
 class TestExecTiming:
     """exec_command must return duration_ms and timed_out fields."""
 
-    @pytest.mark.asyncio
     async def test_exec_has_duration_ms(self, backend, mock_exec):
         mock_exec.add_response(stdout="ok")
         result = await backend.exec_command("echo ok")
         assert result.duration_ms >= 0
 
-    @pytest.mark.asyncio
+    async def test_measure_duration_off_reports_zero(self, mock_exec):
+        backend = SSHBackendWrapper(exec_fn=mock_exec, host="h", measure_duration=False)
+        result = await backend.exec_command("echo ok")
+        assert result.duration_ms == 0
+        assert result.exit_code == 0
+
     async def test_exec_has_timed_out_false(self, backend, mock_exec):
         mock_exec.add_response(stdout="ok")
         result = await backend.exec_command("echo ok")
@@ -472,28 +601,34 @@ class TestExecTiming:
 
 
 class TestExecEnvVars:
-    """exec_command env_vars should prepend export commands."""
+    """exec_command env_vars should prepend a single export."""
+
+    async def test_env_values_not_memoized(self, backend, mock_exec):
+        """Values may be secrets; they bypass the path-quoting cache."""
+        ssh_module._q.cache_clear()
+        await backend.exec_command("true", env_vars={"API_KEY": "s3cr3t value"})
+        await backend.read_file("/etc/hosts")
+        await backend.file_exists("/etc/hosts")
+        info = ssh_module._q.cache_info()
+        assert (info.hits, info.currsize) == (1, 1)
 
-    @pytest.mark.asyncio
     async def test_exec_with_env_vars(self, backend, mock_exec):
         mock_exec.add_response(stdout="ok")
         await backend.exec_command("echo $FOO", env_vars={"FOO": "bar", "BAZ": "qux"})
         cmd = mock_exec.calls[0]["cmd"]
-        assert "export FOO=" in cmd
-        assert "export BAZ=" in cmd
+        assert cmd.startswith("export FOO=bar BAZ=qux && ")
+        assert cmd.count("export") == 1
         # The exports should come before the actual command
         export_pos = cmd.index("export")
         echo_pos = cmd.index("echo")
         assert export_pos < echo_pos
 
-    @pytest.mark.asyncio
     async def test_exec_without_env_vars_unchanged(self, backend, mock_exec):
         mock_exec.add_response(stdout="ok")
         await backend.exec_command("echo hi")
         cmd = mock_exec.calls[0]["cmd"]
         assert cmd == "echo hi"
 
-    @pytest.mark.asyncio
     async def test_exec_env_vars_values_are_quoted(self, backend, mock_exec):
         mock_exec.add_response(stdout="ok")
         await backend.exec_command("echo $X", env_vars={"X": "hello world"})
@@ -501,6 +636,11 @@ class TestExecEnvVars:
         # Value with spaces must be shell-quoted
         assert "'hello world'" in cmd
 
+    async def test_exec_env_vars_with_workdir(self, backend, mock_exec):
+        mock_exec.add_response(stdout="ok")
+        await backend.exec_command("make", workdir="/src", env_vars={"CC": "gcc"})
+        assert mock_exec.calls[0]["cmd"] == "cd /src && export CC=gcc && make"
+
 
 # ---------------------------------------------------------------------------
 # NLSpec: depth on list_dir
@@ -510,25 +650,46 @@ class TestExecEnvVars:
 class TestListDirDepth:
     """list_dir depth parameter controls ls vs find usage."""
 
-    @pytest.mark.asyncio
     async def test_list_dir_depth_1_uses_ls(self, backend, mock_exec):
         mock_exec.add_response(stdout="file.txt\nsubdir/\n")
         await backend.list_dir("/home/user")
         cmd = mock_exec.calls[0]["cmd"]
         assert "ls -1ap" in cmd
 
-    @pytest.mark.asyncio
     async def test_list_dir_depth_2_uses_find(self, backend, mock_exec):
-        # Response for find (all entries)
-        mock_exec.add_response(stdout="/home/user/a.py\n/home/user/sub\n")
-        # Response for find -type d (directories)
-        mock_exec.add_response(stdout="/home/user/sub\n")
+        mock_exec.add_response(stdout="f\t3\ta.py\nd\t4096\tsub\n")
         await backend.list_dir("/home/user", depth=2)
         cmd = mock_exec.calls[0]["cmd"]
         assert "find" in cmd
         assert "-maxdepth 2" in cmd
         assert "-mindepth 1" in cmd
 
+    async def test_list_dir_depth_2_single_round_trip(self, backend, mock_exec):
+        mock_exec.add_response(
+            stdout="f\t3\ta.py\nd\t4096\tsub\n"
+            "directory\t4096\t./sub/deep\nregular file\t7\t./sub/x.txt\r\n"
+        )
+        entries = await backend.list_dir("/home/user", depth=2)
+        assert len(mock_exec.calls) == 1
+        assert mock_exec.calls[0]["cmd"].startswith("cd /home/user && ")
+        assert [(e.name, e.entry_type, e.size) for e in entries] == [
+            ("a.py", "file", 3),
+            ("sub", "dir", None),
+            ("sub/deep", "dir", None),
+            ("sub/x.txt", "file", 7),
+        ]
+
+    async def test_list_dir_depth_2_real_shell(self, tmp_path):
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "x.txt").write_text("hello")
+
+        backend = SSHBackendWrapper(exec_fn=_shell_exec, host="localhost")
+        entries = await backend.list_dir(str(tmp_path), depth=2)
+        by_name = {e.name: e for e in entries}
+        assert by_name["sub"].entry_type == "dir"
+        assert by_name["sub/x.txt"].entry_type == "file"
+        assert by_name["sub/x.txt"].size == 5
+
 
 # ---------------------------------------------------------------------------
 # NLSpec: grep params (case_insensitive, max_results)
@@ -538,14 +699,12 @@ class TestListDirDepth:
 class TestGrepParams:
     """grep must support case_insensitive and max_results params."""
 
-    @pytest.mark.asyncio
     async def test_grep_case_insensitive(self, backend, mock_exec):
         mock_exec.add_response(stdout="match\n")
         await backend.grep("pattern", path="/home/user", case_insensitive=True)
         cmd = mock_exec.calls[0]["cmd"]
         assert "-i" in cmd
 
-    @pytest.mark.asyncio
     async def test_grep_max_results(self, backend, mock_exec):
         mock_exec.add_response(stdout="match\n")
         await backend.grep("pattern", path="/home/user", max_results=5)
@@ -553,16 +712,191 @@ class TestGrepParams:
         assert "-m" in cmd
         assert "5" in cmd
 
-    @pytest.mark.asyncio
     async def test_grep_case_insensitive_default_false(self, backend, mock_exec):
         mock_exec.add_response(stdout="match\n")
         await backend.grep("pattern", path="/home/user")
         cmd = mock_exec.calls[0]["cmd"]
         assert "-i" not in cmd
 
-    @pytest.mark.asyncio
     async def test_grep_max_results_default_none(self, backend, mock_exec):
         mock_exec.add_response(stdout="match\n")
         await backend.grep("pattern", path="/home/user")
         cmd = mock_exec.calls[0]["cmd"]
         assert "-m " not in cmd
+
+
+# ---------------------------------------------------------------------------
+# Connection pooling
+# ---------------------------------------------------------------------------
+
+
+class FakeSSHConn:
+    """Minimal stand-in for an asyncssh.SSHClientConnection."""
+
+    def __init__(self) -> None:
+        self.closed = False
+        self.active = 0
+        self.peak = 0
+
+    async def run(self, cmd, timeout=None, input=None, check=True):
+        if check:
+            raise AssertionError("exec_command must not ask asyncssh to raise")
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return type("R", (), {"stdout": cmd, "stderr": "", "exit_status": 0})()
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class TestConnectionPool:
+    """AsyncSSHBackend shares one connection per host/port/user/key."""
+
+    @pytest.fixture(autouse=True)
+    def fake_connect(self, monkeypatch):
+        asyncssh = pytest.importorskip("asyncssh")
+        opened: list[FakeSSHConn] = []
+
+        async def connect(**kwargs):
+            await asyncio.sleep(0)
+            conn = FakeSSHConn()
+            conn.kwargs = kwargs
+            opened.append(conn)
+            return conn
+
+        monkeypatch.setattr(asyncssh, "connect", connect)
+        monkeypatch.setattr(ssh_module, "_POOLS", weakref.WeakKeyDictionary())
+        return opened
+
+    def _connection(self, host="example.com"):
+        config = SSHConnectionConfig(host=host, username="user")
+        return SSHConnection(config=config, backend=AsyncSSHBackend(config))
+
+    async def test_same_key_shares_connection(self, fake_connect):
+        a, b = self._connection(), self._connection()
+        await asyncio.gather(a.connect(), b.connect())
+        assert len(fake_connect) == 1
+        assert a._conn is b._conn
+
+    async def test_different_host_gets_own_connection(self, fake_connect):
+        await self._connection("a.example.com").connect()
+        await self._connection("b.example.com").connect()
+        assert len(fake_connect) == 2
+
+    async def test_known_hosts_is_part_of_the_key(self, fake_connect):
+        await self._connection().connect()
+        strict = SSHConnectionConfig(
+            host="example.com", username="user", known_hosts=["~/.ssh/known_hosts"]
+        )
+        await SSHConnection(config=strict, backend=AsyncSSHBackend(strict)).connect()
+        assert len(fake_connect) == 2
+
+    def test_each_event_loop_has_its_own_pool(self, fake_connect):
+        async def connect_once():
+            conn = self._connection()
+            await conn.connect()
+            return conn._conn
+
+        first = asyncio.run(connect_once())
+        second = asyncio.run(connect_once())
+        assert first is not second
+        assert len(fake_connect) == 2
+
+    async def test_closed_only_after_last_disconnect(self, fake_connect):
+        a, b = self._connection(), self._connection()
+        await a.connect()
+        await b.connect()
+        conn = fake_connect[0]
+        await a.disconnect()
+        assert not conn.closed
+        await b.disconnect()
+        assert conn.closed
+
+    async def test_closed_connection_replaced(self, fake_connect):
+        a = self._connection()
+        await a.connect()
+        fake_connect[0].close()
+        b = self._connection()
+        await b.connect()
+        assert len(fake_connect) == 2
+        assert b._conn is fake_connect[1]
+
+    async def test_evict_forces_reconnect(self, fake_connect):
+        a = self._connection()
+        await a.connect()
+        a._backend.evict()
+        assert fake_connect[0].closed
+        await self._connection().connect()
+        assert len(fake_connect) == 2
+
+    async def test_concurrent_runs_capped_per_connection(self, fake_connect):
+        a, b = self._connection(), self._connection()
+        await a.connect()
+        await b.connect()
+        results = await asyncio.gather(
+            *(c.exec_command(f"echo {i}") for i in range(20) for c in (a, b))
+        )
+        assert len(results) == 40
+        assert fake_connect[0].peak == 9
+
+    async def test_connection_decodes_utf8_once(self, fake_connect):
+        a = self._connection()
+        await a.connect()
+        assert fake_connect[0].kwargs["encoding"] == "utf-8"
+        result = await a.exec_command("héllo")
+        assert result.stdout == "héllo"
+        assert result.stderr == ""
+
+
+class TestConnectCancellation:
+    """A connect() cancelled mid-handshake leaves nothing open in the pool."""
+
+    @pytest.fixture
+    def gated_open(self, monkeypatch):
+        gate = asyncio.Event()
+        opened: list[FakeSSHConn] = []
+
+        async def _open(self):
+            await gate.wait()
+            opened.append(FakeSSHConn())
+            return opened[-1]
+
+        monkeypatch.setattr(AsyncSSHBackend, "_open", _open)
+        monkeypatch.setattr(ssh_module, "_POOLS", weakref.WeakKeyDictionary())
+        return gate, opened
+
+    def _backend(self):
+        return AsyncSSHBackend(SSHConnectionConfig(host="example.com"))
+
+    async def test_cancelled_sole_waiter_drops_the_handshake(self, gated_open):
+        gate, opened = gated_open
+        waiter = asyncio.ensure_future(self._backend().connect())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        gate.set()
+        await asyncio.sleep(0)
+        assert opened == []
+        assert ssh_module._loop_pool() == {}
+
+    async def test_other_waiter_keeps_the_connection(self, gated_open):
+        gate, opened = gated_open
+        cancelled = asyncio.ensure_future(self._backend().connect())
+        kept = asyncio.ensure_future(self._backend().connect())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        gate.set()
+        conn = await kept
+        assert cancelled.cancelled()
+        assert conn is opened[0]
+        assert not conn.closed
+        self._backend().release(conn)
+        assert conn.closed
+        assert ssh_module._loop_pool() == {}
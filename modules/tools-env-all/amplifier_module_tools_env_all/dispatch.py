@@ -7,7 +7,9 @@ corresponding EnvironmentBackend method. All tools accept an optional
 
 from __future__ import annotations
 
-from typing import Any
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, ClassVar
 
 from amplifier_core import ToolResult
 
@@ -24,14 +26,14 @@ def _get_backend(
 ) -> tuple[Any, ToolResult | None]:
     """Look up backend by instance name; return (backend, None) or (None, error)."""
     instance = input.get("instance", "local")
-    backend = registry.get(instance)
-    if backend is None:
-        existing = [i["name"] for i in registry.list_instances()]
+    try:
+        return registry[instance], None
+    except KeyError:
+        existing = registry.names()
         return None, ToolResult(
             success=False,
             error={"message": f"Instance '{instance}' not found. Active: {existing}"},
         )
-    return backend, None
 
 
 def _missing(param: str) -> ToolResult:
@@ -45,6 +47,30 @@ def _missing(param: str) -> ToolResult:
 # Shared schema fragment
 # ---------------------------------------------------------------------------
 
+# Each tool's schema is built once and kept frozen, so it can be shared
+# without anyone mutating it for every later listing. input_schema hands out
+# a fresh plain copy: provider requests JSON-encode it, and MappingProxyType
+# is not JSON-serializable.
+
+
+def _freeze(node: Any) -> Any:
+    """Read-only copy of a JSON schema tree (mappings and tuples)."""
+    if isinstance(node, Mapping):
+        return MappingProxyType({k: _freeze(v) for k, v in node.items()})
+    if isinstance(node, list):
+        return tuple(_freeze(v) for v in node)
+    return node
+
+
+def _thaw(node: Any) -> Any:
+    """Plain dict/list copy of a schema tree built by _freeze."""
+    if isinstance(node, Mapping):
+        return {k: _thaw(v) for k, v in node.items()}
+    if isinstance(node, tuple):
+        return [_thaw(v) for v in node]
+    return node
+
+
 _INSTANCE_SCHEMA = {
     "type": "string",
     "description": "Environment instance name (default: 'local')",
@@ -59,20 +85,8 @@ _INSTANCE_SCHEMA = {
 class EnvExecTool:
     """Execute a shell command in a named environment instance."""
 
-    def __init__(self, registry: EnvironmentRegistry) -> None:
-        self._registry = registry
-
-    @property
-    def name(self) -> str:
-        return "env_exec"
-
-    @property
-    def description(self) -> str:
-        return "Execute a shell command in a named environment instance."
-
-    @property
-    def input_schema(self) -> dict:
-        return {
+    _SCHEMA: ClassVar[Mapping[str, Any]] = _freeze(
+        {
             "type": "object",
             "properties": {
                 "instance": _INSTANCE_SCHEMA,
@@ -89,6 +103,22 @@ class EnvExecTool:
             },
             "required": ["command"],
         }
+    )
+
+    def __init__(self, registry: EnvironmentRegistry) -> None:
+        self._registry = registry
+
+    @property
+    def name(self) -> str:
+        return "env_exec"
+
+    @property
+    def description(self) -> str:
+        return "Execute a shell command in a named environment instance."
+
+    @property
+    def input_schema(self) -> dict:
+        return _thaw(self._SCHEMA)
 
     async def execute(self, input: dict[str, Any]) -> ToolResult:
         backend, error = _get_backend(self._registry, input)
@@ -126,6 +156,19 @@ class EnvExecTool:
 class EnvReadFileTool:
     """Read file content from a named environment instance."""
 
+    _SCHEMA: ClassVar[Mapping[str, Any]] = _freeze(
+        {
+            "type": "object",
+            "properties": {
+                "instance": _INSTANCE_SCHEMA,
+                "path": {"type": "string", "description": "File path to read"},
+                "offset": {"type": "integer", "description": "Line offset (1-based)"},
+                "limit": {"type": "integer", "description": "Max lines to read"},
+            },
+            "required": ["path"],
+        }
+    )
+
     def __init__(self, registry: EnvironmentRegistry) -> None:
         self._registry = registry
 
@@ -139,16 +182,7 @@ class EnvReadFileTool:
 
     @property
     def input_schema(self) -> dict:
-        return {
-            "type": "object",
-            "properties": {
-                "instance": _INSTANCE_SCHEMA,
-                "path": {"type": "string", "description": "File path to read"},
-                "offset": {"type": "integer", "description": "Line offset (1-based)"},
-                "limit": {"type": "integer", "description": "Max lines to read"},
-            },
-            "required": ["path"],
-        }
+        return _thaw(self._SCHEMA)
 
     async def execute(self, input: dict[str, Any]) -> ToolResult:
         backend, error = _get_backend(self._registry, input)
@@ -174,6 +208,18 @@ class EnvReadFileTool:
 class EnvWriteFileTool:
     """Write content to a file in a named environment instance."""
 
+    _SCHEMA: ClassVar[Mapping[str, Any]] = _freeze(
+        {
+            "type": "object",
+            "properties": {
+                "instance": _INSTANCE_SCHEMA,
+                "path": {"type": "string", "description": "File path to write"},
+                "content": {"type": "string", "description": "Content to write"},
+            },
+            "required": ["path", "content"],
+        }
+    )
+
     def __init__(self, registry: EnvironmentRegistry) -> None:
         self._registry = registry
 
@@ -187,15 +233,7 @@ class EnvWriteFileTool:
 
     @property
     def input_schema(self) -> dict:
-        return {
-            "type": "object",
-            "properties": {
-                "instance": _INSTANCE_SCHEMA,
-                "path": {"type": "string", "description": "File path to write"},
-                "content": {"type": "string", "description": "Content to write"},
-            },
-            "required": ["path", "content"],
-        }
+        return _thaw(self._SCHEMA)
 
     async def execute(self, input: dict[str, Any]) -> ToolResult:
         backend, error = _get_backend(self._registry, input)
@@ -222,6 +260,19 @@ class EnvWriteFileTool:
 class EnvEditFileTool:
     """Edit a file by replacing an exact string match in a named environment instance."""
 
+    _SCHEMA: ClassVar[Mapping[str, Any]] = _freeze(
+        {
+            "type": "object",
+            "properties": {
+                "instance": _INSTANCE_SCHEMA,
+                "path": {"type": "string", "description": "File path to edit"},
+                "old_string": {"type": "string", "description": "Exact string to find"},
+                "new_string": {"type": "string", "description": "Replacement string"},
+            },
+            "required": ["path", "old_string", "new_string"],
+        }
+    )
+
     def __init__(self, registry: EnvironmentRegistry) -> None:
         self._registry = registry
 
@@ -235,16 +286,7 @@ class EnvEditFileTool:
 
     @property
     def input_schema(self) -> dict:
-        return {
-            "type": "object",
-            "properties": {
-                "instance": _INSTANCE_SCHEMA,
-                "path": {"type": "string", "description": "File path to edit"},
-                "old_string": {"type": "string", "description": "Exact string to find"},
-                "new_string": {"type": "string", "description": "Replacement string"},
-            },
-            "required": ["path", "old_string", "new_string"],
-        }
+        return _thaw(self._SCHEMA)
 
     async def execute(self, input: dict[str, Any]) -> ToolResult:
         backend, error = _get_backend(self._registry, input)
@@ -274,20 +316,8 @@ class EnvEditFileTool:
 class EnvGrepTool:
     """Search file contents with regex in a named environment instance."""
 
-    def __init__(self, registry: EnvironmentRegistry) -> None:
-        self._registry = registry
-
-    @property
-    def name(self) -> str:
-        return "env_grep"
-
-    @property
-    def description(self) -> str:
-        return "Search file contents with regex in a named environment instance."
-
-    @property
-    def input_schema(self) -> dict:
-        return {
+    _SCHEMA: ClassVar[Mapping[str, Any]] = _freeze(
+        {
             "type": "object",
             "properties": {
                 "instance": _INSTANCE_SCHEMA,
@@ -314,6 +344,22 @@ class EnvGrepTool:
             },
             "required": ["pattern"],
         }
+    )
+
+    def __init__(self, registry: EnvironmentRegistry) -> None:
+        self._registry = registry
+
+    @property
+    def name(self) -> str:
+        return "env_grep"
+
+    @property
+    def description(self) -> str:
+        return "Search file contents with regex in a named environment instance."
+
+    @property
+    def input_schema(self) -> dict:
+        return _thaw(self._SCHEMA)
 
     async def execute(self, input: dict[str, Any]) -> ToolResult:
         backend, error = _get_backend(self._registry, input)
@@ -343,6 +389,21 @@ class EnvGrepTool:
 class EnvGlobTool:
     """Find files matching a glob pattern in a named environment instance."""
 
+    _SCHEMA: ClassVar[Mapping[str, Any]] = _freeze(
+        {
+            "type": "object",
+            "properties": {
+                "instance": _INSTANCE_SCHEMA,
+                "pattern": {"type": "string", "description": "Glob pattern to match"},
+                "path": {
+                    "type": "string",
+                    "description": "Base directory to search from",
+                },
+            },
+            "required": ["pattern"],
+        }
+    )
+
     def __init__(self, registry: EnvironmentRegistry) -> None:
         self._registry = registry
 
@@ -356,18 +417,7 @@ class EnvGlobTool:
 
     @property
     def input_schema(self) -> dict:
-        return {
-            "type": "object",
-            "properties": {
-                "instance": _INSTANCE_SCHEMA,
-                "pattern": {"type": "string", "description": "Glob pattern to match"},
-                "path": {
-                    "type": "string",
-                    "description": "Base directory to search from",
-                },
-            },
-            "required": ["pattern"],
-        }
+        return _thaw(self._SCHEMA)
 
     async def execute(self, input: dict[str, Any]) -> ToolResult:
         backend, error = _get_backend(self._registry, input)
@@ -391,6 +441,20 @@ class EnvGlobTool:
 class EnvListDirTool:
     """List directory contents in a named environment instance."""
 
+    _SCHEMA: ClassVar[Mapping[str, Any]] = _freeze(
+        {
+            "type": "object",
+            "properties": {
+                "instance": _INSTANCE_SCHEMA,
+                "path": {"type": "string", "description": "Directory path to list"},
+                "depth": {
+                    "type": "integer",
+                    "description": "Directory depth (default: 1, immediate children only)",
+                },
+            },
+        }
+    )
+
     def __init__(self, registry: EnvironmentRegistry) -> None:
         self._registry = registry
 
@@ -404,17 +468,7 @@ class EnvListDirTool:
 
     @property
     def input_schema(self) -> dict:
-        return {
-            "type": "object",
-            "properties": {
-                "instance": _INSTANCE_SCHEMA,
-                "path": {"type": "string", "description": "Directory path to list"},
-                "depth": {
-                    "type": "integer",
-                    "description": "Directory depth (default: 1, immediate children only)",
-                },
-            },
-        }
+        return _thaw(self._SCHEMA)
 
     async def execute(self, input: dict[str, Any]) -> ToolResult:
         backend, error = _get_backend(self._registry, input)
@@ -439,6 +493,17 @@ class EnvListDirTool:
 class EnvFileExistsTool:
     """Check if a file or directory exists in a named environment instance."""
 
+    _SCHEMA: ClassVar[Mapping[str, Any]] = _freeze(
+        {
+            "type": "object",
+            "properties": {
+                "instance": _INSTANCE_SCHEMA,
+                "path": {"type": "string", "description": "Path to check"},
+            },
+            "required": ["path"],
+        }
+    )
+
     def __init__(self, registry: EnvironmentRegistry) -> None:
         self._registry = registry
 
@@ -452,14 +517,7 @@ class EnvFileExistsTool:
 
     @property
     def input_schema(self) -> dict:
-        return {
-            "type": "object",
-            "properties": {
-                "instance": _INSTANCE_SCHEMA,
-                "path": {"type": "string", "description": "Path to check"},
-            },
-            "required": ["path"],
-        }
+        return _thaw(self._SCHEMA)
 
     async def execute(self, input: dict[str, Any]) -> ToolResult:
         backend, error = _get_backend(self._registry, input)
@@ -157,8 +157,8 @@ class EnvCreateTool:
             )
 
         # Check for duplicate
-        if self._registry.get(env_name) is not None:
-            existing = [i["name"] for i in self._registry.list_instances()]
+        if env_name in self._registry:
+            existing = self._registry.names()
             return ToolResult(
                 success=False,
                 error={
@@ -452,6 +452,7 @@ class EnvCreateTool:
                 exec_fn=connection.exec_command,
                 host=resolved_host,
                 disconnect_fn=connection.disconnect,
+                exec_accepts_input=True,
             )
         except ImportError:
             raise RuntimeError(
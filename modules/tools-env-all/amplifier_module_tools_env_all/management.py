@@ -51,7 +51,7 @@ class EnvDestroyTool:
                 success=True, output=f"Destroyed environment '{instance}'."
             )
         except KeyError:
-            existing = [i["name"] for i in self._registry.list_instances()]
+            existing = self._registry.names()
             return ToolResult(
                 success=False,
                 error={
@@ -784,6 +784,24 @@ class TestAllToolsHaveInstanceParam:
                 f"{cls.__name__} should not require 'instance'"
             )
 
+    def test_input_schema_mutation_does_not_leak(
+        self, registry: EnvironmentRegistry
+    ) -> None:
+        from amplifier_module_tools_env_all.dispatch import EnvExecTool
+
+        schema = EnvExecTool(registry).input_schema
+        schema["required"].append("timeout")
+        schema["properties"]["instance"]["type"] = "integer"
+        fresh = EnvExecTool(registry).input_schema
+        assert fresh["required"] == ["command"]
+        assert fresh["properties"]["instance"]["type"] == "string"
+
+    def test_shared_schema_is_frozen(self) -> None:
+        from amplifier_module_tools_env_all.dispatch import EnvExecTool
+
+        with pytest.raises(TypeError):
+            EnvExecTool._SCHEMA["type"] = "array"  # type: ignore[index]
+
 
 # ---------------------------------------------------------------------------
 # NLSpec param passthrough tests